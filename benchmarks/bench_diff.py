@@ -0,0 +1,43 @@
+"""Benchmark diffing a folder with many children, as update_treeview() does.
+
+Run with: python benchmarks/bench_diff.py [n_children ...]
+"""
+
+import sys
+import time
+
+from shiny_treeview import TreeItem
+from shiny_treeview.patch import _diff, _TreeState
+
+
+def changes(children: list[TreeItem]) -> dict[str, list[TreeItem]]:
+    """New lists of children for each kind of change."""
+    return {
+        "reverse": list(reversed(children)),
+        "interleave": [
+            x
+            for i, child in enumerate(children)
+            for x in (child, TreeItem(f"new{i}", "New", validate=False))
+        ],
+        "relabel": [
+            TreeItem(child.id, "Renamed", validate=False) for child in children
+        ],
+        "append": children + [TreeItem("new", "New", validate=False)],
+    }
+
+
+def main(sizes: list[int]) -> None:
+    print(f"{'children':>10} {'change':>10} {'ops':>7} {'time':>9}")
+    for n in sizes:
+        children = [TreeItem(f"child{i}", "Child", validate=False) for i in range(n)]
+        old = _TreeState.from_items([TreeItem("folder", "Folder", children)])
+        for name, new_children in changes(children).items():
+            new = _TreeState.from_items([TreeItem("folder", "Folder", new_children)])
+            start = time.perf_counter()
+            ops = _diff(old, new)
+            elapsed = time.perf_counter() - start
+            print(f"{n:>10} {name:>10} {len(ops):>7} {elapsed:>8.3f}s")
+
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or [1_000, 20_000, 100_000])
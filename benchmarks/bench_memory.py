@@ -0,0 +1,64 @@
+"""Benchmark memory usage of TreeItem forests versus TreeTable.
+
+Run with: python benchmarks/bench_memory.py [n_nodes ...]
+"""
+
+import gc
+import sys
+import tracemalloc
+
+from shiny_treeview import TreeItem, TreeTable
+
+
+def make_columns(n: int, fanout: int = 10):
+    """Generate flat columns for a balanced tree with n nodes."""
+    ids = [f"node{i}" for i in range(n)]
+    labels = [f"Node {i}" for i in range(n)]
+    parents = [-1 if i == 0 else (i - 1) // fanout for i in range(n)]
+    return ids, labels, parents
+
+
+def build_items(ids, labels, parents) -> list[TreeItem]:
+    """Build a nested TreeItem forest from flat columns."""
+    nodes = [TreeItem(id, label) for id, label in zip(ids, labels)]
+    roots = []
+    for node, parent in zip(nodes, parents):
+        if parent < 0:
+            roots.append(node)
+        else:
+            nodes[parent].children.append(node)
+    return roots
+
+
+def build_table(ids, labels, parents) -> TreeTable:
+    """Build a TreeTable directly from flat columns."""
+    n = len(ids)
+    return TreeTable._from_parent_positions(ids, labels, [""] * n, [False] * n, parents)
+
+
+def measure(build, *args) -> int:
+    """Return the bytes retained by the result of build(*args)."""
+    gc.collect()
+    tracemalloc.start()
+    result = build(*args)
+    gc.collect()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return current
+
+
+def main(sizes: list[int]) -> None:
+    print(f"{'nodes':>10} {'TreeItem':>14} {'TreeTable':>14} {'ratio':>7}")
+    for n in sizes:
+        columns = make_columns(n)
+        items_bytes = measure(build_items, *columns)
+        table_bytes = measure(build_table, *columns)
+        print(
+            f"{n:>10} {items_bytes / n:>10.1f} B/n {table_bytes / n:>10.1f} B/n "
+            f"{items_bytes / table_bytes:>6.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main([int(x) for x in sys.argv[1:]] or [10_000, 100_000, 1_000_000])
@@ -0,0 +1,61 @@
+"""Benchmark looking up the paths to many items, as when auto-expanding.
+
+Run with: python benchmarks/bench_paths.py [n_targets ...]
+"""
+
+import random
+import sys
+import time
+
+from shiny_treeview import TreeIndex, TreeItem
+from shiny_treeview.utils import get_tree_path, get_tree_paths
+
+# Number of items in the tree
+TREE_SIZE = 1_000_000
+
+# Separate searches walk the tree once per target, so only this many are timed
+# and the time is scaled to all targets
+SEPARATE_SAMPLE = 20
+
+
+def make_tree(n: int, fanout: int = 10) -> list[TreeItem]:
+    """Build a balanced tree with n nodes."""
+    nodes = [TreeItem(f"node{i}", f"Node {i}", validate=False) for i in range(n)]
+    for i in range(1, n):
+        nodes[(i - 1) // fanout].children.append(nodes[i])
+    return nodes[:1]
+
+
+def separate(items: list[TreeItem], ids: list[str]) -> dict:
+    """Search the tree for each target, as before."""
+    return {id: get_tree_path(items, id) for id in ids}
+
+
+def indexed(items: list[TreeItem], ids: list[str]) -> dict:
+    """Index the whole tree, then look up each target."""
+    index = TreeIndex(items)
+    return {id: index.path(id) for id in ids}
+
+
+def main(sizes: list[int]) -> None:
+    items = make_tree(TREE_SIZE)
+    random.seed(0)
+
+    print(f"{'targets':>10} {'method':>10} {'time':>9}")
+    for n in sizes:
+        ids = [f"node{i}" for i in random.sample(range(TREE_SIZE), n)]
+        start = time.perf_counter()
+        expected = separate(items, ids[:SEPARATE_SAMPLE])
+        elapsed = (time.perf_counter() - start) * n / SEPARATE_SAMPLE
+        print(f"{n:>10} {'separate':>10} {elapsed:>8.3f}s (estimated)")
+
+        for name, lookup in [("index", indexed), ("batch", get_tree_paths)]:
+            start = time.perf_counter()
+            result = lookup(items, ids)
+            elapsed = time.perf_counter() - start
+            print(f"{n:>10} {name:>10} {elapsed:>8.3f}s")
+            assert all(result[id] == path for id, path in expected.items())
+
+
+if __name__ == "__main__":
+    main([int(x) for x in sys.argv[1:]] or [1_000, 10_000, 100_000])
@@ -0,0 +1,57 @@
+"""Benchmark serialization of tree payloads.
+
+Run with: python benchmarks/bench_serialize.py [n_nodes ...]
+"""
+
+import json
+import sys
+import time
+import tracemalloc
+
+from shiny_treeview import TreeItem
+from shiny_treeview.serialize import _items_json
+
+
+def make_tree(n: int, fanout: int = 10) -> list[TreeItem]:
+    """Build a balanced tree with n nodes."""
+    nodes = [
+        TreeItem(f"node{i}", f"📄 Node {i}", caption="Caption" if i % 7 == 0 else "")
+        for i in range(n)
+    ]
+    for i in range(1, n):
+        nodes[(i - 1) // fanout].children.append(nodes[i])
+    return nodes[:1]
+
+
+def dict_json(items: list[TreeItem]) -> str:
+    """Serialize via intermediate dictionaries, as before."""
+    return json.dumps([x._to_dict() for x in items])
+
+
+def measure(serialize, items) -> tuple[float, int, str]:
+    """Return the time, peak memory and output of serialize(items)."""
+    start = time.perf_counter()
+    result = serialize(items)
+    elapsed = time.perf_counter() - start
+
+    tracemalloc.start()
+    serialize(items)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak, result
+
+
+def main(sizes: list[int]) -> None:
+    print(f"{'nodes':>10} {'method':>10} {'time':>9} {'peak':>10}")
+    for n in sizes:
+        items = make_tree(n)
+        outputs = []
+        for name, serialize in [("dicts", dict_json), ("streaming", _items_json)]:
+            elapsed, peak, output = measure(serialize, items)
+            outputs.append(output)
+            print(f"{n:>10} {name:>10} {elapsed:>8.3f}s {peak / 2**20:>7.1f} MiB")
+        assert outputs[0] == outputs[1]
+
+
+if __name__ == "__main__":
+    main([int(x) for x in sys.argv[1:]] or [100_000, 1_000_000])
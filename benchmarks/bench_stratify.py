@@ -0,0 +1,312 @@
+"""Benchmark the stratify functions.
+
+Run with: python benchmarks/bench_stratify.py [n_nodes ...]
+"""
+
+import sys
+import time
+import tracemalloc
+from dataclasses import replace
+from typing import Iterator, Optional
+
+from shiny_treeview import (
+    TreeBuilder,
+    TreeItem,
+    stratify_by_levels,
+    stratify_by_parent,
+    stratify_by_path,
+    stratify_from_columns,
+    stratify_from_rows,
+)
+from shiny_treeview.stratify import _validate_parent_ids
+
+# The ancestor walk is quadratic on chains, so it is skipped above this size
+MAX_WALK_SIZE = 20_000
+
+
+def make_parent_ids(n: int, shape: str) -> tuple[list[str], list[Optional[str]]]:
+    """Generate IDs and parent IDs for a chain or a balanced tree with n nodes."""
+    ids = [f"node{i}" for i in range(n)]
+    if shape == "chain":
+        return ids, [None] + ids[:-1]
+    return ids, [None] + [ids[(i - 1) // 10] for i in range(1, n)]
+
+
+def ancestor_walk(ids: list[str], parent_ids: list[Optional[str]]) -> bool:
+    """Trace the ancestors of each item with a fresh visited set, as before."""
+    parent_map = dict(zip(ids, parent_ids))
+    for item_id in parent_map:
+        visited = set()
+        current_id = parent_map.get(item_id)
+        while current_id is not None:
+            if current_id in visited:
+                return True
+            visited.add(current_id)
+            current_id = parent_map.get(current_id)
+    return False
+
+
+def replace_stratify(
+    items: list[TreeItem], parent_ids: list[Optional[str]]
+) -> list[TreeItem]:
+    """Link validated copies made with dataclasses.replace(), as before."""
+    _validate_parent_ids([item.id for item in items], parent_ids)
+    item_map = {}
+    roots = []
+    for item, parent_id in zip(items, parent_ids):
+        new_item = replace(item, children=[])
+        item_map[item.id] = new_item
+        if parent_id is None:
+            roots.append(new_item)
+    for item, parent_id in zip(items, parent_ids):
+        if parent_id is not None:
+            item_map[parent_id].children.append(item_map[item.id])
+    return roots
+
+
+def measure(stratify, items, parent_ids) -> tuple[float, int]:
+    """Return the time and peak memory of stratify(items, parent_ids)."""
+    start = time.perf_counter()
+    stratify(items, parent_ids)
+    elapsed = time.perf_counter() - start
+
+    tracemalloc.start()
+    stratify(items, parent_ids)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak
+
+
+def bench_linking(sizes: list[int]) -> None:
+    print(f"{'nodes':>10} {'method':>10} {'time':>9} {'peak':>10}")
+    for n in sizes:
+        ids, parent_ids = make_parent_ids(n, "balanced")
+        items = [TreeItem(id, f"Node {id}") for id in ids]
+        methods = [
+            ("replace", replace_stratify),
+            ("copy", stratify_by_parent),
+            ("in place", lambda *args: stratify_by_parent(*args, copy=False)),
+        ]
+        for name, stratify in methods:
+            elapsed, peak = measure(stratify, items, parent_ids)
+            print(f"{n:>10} {name:>10} {elapsed:>8.3f}s {peak / 2**20:>7.1f} MiB")
+
+
+def items_from_rows(ids, labels, parent_ids) -> list[TreeItem]:
+    """Create a TreeItem per row and link them in place."""
+    items = [TreeItem(id, label, validate=False) for id, label in zip(ids, labels)]
+    return stratify_by_parent(items, parent_ids, copy=False)
+
+
+def bench_columns(sizes: list[int]) -> None:
+    try:
+        import pyarrow as pa
+    except ImportError:
+        pa = None
+
+    print(f"{'nodes':>10} {'method':>10} {'time':>9}")
+    for n in sizes:
+        ids, parent_ids = make_parent_ids(n, "balanced")
+        labels = [f"Node {id}" for id in ids]
+        methods = [
+            ("items", items_from_rows, (ids, labels, parent_ids)),
+            ("lists", stratify_from_columns, (ids, labels, parent_ids)),
+        ]
+        if pa is not None:
+            columns = (pa.array(ids), pa.array(labels), pa.array(parent_ids))
+            methods.append(("arrow", stratify_from_columns, columns))
+        for name, stratify, args in methods:
+            start = time.perf_counter()
+            stratify(*args)
+            elapsed = time.perf_counter() - start
+            print(f"{n:>10} {name:>10} {elapsed:>8.3f}s")
+
+
+def make_paths(n: int) -> list[str]:
+    """Generate object keys partitioned by bucket, year and month."""
+    return [
+        f"bucket{i % 10}/{2000 + i // 1000 % 25}/{i // 100 % 12 + 1:02}/file{i}.parquet"
+        for i in range(n)
+    ]
+
+
+def paths_by_hand(paths: list[str]) -> list[TreeItem]:
+    """Synthesize every intermediate folder and its parent ID, then stratify."""
+    items, parent_ids, seen = [], [], set()
+    for path in paths:
+        parent_id = None
+        segments = path.split("/")
+        for depth in range(1, len(segments) + 1):
+            id = "/".join(segments[:depth])
+            if id not in seen:
+                seen.add(id)
+                items.append(TreeItem(id, segments[depth - 1], validate=False))
+                parent_ids.append(parent_id)
+            parent_id = id
+    return stratify_by_parent(items, parent_ids, copy=False)
+
+
+def bench_paths(sizes: list[int]) -> None:
+    print(f"{'paths':>10} {'method':>10} {'time':>9} {'peak':>10}")
+    for n in sizes:
+        paths = make_paths(n)
+        methods = [
+            ("by hand", paths_by_hand),
+            ("items", stratify_by_path),
+            ("table", lambda paths: stratify_by_path(paths, table=True)),
+        ]
+        for name, stratify in methods:
+            elapsed, peak = measure(lambda paths, _: stratify(paths), paths, None)
+            print(f"{n:>10} {name:>10} {elapsed:>8.3f}s {peak / 2**20:>7.1f} MiB")
+
+
+def make_levels(n: int) -> dict[str, list[str]]:
+    """Generate sales rows with a region, country and city."""
+    cities = [i % 1009 for i in range(n)]
+    return {
+        "region": [f"region{city % 7}" for city in cities],
+        "country": [f"country{city % 97}" for city in cities],
+        "city": [f"city{city}" for city in cities],
+        "store": [f"store{i}" for i in range(n)],
+    }
+
+
+def levels_by_hand(data: dict[str, list[str]]) -> list[TreeItem]:
+    """Nest each row under its region, country and city, one row at a time."""
+    roots: list[TreeItem] = []
+    groups: dict[tuple, TreeItem] = {}
+    for i, row in enumerate(zip(data["region"], data["country"], data["city"])):
+        siblings = roots
+        for depth in range(1, len(row) + 1):
+            key = row[:depth]
+            group = groups.get(key)
+            if group is None:
+                group = groups[key] = TreeItem("/".join(key), key[-1], validate=False)
+                siblings.append(group)
+            siblings = group.children
+        siblings.append(TreeItem(f"{key}/#{i}", data["store"][i], validate=False))
+    return roots
+
+
+def bench_levels(sizes: list[int]) -> None:
+    print(f"{'rows':>10} {'method':>10} {'time':>9} {'peak':>10}")
+    levels = ["region", "country", "city"]
+    for n in sizes:
+        data = make_levels(n)
+        methods = [
+            ("by hand", levels_by_hand),
+            ("items", lambda data: stratify_by_levels(data, levels, "store")),
+            (
+                "table",
+                lambda data: stratify_by_levels(data, levels, "store", table=True),
+            ),
+        ]
+        for name, stratify in methods:
+            elapsed, peak = measure(lambda data, _: stratify(data), data, None)
+            print(f"{n:>10} {name:>10} {elapsed:>8.3f}s {peak / 2**20:>7.1f} MiB")
+
+
+def read_rows(n: int, reverse: bool) -> Iterator[tuple[tuple[str, str], Optional[str]]]:
+    """Yield rows like a database cursor, creating their strings on the fly."""
+    for i in reversed(range(n)) if reverse else range(n):
+        parent_id = f"n{(i - 1) // 10}" if i else None
+        yield (f"n{i}", f"Node {i}"), parent_id
+
+
+def rows_to_lists(rows) -> list[TreeItem]:
+    """Materialize the rows as items and parent IDs, then stratify."""
+    items, parent_ids = [], []
+    for (id, label), parent_id in rows:
+        items.append(TreeItem(id, label, validate=False))
+        parent_ids.append(parent_id)
+    return stratify_by_parent(items, parent_ids, copy=False)
+
+
+def bench_rows(sizes: list[int]) -> None:
+    print(f"{'rows':>10} {'order':>9} {'method':>10} {'time':>9} {'peak':>10}")
+    for n in sizes:
+        for order, reverse in [("parents", False), ("children", True)]:
+            for name, stratify in [
+                ("lists", rows_to_lists),
+                ("stream", stratify_from_rows),
+            ]:
+                elapsed, peak = measure(
+                    lambda n, reverse: stratify(read_rows(n, reverse)), n, reverse
+                )
+                print(
+                    f"{n:>10} {order:>9} {name:>10} {elapsed:>8.3f}s"
+                    f" {peak / 2**20:>7.1f} MiB"
+                )
+
+
+def bench_builder(sizes: list[int]) -> None:
+    """Refresh a growing table: re-stratify every row, or add the new rows."""
+    print(f"{'nodes':>10} {'method':>10} {'time':>9}")
+    for n in sizes:
+        ids, parent_ids = make_parent_ids(n, "balanced")
+        old = n - n // 100
+        builder = TreeBuilder(
+            ((id, f"Node {id}"), parent_id)
+            for id, parent_id in zip(ids[:old], parent_ids[:old])
+        )
+
+        start = time.perf_counter()
+        stratify_by_parent([TreeItem(id, f"Node {id}") for id in ids], parent_ids)
+        elapsed = time.perf_counter() - start
+        print(f"{n:>10} {'stratify':>10} {elapsed:>8.3f}s")
+
+        start = time.perf_counter()
+        builder.add(
+            ((id, f"Node {id}"), parent_id)
+            for id, parent_id in zip(ids[old:], parent_ids[old:])
+        )
+        builder.remove(ids[old:][::10])
+        elapsed = time.perf_counter() - start
+        print(f"{n:>10} {'builder':>10} {elapsed:>8.3f}s")
+
+        # Remove roots one at a time, as when rows are deleted by separate events
+        builder = TreeBuilder(((id, f"Node {id}"), None) for id in ids)
+        start = time.perf_counter()
+        for id in ids[: n // 100]:
+            builder.remove([id])
+        builder.items
+        elapsed = time.perf_counter() - start
+        print(f"{n:>10} {'remove':>10} {elapsed:>8.3f}s")
+
+
+def bench_cycles(sizes: list[int]) -> None:
+    print(f"{'nodes':>10} {'shape':>9} {'method':>10} {'time':>9}")
+    for n in sizes:
+        for shape in ["balanced", "chain"]:
+            ids, parent_ids = make_parent_ids(n, shape)
+            for name, check in [
+                ("walk", ancestor_walk),
+                ("linear", _validate_parent_ids),
+            ]:
+                if name == "walk" and shape == "chain" and n > MAX_WALK_SIZE:
+                    print(f"{n:>10} {shape:>9} {name:>10} {'skipped':>9}")
+                    continue
+                start = time.perf_counter()
+                check(ids, parent_ids)
+                elapsed = time.perf_counter() - start
+                print(f"{n:>10} {shape:>9} {name:>10} {elapsed:>8.3f}s")
+
+
+def main(sizes: list[int]) -> None:
+    bench_cycles(sizes)
+    print()
+    bench_linking(sizes)
+    print()
+    bench_columns(sizes)
+    print()
+    bench_paths(sizes)
+    print()
+    bench_levels(sizes)
+    print()
+    bench_rows(sizes)
+    print()
+    bench_builder(sizes)
+
+
+if __name__ == "__main__":
+    main([int(x) for x in sys.argv[1:]] or [10_000, 100_000, 1_000_000])
@@ -1,11 +1,41 @@
 from .__version__ import __version__
-from .stratify import stratify_by_parent
+from .server import (
+    insert_tree_items,
+    move_tree_item,
+    remove_tree_items,
+    set_tree_item,
+    treeview_loader,
+    update_treeview,
+)
+from .stratify import (
+    TreeBuilder,
+    stratify_by_levels,
+    stratify_by_parent,
+    stratify_by_path,
+    stratify_from_columns,
+    stratify_from_rows,
+)
+from .table import TreeTable
 from .tree import TreeItem
 from .ui import input_treeview
+from .utils import TreeIndex
 
 __all__ = [
+    "TreeBuilder",
+    "TreeIndex",
     "TreeItem",
+    "TreeTable",
     "input_treeview",
+    "insert_tree_items",
+    "move_tree_item",
+    "remove_tree_items",
+    "set_tree_item",
+    "stratify_by_levels",
     "stratify_by_parent",
+    "stratify_by_path",
+    "stratify_from_columns",
+    "stratify_from_rows",
+    "treeview_loader",
+    "update_treeview",
     "__version__",
 ]
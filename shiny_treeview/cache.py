@@ -0,0 +1,186 @@
+"""Process-wide cache of serialized tree data."""
+
+import hashlib
+import sys
+import threading
+import weakref
+from collections import OrderedDict
+from typing import NamedTuple, Optional, Union
+
+from .serialize import _items_json
+from .table import TreeTable
+from .tree import TreeItem
+from .utils import TreeIndex
+
+# Default memory limit of the cached payloads, in bytes
+_DEFAULT_MAX_SIZE = 256 * 1024 * 1024
+
+
+class CacheInfo(NamedTuple):
+    """Statistics of the payload cache, as returned by `cache_info()`."""
+
+    hits: int
+    misses: int
+    entries: int
+    size: int
+    max_size: int
+
+
+class _PayloadCache:
+    """
+    Least recently used cache of serialized items fields, limited by memory.
+
+    Entries are evicted, least recently used first, once the total size of the
+    cached strings exceeds `max_size` bytes. A string larger than the limit is
+    never cached.
+    """
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[tuple, str] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: tuple) -> Optional[str]:
+        with self._lock:
+            value = self._entries.get(key)
+            if value is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+                self._entries.move_to_end(key)
+            return value
+
+    def put(self, key: tuple, value: str) -> None:
+        size = sys.getsizeof(value)
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self.size -= sys.getsizeof(old)
+            if size > self.max_size:
+                return
+            self._entries[key] = value
+            self.size += size
+            self._evict()
+
+    def resize(self, max_size: int) -> None:
+        with self._lock:
+            self.max_size = max_size
+            self._evict()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.size = self.hits = self.misses = 0
+
+    def info(self) -> CacheInfo:
+        with self._lock:
+            return CacheInfo(
+                self.hits, self.misses, len(self._entries), self.size, self.max_size
+            )
+
+    def _evict(self) -> None:
+        while self.size > self.max_size:
+            _, value = self._entries.popitem(last=False)
+            self.size -= sys.getsizeof(value)
+
+
+_payload_cache = _PayloadCache(_DEFAULT_MAX_SIZE)
+
+# Fingerprints of TreeIndex and TreeTable objects, which are computed only once
+_fingerprints: "weakref.WeakKeyDictionary[object, str]" = weakref.WeakKeyDictionary()
+
+
+def cache_info() -> CacheInfo:
+    """
+    Get statistics of the payload cache used by `input_treeview(cache=)`.
+
+    Returns
+    -------
+    CacheInfo
+        A named tuple with the number of `hits` and `misses`, the number of cached
+        `entries`, their total `size` in bytes, and the `max_size` in bytes.
+
+    Examples
+    --------
+    ```python
+    from shiny_treeview.cache import cache_info
+
+    info = cache_info()
+    info.hits / max(info.hits + info.misses, 1)  # hit rate
+    ```
+    """
+    return _payload_cache.info()
+
+
+def cache_clear() -> None:
+    """Remove all entries from the payload cache and reset its statistics."""
+    _payload_cache.clear()
+
+
+def set_cache_size(max_size: int) -> None:
+    """
+    Set the memory limit of the payload cache.
+
+    Parameters
+    ----------
+    max_size
+        Maximum total size of the cached payloads, in bytes (256 MiB by default).
+        Least recently used payloads are evicted to stay within the limit. Use 0
+        to disable caching.
+
+    Raises
+    ------
+    ValueError
+        If `max_size` is negative.
+    """
+    if max_size < 0:
+        raise ValueError("max_size must be a non-negative number of bytes")
+    _payload_cache.resize(max_size)
+
+
+def _cache_key(
+    items: Union[list[TreeItem], TreeIndex, TreeTable],
+    cache: Union[bool, str],
+    columnar: bool,
+) -> tuple[tuple, Optional[str]]:
+    """
+    Get the payload cache key of tree data, from a given key or its content.
+
+    Also returns the tree serialized by `_items_json()` if it was serialized to
+    compute the key, so that a cache miss can reuse it.
+    """
+    if isinstance(cache, str):
+        return ("key", cache, columnar), None
+    fingerprint, items_json = _fingerprint(items)
+    return ("content", fingerprint, columnar), items_json
+
+
+def _fingerprint(
+    items: Union[list[TreeItem], TreeIndex, TreeTable],
+) -> tuple[str, Optional[str]]:
+    """
+    Compute a fingerprint of the content of tree data.
+
+    The fingerprint is a hash of the serialized tree. It is remembered for a
+    TreeIndex or TreeTable, which are not expected to change once built.
+
+    Returns the fingerprint, and the serialized tree if it was serialized by this
+    call rather than remembered.
+    """
+    if isinstance(items, list):
+        items_json = _items_json(items)
+        return _hash(items_json), items_json
+
+    fingerprint = _fingerprints.get(items)
+    if fingerprint is not None:
+        return fingerprint, None
+    items_json = _items_json(items.items if isinstance(items, TreeIndex) else items)
+    fingerprint = _fingerprints[items] = _hash(items_json)
+    return fingerprint, items_json
+
+
+def _hash(text: str) -> str:
+    return hashlib.blake2b(text.encode(), digest_size=16).hexdigest()
@@ -42952,6 +42952,227 @@ For example, \`@sm\` or \`@600\` or \`@40rem/sidebar\`.` : formatMuiErrorMessage
     return useStore(store, itemsSelectors.itemModel, itemId);
   };
 
+  // srcts/items.ts
+  var LOADING_PREFIX = "__shiny_treeview_loading__";
+  function loadingPlaceholder(parentId) {
+    return { id: LOADING_PREFIX + parentId, label: "Loading\u2026", disabled: true };
+  }
+  function isUnloaded(item) {
+    return item?.lazy === true && item.children?.length === 1 && item.children[0].id === LOADING_PREFIX + item.id;
+  }
+  function buildLookup(roots) {
+    const lookup = { items: /* @__PURE__ */ new Map(), parents: /* @__PURE__ */ new Map() };
+    addToLookup(lookup, roots, null);
+    return lookup;
+  }
+  function addToLookup(lookup, items, parentId) {
+    const stack = [[items, parentId]];
+    while (stack.length > 0) {
+      const [list, parent] = stack.pop();
+      for (const item of list) {
+        lookup.items.set(item.id, item);
+        lookup.parents.set(item.id, parent);
+        if (item.children && !isUnloaded(item)) {
+          stack.push([item.children, item.id]);
+        }
+      }
+    }
+  }
+  function insertAt(list, index, items) {
+    const at = typeof index === "number" ? Math.max(0, Math.min(index, list.length)) : list.length;
+    if (items.length <= 1e3) {
+      list.splice(at, 0, ...items);
+      return;
+    }
+    const tail = list.splice(at);
+    for (const item of items)
+      list.push(item);
+    for (const item of tail)
+      list.push(item);
+  }
+  function applyPatch(roots, lookup, ops) {
+    const childIds = /* @__PURE__ */ new Map();
+    const changed = /* @__PURE__ */ new Set();
+    const loaded = /* @__PURE__ */ new Set();
+    const childrenOf = (parentId) => {
+      if (parentId === null)
+        return roots;
+      const parent = lookup.items.get(parentId);
+      return isUnloaded(parent) ? [] : parent.children ?? [];
+    };
+    const currentIds = (parentId) => childIds.get(parentId) ?? childrenOf(parentId).map((item) => item.id);
+    const idsOf = (parentId) => {
+      let ids = childIds.get(parentId);
+      if (!ids) {
+        ids = currentIds(parentId);
+        childIds.set(parentId, ids);
+      }
+      return ids;
+    };
+    const removeSubtree = (id) => {
+      const stack2 = [id];
+      while (stack2.length > 0) {
+        const node2 = stack2.pop();
+        for (const childId of currentIds(node2))
+          stack2.push(childId);
+        lookup.items.delete(node2);
+        lookup.parents.delete(node2);
+        childIds.delete(node2);
+      }
+    };
+    const isInsideAny = (parentId, ids) => {
+      for (let node2 = parentId; node2 !== null; node2 = lookup.parents.get(node2) ?? null) {
+        if (ids.has(node2))
+          return true;
+      }
+      return false;
+    };
+    const ancestors = (parentId) => {
+      const result2 = /* @__PURE__ */ new Set();
+      for (let node2 = parentId; node2 !== null; node2 = lookup.parents.get(node2) ?? null) {
+        result2.add(node2);
+      }
+      return result2;
+    };
+    for (const op of ops) {
+      if (op.op === "insert") {
+        if (op.parent !== null && !lookup.items.has(op.parent))
+          continue;
+        const items = op.items.filter((item) => !lookup.items.has(item.id));
+        insertAt(idsOf(op.parent), op.index, items.map((item) => item.id));
+        if (items.length > 0)
+          loaded.add(op.parent);
+        addToLookup(lookup, items, op.parent);
+      } else if (op.op === "remove") {
+        const ids = new Set(op.ids.filter((id) => lookup.items.has(id)));
+        const removed = /* @__PURE__ */ new Map();
+        for (const id of ids) {
+          const parentId = lookup.parents.get(id) ?? null;
+          if (isInsideAny(parentId, ids))
+            continue;
+          if (!removed.has(parentId))
+            removed.set(parentId, []);
+          removed.get(parentId).push(id);
+        }
+        for (const [parentId, group] of removed) {
+          childIds.set(parentId, idsOf(parentId).filter((id) => !ids.has(id)));
+          group.forEach(removeSubtree);
+        }
+      } else if (op.op === "move") {
+        if (!lookup.items.has(op.id) || op.parent !== null && !lookup.items.has(op.parent)) {
+          continue;
+        }
+        if (ancestors(op.parent).has(op.id))
+          continue;
+        const siblings = idsOf(lookup.parents.get(op.id) ?? null);
+        siblings.splice(siblings.indexOf(op.id), 1);
+        lookup.parents.set(op.id, op.parent);
+        insertAt(idsOf(op.parent), op.index, [op.id]);
+        loaded.add(op.parent);
+      } else if (op.op === "children") {
+        if (op.parent !== null && !lookup.items.has(op.parent))
+          continue;
+        const items = new Map(op.items.filter((item) => !lookup.items.has(item.id)).map((item) => [item.id, item]));
+        const excluded = ancestors(op.parent);
+        const order2 = [];
+        const listed = /* @__PURE__ */ new Set();
+        const moved = /* @__PURE__ */ new Map();
+        for (const id of op.ids) {
+          if (listed.has(id) || excluded.has(id))
+            continue;
+          if (!items.has(id)) {
+            if (!lookup.items.has(id))
+              continue;
+            const parentId = lookup.parents.get(id) ?? null;
+            if (parentId !== op.parent) {
+              if (!moved.has(parentId))
+                moved.set(parentId, /* @__PURE__ */ new Set());
+              moved.get(parentId).add(id);
+            }
+          }
+          order2.push(id);
+          listed.add(id);
+        }
+        for (const [parentId, group] of moved) {
+          childIds.set(parentId, idsOf(parentId).filter((id) => !group.has(id)));
+          group.forEach((id) => lookup.parents.set(id, op.parent));
+        }
+        for (const id of idsOf(op.parent)) {
+          if (!listed.has(id))
+            order2.push(id);
+        }
+        childIds.set(op.parent, order2);
+        if (order2.length > 0)
+          loaded.add(op.parent);
+        addToLookup(lookup, [...items.values()], op.parent);
+      } else if (op.op === "set") {
+        const item = lookup.items.get(op.id);
+        if (!item)
+          continue;
+        const updated = { ...item };
+        if (op.label !== void 0)
+          updated.label = op.label;
+        if (op.caption !== void 0)
+          updated.caption = op.caption;
+        if (op.disabled !== void 0)
+          updated.disabled = op.disabled;
+        if (op.lazy !== void 0) {
+          updated.lazy = op.lazy;
+          if (op.lazy && !updated.children) {
+            updated.children = [loadingPlaceholder(op.id)];
+          } else if (!op.lazy && isUnloaded(item)) {
+            delete updated.children;
+          }
+        }
+        lookup.items.set(op.id, updated);
+        changed.add(op.id);
+      }
+    }
+    const copied = /* @__PURE__ */ new Set();
+    for (const id of [...changed, ...childIds.keys()]) {
+      if (id !== null && !lookup.items.has(id))
+        continue;
+      for (let node2 = id; !copied.has(node2); node2 = lookup.parents.get(node2) ?? null) {
+        copied.add(node2);
+        if (node2 === null)
+          break;
+      }
+    }
+    if (!copied.has(null))
+      return roots;
+    const order = [];
+    const stack = [null];
+    while (stack.length > 0) {
+      const id = stack.pop();
+      order.push(id);
+      for (const childId of currentIds(id)) {
+        if (copied.has(childId))
+          stack.push(childId);
+      }
+    }
+    let result = roots;
+    for (let i = order.length - 1; i >= 0; i--) {
+      const id = order[i];
+      const children = currentIds(id).map((childId) => lookup.items.get(childId));
+      if (id === null) {
+        result = children;
+        continue;
+      }
+      const previous = lookup.items.get(id);
+      if (isUnloaded(previous) && !childIds.has(id))
+        continue;
+      const { children: previousChildren, ...item } = previous;
+      if (children.length > 0) {
+        lookup.items.set(id, { ...item, children });
+      } else if (item.lazy && childIds.has(id) && (loaded.has(id) || previousChildren?.length && !isUnloaded(previous))) {
+        lookup.items.set(id, { ...item, children: [loadingPlaceholder(id)] });
+      } else {
+        lookup.items.set(id, item);
+      }
+    }
+    return result;
+  }
+
   // srcts/treeview.tsx
   var import_jsx_runtime38 = __toESM(require_jsx_runtime());
   function CustomLabel({ children, className, caption }) {
@@ -42976,29 +43197,97 @@ For example, \`@sm\` or \`@600\` or \`@40rem/sidebar\`.` : formatMuiErrorMessage
       }
     );
   });
-  function ShinyTreeView({
+  var ShinyTreeView = import_react8.default.forwardRef(function ShinyTreeView2({
     items,
     selected,
     expanded,
     multiple,
     checkbox,
-    updateShinyValue
-  }) {
+    updateShinyValue,
+    requestChildren
+  }, ref) {
+    const [treeItems, setTreeItems] = import_react8.default.useState(items);
     const [selectedItems, setSelectedItems] = import_react8.default.useState(selected);
     const [currentExpandedItems, setCurrentExpandedItems] = import_react8.default.useState(expanded);
-    import_react8.default.useEffect(() => {
+    const apiRef = import_react8.default.useRef(void 0);
+    const requestedItems = import_react8.default.useRef(/* @__PURE__ */ new Set());
+    const treeItemsRef = import_react8.default.useRef(items);
+    const selectedRef = import_react8.default.useRef(selected);
+    const expandedRef = import_react8.default.useRef(expanded);
+    const lookupRef = import_react8.default.useRef(null);
+    const loadIfNeeded = (itemId, item) => {
+      if (!requestChildren || requestedItems.current.has(itemId))
+        return;
+      if (isUnloaded(item ?? apiRef.current?.getItem(itemId))) {
+        requestedItems.current.add(itemId);
+        requestChildren(itemId);
+      }
+    };
+    const sendValue = (itemIds) => {
       if (multiple) {
-        const multiValue = selected.length > 0 ? selected : null;
+        const multiValue = itemIds.length > 0 ? itemIds : null;
         updateShinyValue(multiValue);
       } else {
-        const singleValue = selected.length > 0 ? selected[0] : null;
+        const singleValue = itemIds.length > 0 ? itemIds[0] : null;
         updateShinyValue(singleValue);
       }
+    };
+    const selectItems = (itemIds) => {
+      selectedRef.current = itemIds;
+      setSelectedItems(itemIds);
+      sendValue(itemIds);
+    };
+    const expandItems = (itemIds) => {
+      expandedRef.current = itemIds;
+      setCurrentExpandedItems(itemIds);
+    };
+    const updateItems = (newItems, lookup) => {
+      treeItemsRef.current = newItems;
+      lookupRef.current = lookup;
+      setTreeItems(newItems);
+      const keptIds = selectedRef.current.filter((itemId) => lookup.items.has(itemId));
+      if (keptIds.length !== selectedRef.current.length) {
+        selectItems(keptIds);
+      }
+      expandItems(expandedRef.current.filter((itemId) => lookup.items.has(itemId)));
+      expandedRef.current.forEach((itemId) => loadIfNeeded(itemId, lookup.items.get(itemId)));
+    };
+    const patchItems = (ops) => {
+      const lookup = lookupRef.current ?? buildLookup(treeItemsRef.current);
+      updateItems(applyPatch(treeItemsRef.current, lookup, ops), lookup);
+    };
+    import_react8.default.useImperativeHandle(ref, () => ({
+      loadChildren: (itemId, children) => {
+        requestedItems.current.delete(itemId);
+        patchItems([{ op: "insert", parent: itemId, items: children }]);
+      },
+      loadFailed: (itemId) => {
+        requestedItems.current.delete(itemId);
+        expandItems(expandedRef.current.filter((id) => id !== itemId));
+      },
+      setItems: (newItems) => {
+        updateItems(newItems, buildLookup(newItems));
+      },
+      applyPatch: patchItems,
+      setSelected: (itemIds) => {
+        selectItems(multiple ? [...itemIds].sort() : itemIds.slice(0, 1));
+      },
+      setExpanded: (itemIds) => {
+        expandItems(itemIds);
+        itemIds.forEach((itemId) => loadIfNeeded(itemId));
+      }
+    }), []);
+    import_react8.default.useEffect(() => {
+      sendValue(selected);
+    }, []);
+    import_react8.default.useEffect(() => {
+      expanded.forEach((itemId) => loadIfNeeded(itemId));
     }, []);
     return /* @__PURE__ */ (0, import_jsx_runtime38.jsx)(
       RichTreeView,
       {
-        items,
+        apiRef,
+        items: treeItems,
         selectedItems,
         expandedItems: currentExpandedItems,
         multiSelect: multiple,
@@ -43007,19 +43296,17 @@ For example, \`@sm\` or \`@600\` or \`@40rem/sidebar\`.` : formatMuiErrorMessage
           item: CustomTreeItem
         },
         onExpandedItemsChange: (_event, itemIds) => {
-          setCurrentExpandedItems(itemIds);
+          expandItems(itemIds);
+        },
+        onItemExpansionToggle: (_event, itemId, isExpanded) => {
+          if (isExpanded) {
+            loadIfNeeded(itemId);
+          }
         },
         onSelectedItemsChange: (_event, itemIds) => {
           const normalizedIds = Array.isArray(itemIds) ? itemIds : itemIds ? [itemIds] : [];
           normalizedIds.sort();
-          setSelectedItems(normalizedIds);
-          if (multiple) {
-            const multiValue = normalizedIds.length > 0 ? normalizedIds : null;
-            updateShinyValue(multiValue);
-          } else {
-            const singleValue = normalizedIds.length > 0 ? normalizedIds[0] : null;
-            updateShinyValue(singleValue);
-          }
+          selectItems(normalizedIds);
         },
         isItemDisabled: (item) => {
           return item.disabled === true;
@@ -43035,15 +43322,98 @@ For example, \`@sm\` or \`@600\` or \`@40rem/sidebar\`.` : formatMuiErrorMessage
         }
       }
     );
-  }
+  });
 
   // srcts/index.ts
+  var parseStringArray = (value, fallback = []) => {
+    if (Array.isArray(value)) {
+      return value.filter((item) => typeof item === "string");
+    }
+    return fallback;
+  };
+  var validateTreeItems = (items) => {
+    if (!Array.isArray(items)) {
+      return [];
+    }
+    const validateItem = (item) => {
+      if (!item || typeof item !== "object")
+        return null;
+      if (typeof item.id !== "string" || typeof item.label !== "string")
+        return null;
+      const validatedItem = {
+        id: item.id,
+        label: item.label
+      };
+      if (typeof item.disabled === "boolean") {
+        validatedItem.disabled = item.disabled;
+      }
+      if (typeof item.caption === "string") {
+        validatedItem.caption = item.caption;
+      }
+      if (Array.isArray(item.children)) {
+        const validChildren = item.children.map(validateItem).filter((child) => child !== null);
+        if (validChildren.length > 0) {
+          validatedItem.children = validChildren;
+        }
+      }
+      if (item.lazy === true) {
+        validatedItem.lazy = true;
+        if (!validatedItem.children) {
+          validatedItem.children = [loadingPlaceholder(validatedItem.id)];
+        }
+      }
+      return validatedItem;
+    };
+    return items.map(validateItem).filter((item) => item !== null);
+  };
+  var validatePatch = (ops) => {
+    if (!Array.isArray(ops)) {
+      return [];
+    }
+    const isParent = (value) => value === null || typeof value === "string";
+    const index = (value) => typeof value === "number" ? value : void 0;
+    const validOps = [];
+    for (const op of ops) {
+      if (op?.op === "insert" && isParent(op.parent)) {
+        validOps.push({
+          op: "insert",
+          parent: op.parent,
+          index: index(op.index),
+          items: validateTreeItems(op.items)
+        });
+      } else if (op?.op === "remove") {
+        validOps.push({ op: "remove", ids: parseStringArray(op.ids) });
+      } else if (op?.op === "move" && typeof op.id === "string" && isParent(op.parent)) {
+        validOps.push({ op: "move", id: op.id, parent: op.parent, index: index(op.index) });
+      } else if (op?.op === "children" && isParent(op.parent)) {
+        validOps.push({
+          op: "children",
+          parent: op.parent,
+          ids: parseStringArray(op.ids),
+          items: validateTreeItems(op.items)
+        });
+      } else if (op?.op === "set" && typeof op.id === "string") {
+        const validOp = { op: "set", id: op.id };
+        if (typeof op.label === "string")
+          validOp.label = op.label;
+        if (typeof op.caption === "string")
+          validOp.caption = op.caption;
+        if (typeof op.disabled === "boolean")
+          validOp.disabled = op.disabled;
+        if (typeof op.lazy === "boolean")
+          validOp.lazy = op.lazy;
+        validOps.push(validOp);
+      }
+    }
+    return validOps;
+  };
   if (window.Shiny) {
     class ShinyTreeViewBinding extends window.Shiny.InputBinding {
       constructor() {
         super(...arguments);
         this.boundElementValues = /* @__PURE__ */ new WeakMap();
         this.boundElementRoots = /* @__PURE__ */ new WeakMap();
+        this.boundElementHandles = /* @__PURE__ */ new WeakMap();
       }
       find(scope) {
         return $(scope).find(".shiny-treeview");
@@ -43063,52 +43433,84 @@ For example, \`@sm\` or \`@600\` or \`@40rem/sidebar\`.` : formatMuiErrorMessage
           console.error(`No configuration script found for treeview ${el.id}`);
           return;
         }
-        const parseStringArray = (value, fallback = []) => {
-          if (Array.isArray(value)) {
-            return value.filter((item) => typeof item === "string");
-          }
-          return fallback;
-        };
-        const validateTreeItems = (items2) => {
-          if (!Array.isArray(items2)) {
+        const decodeColumns = (columns) => {
+          const ids = columns?.ids;
+          const labels = columns?.labels;
+          const labelTable = columns?.label_table;
+          const parents = columns?.parents;
+          if (!Array.isArray(ids) || !Array.isArray(labels) || !Array.isArray(labelTable) || !Array.isArray(parents) || labels.length !== ids.length || parents.length !== ids.length) {
             return [];
           }
-          const validateItem = (item) => {
-            if (!item || typeof item !== "object")
-              return null;
-            if (typeof item.id !== "string" || typeof item.label !== "string")
-              return null;
-            const validatedItem = {
-              id: item.id,
-              label: item.label
-            };
-            if (typeof item.disabled === "boolean") {
-              validatedItem.disabled = item.disabled;
+          const nodes = new Array(ids.length);
+          const roots = [];
+          for (let i = 0; i < ids.length; i++) {
+            const id = ids[i];
+            const label = labelTable[labels[i]];
+            const parent = parents[i];
+            if (typeof id !== "string" || typeof label !== "string") {
+              nodes[i] = null;
+              continue;
+            }
+            const node2 = { id, label };
+            nodes[i] = node2;
+            if (typeof parent === "number" && parent >= 0 && parent < i) {
+              const parentNode = nodes[parent];
+              if (parentNode) {
+                if (!parentNode.children) {
+                  parentNode.children = [];
+                }
+                parentNode.children.push(node2);
+              } else {
+                nodes[i] = null;
+              }
+            } else {
+              roots.push(node2);
             }
-            if (typeof item.caption === "string") {
-              validatedItem.caption = item.caption;
+          }
+          const captions = columns?.captions;
+          if (captions && typeof captions === "object") {
+            for (const [key, caption] of Object.entries(captions)) {
+              const node2 = nodes[Number(key)];
+              if (node2 && typeof caption === "string") {
+                node2.caption = caption;
+              }
             }
-            if (Array.isArray(item.children)) {
-              const validChildren = item.children.map(validateItem).filter((child) => child !== null);
-              if (validChildren.length > 0) {
-                validatedItem.children = validChildren;
+          }
+          const disabled = columns?.disabled;
+          if (Array.isArray(disabled)) {
+            for (const position of disabled) {
+              const node2 = nodes[position];
+              if (node2) {
+                node2.disabled = true;
               }
             }
-            return validatedItem;
-          };
-          return items2.map(validateItem).filter((item) => item !== null);
+          }
+          const lazy = columns?.lazy;
+          if (Array.isArray(lazy)) {
+            for (const position of lazy) {
+              const node2 = nodes[position];
+              if (node2) {
+                node2.lazy = true;
+                if (!node2.children) {
+                  node2.children = [loadingPlaceholder(node2.id)];
+                }
+              }
+            }
+          }
+          return roots;
         };
         let config;
         try {
           const rawConfig = JSON.parse(configScript.textContent || "{}");
           config = {
-            items: validateTreeItems(rawConfig?.items ?? []),
+            items: rawConfig?.columns ? decodeColumns(rawConfig.columns) : validateTreeItems(rawConfig?.items ?? []),
             selected: parseStringArray(rawConfig?.selected ?? []),
             expanded: parseStringArray(rawConfig?.expanded ?? []),
             multiple: Boolean(rawConfig?.multiple),
             checkbox: Boolean(rawConfig?.checkbox)
           };
-          if (Array.isArray(rawConfig?.items) && rawConfig.items.length > 0 && config.items.length === 0) {
+          const rawItems = rawConfig?.columns ? rawConfig.columns.ids : rawConfig?.items;
+          if (Array.isArray(rawItems) && rawItems.length > 0 && config.items.length === 0) {
             console.warn("All tree items failed validation - check item structure (id and label are required)");
           }
         } catch (e) {
@@ -43126,17 +43528,49 @@ For example, \`@sm\` or \`@600\` or \`@40rem/sidebar\`.` : formatMuiErrorMessage
           this.boundElementValues.set(el, value);
           callback(allowDeferred || false);
         };
+        const requestChildren = (itemId) => {
+          window.Shiny.setInputValue(`${el.id}_load`, itemId, { priority: "event" });
+        };
         const root = (0, import_client.createRoot)(el);
         this.boundElementRoots.set(el, root);
+        const handle = import_react9.default.createRef();
+        this.boundElementHandles.set(el, handle);
         root.render(import_react9.default.createElement(ShinyTreeView, {
+          ref: handle,
           items,
           selected,
           expanded,
           multiple,
           checkbox,
-          updateShinyValue: updateValue
+          updateShinyValue: updateValue,
+          requestChildren
         }));
       }
+      receiveMessage(el, data) {
+        const handle = this.boundElementHandles.get(el)?.current;
+        if (!handle) {
+          return;
+        }
+        if (Array.isArray(data?.items)) {
+          handle.setItems(validateTreeItems(data.items));
+        }
+        if (Array.isArray(data?.patch)) {
+          handle.applyPatch(validatePatch(data.patch));
+        }
+        if (data?.load && typeof data.load.id === "string") {
+          if (data.load.error === true) {
+            handle.loadFailed(data.load.id);
+          } else {
+            handle.loadChildren(data.load.id, validateTreeItems(data.load.items));
+          }
+        }
+        if (Array.isArray(data?.selected)) {
+          handle.setSelected(parseStringArray(data.selected));
+        }
+        if (Array.isArray(data?.expanded)) {
+          handle.setExpanded(parseStringArray(data.expanded));
+        }
+      }
       unsubscribe(el) {
         const root = this.boundElementRoots.get(el);
         if (root) {
@@ -43144,6 +43578,7 @@ For example, \`@sm\` or \`@600\` or \`@40rem/sidebar\`.` : formatMuiErrorMessage
           this.boundElementRoots.delete(el);
         }
         this.boundElementValues.delete(el);
+        this.boundElementHandles.delete(el);
       }
     }
     window.Shiny.inputBindings.register(new ShinyTreeViewBinding(), "shiny-treeview-binding");
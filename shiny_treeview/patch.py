@@ -0,0 +1,478 @@
+"""Incremental updates of tree data shown in the browser."""
+
+from bisect import bisect_left
+from typing import Callable, Iterable, Optional, Union
+from weakref import WeakKeyDictionary
+
+from shiny.session import Session
+
+from .serialize import _loads
+from .table import TreeTable
+from .tree import TreeItem
+
+# The fields of a node that can change without moving it
+_FIELD_NAMES = ("label", "caption", "disabled", "lazy")
+_NO_EXTRAS = ("", False, False)
+
+# Largest number of insert and move operations sent for the children of one node.
+# Beyond it, the new order of the children is sent instead, which the browser
+# applies in a single pass.
+_MAX_SIBLING_OPS = 16
+
+# Tree data last sent to each treeview, by root session and resolved input id. A
+# treeview rendered by input_treeview() holds the serialized items field it was
+# sent, which is only parsed into a snapshot when the tree is first changed.
+_tree_states: "WeakKeyDictionary[Session, dict[str, Union[_TreeState, str]]]" = (
+    WeakKeyDictionary()
+)
+
+
+# Operations waiting to be sent at the next flush, by root session and resolved
+# input id
+_pending_ops: "WeakKeyDictionary[Session, dict[str, list[dict]]]" = WeakKeyDictionary()
+
+
+class _TreeState:
+    """
+    Snapshot of the tree data shown by a treeview.
+
+    Nodes are stored by id, so the snapshot is not affected by later changes to
+    the TreeItem objects it was created from. It is updated in place as changes
+    are sent to the browser.
+    """
+
+    __slots__ = ("fields", "parents", "children")
+
+    def __init__(self):
+        self.fields: dict[str, tuple[str, str, bool, bool]] = {}
+        self.parents: dict[str, Optional[str]] = {}
+        self.children: dict[Optional[str], list[str]] = {}
+
+    @classmethod
+    def from_items(cls, items: Union[list[TreeItem], TreeTable]) -> "_TreeState":
+        state = cls()
+        if isinstance(items, TreeTable):
+            ids = items.ids
+            for i, id in enumerate(ids):
+                parent = items.parents[i]
+                parent_id = ids[parent] if parent >= 0 else None
+                state.fields[id] = (
+                    items.labels[i],
+                    items.captions[i],
+                    items.is_disabled(i),
+                    items.is_lazy(i),
+                )
+                state.parents[id] = parent_id
+                state.children.setdefault(parent_id, []).append(id)
+        else:
+            state.insert(None, items)
+        return state
+
+    @classmethod
+    def from_json(cls, items_field: str) -> "_TreeState":
+        """Create a snapshot from an items field made by `_items_field()`."""
+        data = _loads(f"{{{items_field}}}")
+        state = cls()
+        fields, parents, children = state.fields, state.parents, state.children
+
+        if "columns" in data:
+            columns = data["columns"]
+            ids, label_table = columns["ids"], columns["label_table"]
+            captions = columns["captions"]
+            disabled, lazy = set(columns["disabled"]), set(columns["lazy"])
+            # Nodes are in breadth-first order, so siblings are added in order
+            for i, (id, label, parent) in enumerate(
+                zip(ids, columns["labels"], columns["parents"])
+            ):
+                parent_id = ids[parent] if parent >= 0 else None
+                fields[id] = (
+                    label_table[label],
+                    captions.get(str(i), ""),
+                    i in disabled,
+                    i in lazy,
+                )
+                parents[id] = parent_id
+                children.setdefault(parent_id, []).append(id)
+            return state
+
+        stack: list[tuple[Optional[str], list[dict]]] = [(None, data["items"])]
+        while stack:
+            parent_id, nodes = stack.pop()
+            children[parent_id] = ids = [node["id"] for node in nodes]
+            parents.update(dict.fromkeys(ids, parent_id))
+            for id, node in zip(ids, nodes):
+                # Most nodes only have an id and a label
+                if len(node) == 2:
+                    fields[id] = (node["label"], "", False, False)
+                    continue
+                fields[id] = (
+                    node["label"],
+                    node.get("caption", ""),
+                    node.get("disabled", False),
+                    node.get("lazy", False),
+                )
+                if "children" in node:
+                    stack.append((id, node["children"]))
+        if not children[None]:
+            del children[None]
+        return state
+
+    def roots(self) -> list[str]:
+        return self.children.get(None, [])
+
+    def insert(
+        self,
+        parent_id: Optional[str],
+        items: list[TreeItem],
+        index: Optional[int] = None,
+    ) -> None:
+        """Insert subtrees among the children of a node (or the roots)."""
+        if not items:
+            return
+
+        siblings = self.children.setdefault(parent_id, [])
+        new_ids = [item.id for item in items]
+        if index is None:
+            siblings.extend(new_ids)
+        else:
+            siblings[index:index] = new_ids
+
+        fields, parents, children = self.fields, self.parents, self.children
+        stack = [(parent_id, items)]
+        while stack:
+            parent_id, items = stack.pop()
+            for item in items:
+                fields[item.id] = (item.label,) + (item._extras or _NO_EXTRAS)
+                parents[item.id] = parent_id
+                if item._children:
+                    children[item.id] = [child.id for child in item._children]
+                    stack.append((item.id, item._children))
+
+    def remove(self, ids: Iterable[str]) -> None:
+        """Remove nodes and their descendants."""
+        # Detach the nodes, filtering the children of each parent once
+        by_parent: dict[Optional[str], set[str]] = {}
+        for id in ids:
+            if id in self.parents:
+                by_parent.setdefault(self.parents[id], set()).add(id)
+        for parent_id, group in by_parent.items():
+            siblings = [id for id in self.children[parent_id] if id not in group]
+            if siblings:
+                self.children[parent_id] = siblings
+            else:
+                del self.children[parent_id]
+
+        for group in by_parent.values():
+            stack = list(group)
+            while stack:
+                node_id = stack.pop()
+                if self.fields.pop(node_id, None) is None:
+                    continue  # inside another removed node
+                del self.parents[node_id]
+                stack.extend(self.children.pop(node_id, ()))
+
+    def descendants(self, id: str) -> list[str]:
+        """Get the IDs of the descendants of a node."""
+        result: list[str] = []
+        stack = [id]
+        while stack:
+            children = self.children.get(stack.pop(), ())
+            result.extend(children)
+            stack.extend(children)
+        return result
+
+    def move(self, id: str, parent_id: Optional[str], index: Optional[int]) -> None:
+        """Move a node (and its descendants) among the children of another node."""
+        self._detach(id)
+        self.parents[id] = parent_id
+        siblings = self.children.setdefault(parent_id, [])
+        siblings.insert(len(siblings) if index is None else index, id)
+
+    def update(self, id: str, **values) -> None:
+        """Change the fields of a node."""
+        fields = dict(zip(_FIELD_NAMES, self.fields[id]))
+        fields.update(values)
+        self.fields[id] = tuple(fields[name] for name in _FIELD_NAMES)
+
+    def _detach(self, id: str) -> None:
+        parent_id = self.parents[id]
+        siblings = self.children[parent_id]
+        siblings.remove(id)
+        if not siblings:
+            del self.children[parent_id]
+
+    def to_dicts(
+        self, ids: list[str], keep: Optional[Callable[[str], bool]] = None
+    ) -> list[dict]:
+        """
+        Serialize subtrees like `TreeItem._to_dict()`.
+
+        If `keep` is given, only descendants for which it returns True are kept.
+        """
+        result: list[dict] = []
+        stack = [(id, result) for id in reversed(ids)]
+        while stack:
+            id, out = stack.pop()
+            label, caption, disabled, lazy = self.fields[id]
+
+            node: dict = {"id": id, "label": label}
+            if caption:
+                node["caption"] = caption
+            if disabled:
+                node["disabled"] = True
+            if lazy:
+                node["lazy"] = True
+            out.append(node)
+
+            children = self.children.get(id)
+            if children and keep is not None:
+                children = [child for child in children if keep(child)]
+            if children:
+                node["children"] = child_dicts = []
+                stack.extend((child, child_dicts) for child in reversed(children))
+
+        return result
+
+
+def _session_states(session: Session) -> dict[str, Union[_TreeState, str]]:
+    """Get the tree data last sent to each treeview of a session."""
+    return _tree_states.setdefault(session.root_scope(), {})
+
+
+def _session_state(session: Session, id: str) -> Optional[_TreeState]:
+    """
+    Get the snapshot of the tree data last sent to a treeview, if it is tracked.
+
+    The snapshot of a rendered treeview is built from its serialized items the
+    first time it is needed.
+    """
+    states = _session_states(session)
+    state = states.get(id)
+    if isinstance(state, str):
+        state = states[id] = _TreeState.from_json(state)
+    return state
+
+
+def _session_pending_ops(session: Session) -> dict[str, list[dict]]:
+    """Get the operations waiting to be sent to each treeview of a session."""
+    return _pending_ops.setdefault(session.root_scope(), {})
+
+
+def _keep_loaded_children(old: _TreeState, new: _TreeState) -> None:
+    """
+    Keep the children of lazy items that new tree data leaves out.
+
+    A lazy item without children stands for children that are loaded on demand,
+    so the children already loaded in the browser are copied into the new
+    snapshot rather than removed. They are left out if any of their IDs is used
+    elsewhere in the new tree.
+    """
+    for id, fields in list(new.fields.items()):
+        if not fields[3] or id in new.children or id not in old.children:
+            continue
+        subtree = old.descendants(id)
+        if any(node_id in new.parents for node_id in subtree):
+            continue
+        new.children[id] = list(old.children[id])
+        for node_id in subtree:
+            new.fields[node_id] = old.fields[node_id]
+            new.parents[node_id] = old.parents[node_id]
+            if node_id in old.children:
+                new.children[node_id] = list(old.children[node_id])
+
+
+def _diff(old: _TreeState, new: _TreeState) -> list[dict]:
+    """
+    Compute the operations that turn one tree into another.
+
+    The operations are applied in order by the browser:
+
+    - `{"op": "remove", "ids": [...]}` removes nodes and their descendants.
+    - `{"op": "insert", "parent": id, "index": i, "items": [...]}` inserts new
+      subtrees among the children of a node (`parent` is None for roots).
+    - `{"op": "move", "id": id, "parent": id, "index": i}` moves a node. The index
+      refers to the children of the new parent after the node was removed.
+    - `{"op": "children", "parent": id, "ids": [...], "items": [...]}` puts nodes
+      among the children of a node in the given order, before any other children
+      (which are moved elsewhere by later operations). `items` holds the subtrees
+      of the nodes that are new, and the others are moved from their parent.
+    - `{"op": "set", "id": id, ...}` changes the label, caption, disabled or lazy
+      fields of a node.
+
+    The new tree is visited once from the roots, so that every parent is in its
+    final place before its children are arranged. Within each list of children,
+    the longest run of nodes that keep their relative order stays in place, and
+    only the other nodes are inserted or moved. When that takes more than a few
+    operations, a single `children` operation is sent instead.
+    """
+    ops: list[dict] = []
+    old_parents, new_parents = old.parents, new.parents
+
+    # Remove the topmost nodes that no longer exist
+    removed = [
+        id
+        for id, parent_id in old_parents.items()
+        if id not in new_parents and (parent_id is None or parent_id in new_parents)
+    ]
+    if removed:
+        ops.append({"op": "remove", "ids": removed})
+
+    # Descendants of removed nodes are removed with them, so any that are kept in
+    # the new tree must be inserted again
+    dropped: set[str] = set()
+    stack = [child for id in removed for child in old.children.get(id, ())]
+    while stack:
+        id = stack.pop()
+        if id in new_parents:
+            dropped.add(id)
+        stack.extend(old.children.get(id, ()))
+
+    # Children of each node in the browser as the operations are applied. They are
+    # only tracked for nodes that change, in dicts so that moved nodes are removed
+    # from their old parent in constant time.
+    current: dict[Optional[str], dict[str, None]] = {}
+
+    def is_new(id: str) -> bool:
+        return id not in old_parents or id in dropped
+
+    def current_children(parent_id: Optional[str]) -> dict[str, None]:
+        if parent_id not in current:
+            current[parent_id] = dict.fromkeys(
+                id
+                for id in old.children.get(parent_id, ())
+                if id in new_parents and id not in dropped
+            )
+        return current[parent_id]
+
+    queue: list[Optional[str]] = [None]
+    for parent_id in queue:
+        target = new.children.get(parent_id, [])
+        queue.extend(target)
+
+        if (
+            parent_id not in current
+            and (parent_id is None or not is_new(parent_id))
+            and old.children.get(parent_id, []) == target
+        ):
+            continue
+
+        siblings = list(current_children(parent_id))
+        if siblings == target:
+            continue
+
+        positions = {id: i for i, id in enumerate(siblings)}
+        in_place = _longest_increasing(
+            [positions[id] for id in target if id in positions]
+        )
+        stable = {siblings[i] for i in in_place}
+
+        # Nodes are placed in target order, each after the previous one, so the
+        # index of the next one is the number placed so far plus the siblings
+        # skipped before them, which are still to be moved (or left for another
+        # parent). Indices are counted rather than looked up in the list.
+        sibling_ops: list[dict] = []
+        skipped: set[str] = set()
+        placed: set[str] = set()
+        next_sibling = 0
+        i = 0
+        while i < len(target):
+            id = target[i]
+            if id in stable:
+                while siblings[next_sibling] != id:
+                    if siblings[next_sibling] not in placed:
+                        skipped.add(siblings[next_sibling])
+                    next_sibling += 1
+                next_sibling += 1
+                i += 1
+            elif is_new(id):
+                # Insert consecutive new siblings together, with their new descendants
+                j = i + 1
+                while j < len(target) and is_new(target[j]) and target[j] not in stable:
+                    j += 1
+                group = target[i:j]
+                sibling_ops.append(
+                    {
+                        "op": "insert",
+                        "parent": parent_id,
+                        "index": i + len(skipped),
+                        "items": group,
+                    }
+                )
+
+                stack = list(group)
+                while stack:
+                    node_id = stack.pop()
+                    children = [x for x in new.children.get(node_id, ()) if is_new(x)]
+                    current[node_id] = dict.fromkeys(children)
+                    stack.extend(children)
+                i = j
+            else:
+                source = old_parents[id]
+                if source != parent_id:
+                    del current_children(source)[id]
+                skipped.discard(id)
+                placed.add(id)
+                sibling_ops.append(
+                    {
+                        "op": "move",
+                        "id": id,
+                        "parent": parent_id,
+                        "index": i + len(skipped),
+                    }
+                )
+                i += 1
+
+        if len(sibling_ops) > _MAX_SIBLING_OPS:
+            # Send the new order at once rather than many small changes
+            sibling_ops = [
+                {
+                    "op": "children",
+                    "parent": parent_id,
+                    "ids": target,
+                    "items": [
+                        id for id in target if is_new(id) and id not in positions
+                    ],
+                }
+            ]
+        for op in sibling_ops:
+            if "items" in op:
+                op["items"] = new.to_dicts(op["items"], keep=is_new)
+        ops.extend(sibling_ops)
+
+    # Change the fields of nodes that were kept
+    for id, fields in new.fields.items():
+        old_fields = old.fields.get(id)
+        if old_fields is not None and old_fields != fields and id not in dropped:
+            op: dict = {"op": "set", "id": id}
+            for name, old_value, value in zip(_FIELD_NAMES, old_fields, fields):
+                if old_value != value:
+                    op[name] = value
+            ops.append(op)
+
+    return ops
+
+
+def _longest_increasing(values: list[int]) -> list[int]:
+    """Find a longest strictly increasing subsequence of distinct integers."""
+    tails: list[int] = []  # smallest tail value of an increasing run of each length
+    tail_indices: list[int] = []
+    previous = [-1] * len(values)
+
+    for i, value in enumerate(values):
+        length = bisect_left(tails, value)
+        if length:
+            previous[i] = tail_indices[length - 1]
+        if length == len(tails):
+            tails.append(value)
+            tail_indices.append(i)
+        else:
+            tails[length] = value
+            tail_indices[length] = i
+
+    result = []
+    i = tail_indices[-1] if tail_indices else -1
+    while i >= 0:
+        result.append(values[i])
+        i = previous[i]
+    result.reverse()
+    return result
@@ -0,0 +1,208 @@
+"""Serialization of tree data for sending to the browser."""
+
+import json
+from json.encoder import encode_basestring as _encode
+from typing import Any, Optional, Union
+
+from .table import TreeTable
+from .tree import TreeItem
+
+# Use a fast JSON library when available. Tree items are streamed separately,
+# because the standard library's C string encoder is fastest for single strings.
+try:
+    import orjson
+
+    def _dumps(obj: Any) -> str:
+        """Serialize an object to compact JSON using orjson."""
+        return orjson.dumps(obj).decode()
+
+    _loads = orjson.loads
+
+except ImportError:
+    try:
+        import msgspec
+
+        _msgspec_encode = msgspec.json.Encoder().encode
+
+        def _dumps(obj: Any) -> str:
+            """Serialize an object to compact JSON using msgspec."""
+            return _msgspec_encode(obj).decode()
+
+        _loads = msgspec.json.Decoder().decode
+
+    except ImportError:
+
+        def _dumps(obj: Any) -> str:
+            """Serialize an object to compact JSON using the standard library."""
+            return json.dumps(obj, ensure_ascii=False, separators=(",", ":"))
+
+        _loads = json.loads
+
+
+def _escape_script(text: str) -> str:
+    """
+    Escape JSON for embedding inside a `<script>` element.
+
+    A `<` can only appear inside JSON strings, where the `\\u003c` escape decodes
+    to the same character. This prevents `</script>` and `<!--` in labels from
+    ending or altering the script element.
+    """
+    return text.replace("<", "\\u003c")
+
+
+def _items_json(items: Union[list[TreeItem], TreeTable]) -> str:
+    """
+    Serialize tree data to a JSON array.
+
+    The tree is walked iteratively and written straight into an output buffer,
+    so no intermediate dictionaries are created and deep trees do not hit the
+    recursion limit. The output is compact UTF-8 JSON, equivalent to
+    `json.dumps([x._to_dict() for x in items], ensure_ascii=False,
+    separators=(",", ":"))`.
+    """
+    if isinstance(items, TreeTable):
+        return _table_json(items)
+
+    out = ["["]
+    write = out.append
+    stack = [iter(items)]
+    first = True
+
+    while stack:
+        for item in stack[-1]:
+            head = f'{{"id":{_encode(item.id)},"label":{_encode(item.label)}'
+            write(head if first else "," + head)
+
+            extras = item._extras
+            if extras is not None:
+                if extras[0]:
+                    write(f',"caption":{_encode(extras[0])}')
+                if extras[1]:
+                    write(',"disabled":true')
+                if extras[2]:
+                    write(',"lazy":true')
+
+            if item._children:
+                write(',"children":[')
+                stack.append(iter(item._children))
+                first = True
+                break
+
+            write("}")
+            first = False
+        else:
+            # Close the current list, and the item that owns it (if any)
+            stack.pop()
+            write("]}" if stack else "]")
+            first = False
+
+    return "".join(out)
+
+
+def _table_json(table: TreeTable) -> str:
+    """Serialize a TreeTable to a JSON array, matching `_items_json()`."""
+    ids, labels, captions = table.ids, table.labels, table.captions
+    offsets = table.child_offsets
+
+    out = ["["]
+    write = out.append
+    stack = [iter(table.roots)]
+    first = True
+
+    while stack:
+        for i in stack[-1]:
+            head = f'{{"id":{_encode(ids[i])},"label":{_encode(labels[i])}'
+            write(head if first else "," + head)
+
+            if captions[i]:
+                write(f',"caption":{_encode(captions[i])}')
+            if table.is_disabled(i):
+                write(',"disabled":true')
+            if table.is_lazy(i):
+                write(',"lazy":true')
+
+            if offsets[i] < offsets[i + 1]:
+                write(',"children":[')
+                stack.append(iter(range(offsets[i], offsets[i + 1])))
+                first = True
+                break
+
+            write("}")
+            first = False
+        else:
+            stack.pop()
+            write("]}" if stack else "]")
+            first = False
+
+    return "".join(out)
+
+
+def _columns_json(items: Union[list[TreeItem], TreeTable]) -> str:
+    """
+    Serialize tree data to a compact columnar JSON object.
+
+    Instead of nested objects that repeat the same keys for every node, the tree
+    is sent as parallel arrays in breadth-first order (so parents always precede
+    their children):
+
+    - `ids`: the id of each node.
+    - `labels`: an index into `label_table` for each node, so that repeated
+      labels are only sent once.
+    - `parents`: the position of the parent of each node, or -1 for roots.
+    - `captions`: an object mapping positions to non-empty captions.
+    - `disabled`: the positions of disabled nodes.
+    - `lazy`: the positions of nodes whose children are loaded on demand.
+    """
+    table = items if isinstance(items, TreeTable) else TreeTable.from_items(items)
+
+    label_table: dict[str, int] = {}
+    label_codes = [label_table.setdefault(x, len(label_table)) for x in table.labels]
+    captions = {str(i): x for i, x in enumerate(table.captions) if x}
+    disabled = [i for i in range(len(table)) if table.is_disabled(i)]
+    lazy = [i for i in range(len(table)) if table.is_lazy(i)]
+
+    return (
+        f'{{"ids":{_dumps(table.ids)},'
+        f'"labels":{_dumps(label_codes)},'
+        f'"label_table":{_dumps(list(label_table))},'
+        f'"parents":{_dumps(table.parents.tolist())},'
+        f'"captions":{_dumps(captions)},'
+        f'"disabled":{_dumps(disabled)},'
+        f'"lazy":{_dumps(lazy)}}}'
+    )
+
+
+def _items_field(
+    items: Union[list[TreeItem], TreeTable],
+    columnar: bool,
+    items_json: Optional[str] = None,
+) -> str:
+    """
+    Serialize tree data to the items field of the treeview configuration.
+
+    The field is escaped for a `<script>` element, so that it can be stored and
+    spliced into many payloads with `_splice_payload()`. The output of
+    `_items_json()` is reused if given, unless the field is columnar.
+    """
+    if columnar:
+        return _escape_script(f'"columns":{_columns_json(items)}')
+    if items_json is None:
+        items_json = _items_json(items)
+    return _escape_script(f'"items":{items_json}')
+
+
+def _splice_payload(
+    items_field: str,
+    selected: list[str],
+    expanded: list[str],
+    multiple: bool,
+    checkbox: bool,
+) -> str:
+    """Combine a serialized items field with the rest of the configuration."""
+    state = _escape_script(
+        f'"selected":{_dumps(selected)},'
+        f'"expanded":{_dumps(expanded)},'
+        f'"multiple":{_dumps(multiple)},'
+        f'"checkbox":{_dumps(checkbox)}'
+    )
+    return f"{{{items_field},{state}}}"
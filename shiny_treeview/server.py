@@ -0,0 +1,541 @@
+"""Server functions for shiny-treeview."""
+
+import inspect
+import logging
+from typing import Awaitable, Callable, Container, Optional, TypeVar, Union
+
+from shiny import reactive
+from shiny.session import Session, require_active_session
+from shiny.types import SilentCancelOutputException, SilentException
+
+from .patch import (
+    _diff,
+    _keep_loaded_children,
+    _session_pending_ops,
+    _session_state,
+    _session_states,
+    _TreeState,
+)
+from .table import TreeTable
+from .traversal import walk
+from .tree import TreeItem
+from .utils import TreeIndex, _get_id, validate_tree
+
+logger = logging.getLogger(__name__)
+
+LoaderT = TypeVar(
+    "LoaderT",
+    bound=Callable[[str], Union[list[TreeItem], Awaitable[list[TreeItem]]]],
+)
+
+
+def treeview_loader(
+    id: str, *, session: Optional[Session] = None
+) -> Callable[[LoaderT], LoaderT]:
+    """
+    Load the children of lazy tree items on demand.
+
+    Decorate a function that takes the id of an expanded item and returns a list
+    of its children. The function is called the first time a user expands an item
+    created with `lazy=True`, and the children it returns are inserted into the
+    tree in the browser. Children can themselves be lazy, so only the visible part
+    of a large tree is ever sent to the browser.
+
+    Parameters
+    ----------
+    id : str
+        The id of the treeview input.
+    session : Session, optional
+        The Shiny session. If None (default), the current session is used.
+
+    Returns
+    -------
+    Callable
+        A decorator for a (sync or async) function that takes an item id and
+        returns a list of TreeItem objects.
+
+    Notes
+    -----
+    The id of each requested item is also available as the server value
+    `input.<id>_load()`.
+
+    If the function raises an exception or returns invalid items, the error is
+    logged and the item is collapsed in the browser, so that expanding it again
+    retries the load. When the tree data of the treeview is tracked (see
+    `input_treeview(track=True)`), the function is only called for its lazy items.
+
+    Examples
+    --------
+    ```python
+    from shiny import App, ui
+    from shiny_treeview import TreeItem, input_treeview, treeview_loader
+
+    app_ui = ui.page_fluid(
+        input_treeview("tree", [TreeItem("root", "📁 Root", lazy=True)])
+    )
+
+    def server(input, output, session):
+        @treeview_loader("tree")
+        def load_children(item_id: str) -> list[TreeItem]:
+            return [
+                TreeItem(f"{item_id}/folder", "📁 Folder", lazy=True),
+                TreeItem(f"{item_id}/file", "📄 File"),
+            ]
+
+    app = App(app_ui, server)
+    ```
+    """
+    active_session = require_active_session(session)
+    input_id = f"{id}_load"
+
+    def decorator(fn: LoaderT) -> LoaderT:
+        @reactive.effect
+        @reactive.event(active_session.input[input_id])
+        async def _load_children():
+            item_id = active_session.input[input_id]()
+            state = _session_state(active_session, active_session.ns(id))
+            # The ID comes from the browser, so only lazy items of a tracked tree
+            # are passed to the loader
+            fields = state.fields.get(item_id) if state is not None else None
+            if state is not None and not (fields and fields[3]):
+                _send_message(
+                    active_session, id, {"load": {"id": item_id, "error": True}}
+                )
+                return
+
+            try:
+                children = fn(item_id)
+                if inspect.isawaitable(children):
+                    children = await children
+                validate_tree(children)
+                if state is not None:
+                    # The loaded children replace any children the item already has
+                    _check_new_ids(state, children, set(state.descendants(item_id)))
+            except Exception as e:
+                # The browser shows the item as unloaded again, so it can be retried
+                if not isinstance(e, (SilentException, SilentCancelOutputException)):
+                    logger.exception(
+                        "Failed to load the children of TreeItem '%s' in treeview '%s'",
+                        item_id,
+                        id,
+                    )
+                _send_message(
+                    active_session, id, {"load": {"id": item_id, "error": True}}
+                )
+                return
+
+            # Keep the tree data used for diffing in sync with the browser
+            if state is not None:
+                state.remove(list(state.children.get(item_id, ())))
+                state.insert(item_id, children)
+
+            _send_message(
+                active_session,
+                id,
+                {
+                    "load": {
+                        "id": item_id,
+                        "items": [child._to_dict() for child in children],
+                    }
+                },
+            )
+
+        return fn
+
+    return decorator
+
+
+def update_treeview(
+    id: str,
+    *,
+    items: Optional[Union[list[TreeItem], TreeIndex, TreeTable]] = None,
+    selected: Optional[str | list[str]] = None,
+    expanded: Optional[str | list[str]] = None,
+    session: Optional[Session] = None,
+) -> None:
+    """
+    Change the items, selected items and expanded items of a treeview on the client.
+
+    The change is applied to the treeview in place, so the rest of the client state
+    is kept.
+
+    Parameters
+    ----------
+    id : str
+        The id of the treeview input.
+    items : list[TreeItem] | TreeIndex | TreeTable, optional
+        The new tree data. Only the differences from the tree data last sent to
+        this session are sent to the browser: inserted, removed, moved and changed
+        items. Selected and expanded items that still exist are kept. Lazy items
+        without children keep the children already loaded for them. If None
+        (default), the tree data is not changed.
+    selected : str | list[str], optional
+        The item ID(s) to select. Use an empty list to clear the selection. If None
+        (default), the selection is not changed.
+    expanded : str | list[str], optional
+        The item ID(s) to expand. All other items are collapsed. If None
+        (default), the expanded items are not changed.
+    session : Session, optional
+        The Shiny session. If None (default), the current session is used.
+
+    Notes
+    -----
+    The tree data is tracked per session when `input_treeview(track=True)` is
+    rendered inside a session (e.g., with `@render.ui`). Otherwise, the first
+    update sends the whole tree, and later updates only send the differences.
+
+    Examples
+    --------
+    ```python
+    from shiny import reactive
+    from shiny_treeview import update_treeview
+
+    @reactive.effect
+    @reactive.event(input.reset)
+    def _():
+        update_treeview("tree", selected=[], expanded=[])
+
+    @reactive.effect
+    def _():
+        reactive.invalidate_later(60)
+        update_treeview("tree", items=load_tree())
+    ```
+    """
+    active_session = require_active_session(session)
+
+    message: dict[str, object] = {}
+    if items is not None:
+        if isinstance(items, TreeIndex):
+            items = items.items
+        validate_tree(items)
+
+        key = active_session.ns(id)
+        new_state = _TreeState.from_items(items)
+        old_state = _session_state(active_session, key)
+        if old_state is None:
+            message["items"] = new_state.to_dicts(new_state.roots())
+        else:
+            _keep_loaded_children(old_state, new_state)
+            patch = _diff(old_state, new_state)
+            if patch:
+                message["patch"] = patch
+        _session_states(active_session)[key] = new_state
+
+    if selected is not None:
+        message["selected"] = _as_id_list(selected)
+    if expanded is not None:
+        message["expanded"] = _as_id_list(expanded)
+
+    if message:
+        _send_message(active_session, id, message)
+
+
+def insert_tree_items(
+    id: str,
+    parent_id: Optional[str],
+    items: list[TreeItem],
+    *,
+    index: Optional[int] = None,
+    session: Optional[Session] = None,
+) -> None:
+    """
+    Insert items into a treeview on the client.
+
+    Parameters
+    ----------
+    id : str
+        The id of the treeview input.
+    parent_id : str, optional
+        The ID of the item to insert the items under, or None to insert root items.
+    items : list[TreeItem]
+        The items to insert, with their descendants.
+    index : int, optional
+        The position among the children of the parent to insert the items at. If
+        None (default), the items are appended.
+    session : Session, optional
+        The Shiny session. If None (default), the current session is used.
+
+    Raises
+    ------
+    ValueError
+        If the items are not a valid tree, or the index is negative. If the tree
+        data of the treeview is tracked, also if the parent does not exist or an
+        item ID already exists.
+
+    See Also
+    --------
+    update_treeview : Replace all items, sending only the differences.
+
+    Notes
+    -----
+    Calls to `insert_tree_items()`, `remove_tree_items()`, `move_tree_item()` and
+    `set_tree_item()` made during the same reactive flush are sent to the browser
+    together in a single message, and applied in order.
+
+    When the tree data is tracked for the session (see `update_treeview()`), the
+    changes are checked against it and applied to it, so later calls to
+    `update_treeview(items=...)` are diffed against the changed tree. Otherwise,
+    changes that refer to missing items are ignored by the browser.
+
+    Examples
+    --------
+    ```python
+    from shiny import reactive
+    from shiny_treeview import TreeItem, insert_tree_items
+
+    @reactive.effect
+    @reactive.event(input.add)
+    def _():
+        insert_tree_items(
+            "tree", "logs", [TreeItem(f"log{input.add()}", "📄 New log")], index=0
+        )
+    ```
+    """
+    active_session = require_active_session(session)
+    _check_index(index)
+    validate_tree(items)
+
+    state = _session_state(active_session, active_session.ns(id))
+    if state is not None:
+        if parent_id is not None:
+            _check_exists(state, id, parent_id)
+        _check_new_ids(state, items)
+        state.insert(parent_id, items, index)
+
+    _queue_op(
+        active_session,
+        id,
+        {
+            "op": "insert",
+            "parent": parent_id,
+            "index": index,
+            "items": [item._to_dict() for item in items],
+        },
+    )
+
+
+def remove_tree_items(
+    id: str, ids: str | list[str], *, session: Optional[Session] = None
+) -> None:
+    """
+    Remove items and their descendants from a treeview on the client.
+
+    Selected and expanded items that are removed are deselected and collapsed.
+
+    Parameters
+    ----------
+    id : str
+        The id of the treeview input.
+    ids : str | list[str]
+        The ID(s) of the items to remove. IDs that do not exist are ignored.
+    session : Session, optional
+        The Shiny session. If None (default), the current session is used.
+
+    See Also
+    --------
+    insert_tree_items : Insert items, with notes on batching.
+    """
+    active_session = require_active_session(session)
+    item_ids = _as_id_list(ids)
+    if not item_ids:
+        return
+
+    state = _session_state(active_session, active_session.ns(id))
+    if state is not None:
+        state.remove(item_ids)
+
+    _queue_op(active_session, id, {"op": "remove", "ids": item_ids})
+
+
+def move_tree_item(
+    id: str,
+    item_id: str,
+    parent_id: Optional[str],
+    *,
+    index: Optional[int] = None,
+    session: Optional[Session] = None,
+) -> None:
+    """
+    Move an item and its descendants within a treeview on the client.
+
+    Parameters
+    ----------
+    id : str
+        The id of the treeview input.
+    item_id : str
+        The ID of the item to move.
+    parent_id : str, optional
+        The ID of the new parent, or None to make the item a root item.
+    index : int, optional
+        The position among the children of the new parent, not counting the item
+        itself. If None (default), the item is appended.
+    session : Session, optional
+        The Shiny session. If None (default), the current session is used.
+
+    Raises
+    ------
+    ValueError
+        If the index is negative. If the tree data of the treeview is tracked,
+        also if either item does not exist or the item would be moved into its
+        own subtree.
+
+    See Also
+    --------
+    insert_tree_items : Insert items, with notes on batching.
+    """
+    active_session = require_active_session(session)
+    _check_index(index)
+
+    state = _session_state(active_session, active_session.ns(id))
+    if state is not None:
+        _check_exists(state, id, item_id)
+        ancestor = parent_id
+        while ancestor is not None:
+            _check_exists(state, id, ancestor)
+            if ancestor == item_id:
+                raise ValueError(
+                    f"Cannot move TreeItem '{item_id}' into its own subtree"
+                )
+            ancestor = state.parents[ancestor]
+        state.move(item_id, parent_id, index)
+
+    _queue_op(
+        active_session,
+        id,
+        {"op": "move", "id": item_id, "parent": parent_id, "index": index},
+    )
+
+
+def set_tree_item(
+    id: str,
+    item_id: str,
+    *,
+    label: Optional[str] = None,
+    caption: Optional[str] = None,
+    disabled: Optional[bool] = None,
+    lazy: Optional[bool] = None,
+    session: Optional[Session] = None,
+) -> None:
+    """
+    Change the fields of an item in a treeview on the client.
+
+    Parameters
+    ----------
+    id : str
+        The id of the treeview input.
+    item_id : str
+        The ID of the item to change.
+    label : str, optional
+        The new label. If None (default), the label is not changed.
+    caption : str, optional
+        The new caption. Use an empty string to remove the caption. If None
+        (default), the caption is not changed.
+    disabled : bool, optional
+        Whether the item is disabled. If None (default), this is not changed.
+    lazy : bool, optional
+        Whether the children of the item are loaded on demand. If None (default),
+        this is not changed.
+    session : Session, optional
+        The Shiny session. If None (default), the current session is used.
+
+    Raises
+    ------
+    ValueError
+        If a field is invalid. If the tree data of the treeview is tracked, also
+        if the item does not exist.
+
+    See Also
+    --------
+    insert_tree_items : Insert items, with notes on batching.
+    """
+    active_session = require_active_session(session)
+
+    values: dict[str, object] = {}
+    if label is not None:
+        if not isinstance(label, str):
+            raise ValueError("TreeItem label must be a string")
+        if not label.strip():
+            raise ValueError("TreeItem label cannot be empty or whitespace only")
+        values["label"] = label
+    if caption is not None:
+        if not isinstance(caption, str):
+            raise ValueError("TreeItem caption must be a string")
+        values["caption"] = caption
+    if disabled is not None:
+        if not isinstance(disabled, bool):
+            raise ValueError("TreeItem disabled must be a boolean")
+        values["disabled"] = disabled
+    if lazy is not None:
+        if not isinstance(lazy, bool):
+            raise ValueError("TreeItem lazy must be a boolean")
+        values["lazy"] = lazy
+    if not values:
+        return
+
+    state = _session_state(active_session, active_session.ns(id))
+    if state is not None:
+        _check_exists(state, id, item_id)
+        state.update(item_id, **values)
+
+    _queue_op(active_session, id, {"op": "set", "id": item_id, **values})
+
+
+def _queue_op(session: Session, id: str, op: dict) -> None:
+    """Queue an operation, to be sent with the others at the next flush."""
+    pending = _session_pending_ops(session)
+    key = session.ns(id)
+    if key not in pending:
+        pending[key] = []
+
+        def send_pending():
+            ops = pending.pop(key, None)
+            if ops:
+                session.send_input_message(id, {"patch": ops})
+
+        session.on_flush(send_pending, once=True)
+
+    pending[key].append(op)
+
+
+def _send_message(session: Session, id: str, message: dict[str, object]) -> None:
+    """Send a message to a treeview, after any queued operations."""
+    ops = _session_pending_ops(session).pop(session.ns(id), None)
+    # Queued operations are moot when all items are replaced
+    if ops and "items" not in message:
+        message = {**message, "patch": ops + message.get("patch", [])}
+    session.send_input_message(id, message)
+
+
+def _check_index(index: Optional[int]) -> None:
+    if index is not None and (not isinstance(index, int) or index < 0):
+        raise ValueError("index must be a non-negative integer")
+
+
+def _check_exists(state: _TreeState, id: str, item_id: str) -> None:
+    if item_id not in state.parents:
+        raise ValueError(f"TreeItem '{item_id}' not found in treeview '{id}'")
+
+
+def _check_new_ids(
+    state: _TreeState, items: list[TreeItem], replaced: Container[str] = ()
+) -> None:
+    """
+    Check that new items do not reuse the IDs of items in the tracked tree.
+
+    IDs in `replaced` belong to items that the new items replace, so they can be
+    reused.
+    """
+    existing = [
+        x for x in map(_get_id, walk(items)) if x in state.parents and x not in replaced
+    ]
+    if existing:
+        raise ValueError(
+            f"Duplicate TreeItem IDs found: {existing}. All TreeItem IDs must be unique across the entire tree."
+        )
+
+
+def _as_id_list(ids: str | list[str]) -> list[str]:
+    """Normalize one or more item IDs to a list."""
+    if isinstance(ids, str):
+        return [ids] if ids else []
+    return list(ids)
@@ -1,14 +1,27 @@
 """Helper functions to convert flat data to hierarchical tree data."""
 
-from dataclasses import replace
-from typing import Optional
+import re
+import string
+from array import array
+from operator import itemgetter
+from typing import Any, Iterable, Optional, Union
 
-from .tree import TreeItem
+from .table import TreeTable
+from .tree import _ID_WHITESPACE, _NO_CHILDREN, TreeItem
+
+# Maximum number of item IDs shown in the error for a circular reference
+_MAX_CYCLE_IDS = 10
+
+# Children of fewer waiting items are gathered in Python rather than NumPy
+_MIN_VECTORIZED_ITEMS = 64
 
 
 def stratify_by_parent(
-    items: list[TreeItem], parent_ids: list[Optional[str]]
-) -> list[TreeItem]:
+    items: Union[list[TreeItem], TreeTable],
+    parent_ids: list[Optional[str]],
+    *,
+    copy: bool = True,
+) -> Union[list[TreeItem], TreeTable]:
     """
     Convert flat data to hierarchical tree data via parent-child relationships.
 
@@ -18,24 +31,32 @@ def stratify_by_parent(
 
     Parameters
     ----------
-    items : list[TreeItem]
-        List of TreeItem objects with empty children lists
+    items : list[TreeItem] | TreeTable
+        List of TreeItem objects with empty children lists, or a TreeTable whose
+        existing hierarchy is ignored.
     parent_ids : list[Optional[str]]
         List of parent IDs corresponding to each TreeItem. None indicates a root item.
         Must be the same length as items list.
+    copy : bool, default=True
+        Whether to link copies of the items, leaving the given items unchanged. If
+        False, the children of the given items are replaced, which avoids
+        allocating a second item for every row of large data. Ignored for a
+        TreeTable.
 
     Returns
     -------
-    list[TreeItem]
+    list[TreeItem] | TreeTable
         List of root TreeItem objects with populated children attributes.
-        All original attributes are preserved.
+        All original attributes are preserved, and the roots are the given items
+        if `copy` is False. If `items` is a TreeTable, a new TreeTable is returned
+        instead.
 
     Raises
     ------
     ValueError
         If items and parent_ids lists have different lengths.
         If a parent_id references a non-existent item.
-        If circular references are detected.
+        If circular references are detected. The message lists the IDs in the cycle.
 
     Examples
     --------
@@ -57,68 +78,1222 @@ def stratify_by_parent(
     # and grandchild as a child of child1
     ```
     """
-    if len(items) != len(parent_ids):
+    ids = items.ids if isinstance(items, TreeTable) else [item.id for item in items]
+    parent_positions = _validate_parent_ids(ids, parent_ids)
+
+    if isinstance(items, TreeTable):
+        return TreeTable._from_parent_positions(
+            items.ids,
+            items.labels,
+            items.captions,
+            [items.is_disabled(i) for i in range(len(items))],
+            parent_positions,
+            [items.is_lazy(i) for i in range(len(items))],
+        )
+
+    # Items were validated when created, so copies skip validation
+    nodes = [item._without_children() for item in items] if copy else items
+    if not copy:
+        for node in nodes:
+            node._children = _NO_CHILDREN
+
+    root_items = []
+    for node, parent_position in zip(nodes, parent_positions):
+        if parent_position < 0:
+            root_items.append(node)
+        else:
+            parent = nodes[parent_position]
+            if parent._children is _NO_CHILDREN:
+                parent._children = [node]
+            else:
+                parent._children.append(node)
+
+    return root_items
+
+
+def stratify_by_path(
+    paths: Iterable[str],
+    sep: str = "/",
+    labels: Optional[Iterable[str]] = None,
+    *,
+    table: bool = False,
+) -> Union[list[TreeItem], TreeTable]:
+    """
+    Convert delimited paths to hierarchical tree data.
+
+    Each path, such as `"bucket/2024/05/file.parquet"`, becomes an item whose
+    parent is the path without its last segment. Intermediate items, such as
+    `"bucket/2024"`, are created automatically.
+
+    Parameters
+    ----------
+    paths : Iterable[str]
+        Paths of the items, such as file names or object keys. Paths can be given
+        in any order, and can include intermediate items explicitly.
+    sep : str, default="/"
+        Separator between the segments of a path.
+    labels : Iterable[str], optional
+        Labels of the items with the given paths. By default, and for items
+        created automatically, the label is the last segment of the path.
+    table : bool, default=False
+        Whether to return a compact TreeTable rather than TreeItem objects.
+
+    Returns
+    -------
+    list[TreeItem] | TreeTable
+        List of root TreeItem objects with populated children attributes, or a
+        TreeTable if `table` is True. The ID of each item is its path, and
+        children are ordered by the first appearance of their paths.
+
+    Raises
+    ------
+    ValueError
+        If a path appears more than once.
+        If a path contains an empty segment (other than a leading separator).
+        If paths and labels have different lengths.
+
+    Notes
+    -----
+    Paths are stored once as the IDs of the items, and looked up by ID to find
+    the nearest existing ancestor, so memory is bounded by the size of the tree.
+    Paths can be streamed from a generator.
+
+    Paths are used as IDs, so they cannot contain whitespace. The IDs and labels
+    are validated by `input_treeview()`, or explicitly with `validate_tree()`.
+
+    Examples
+    --------
+    ```python
+    from shiny_treeview import stratify_by_path
+
+    tree = stratify_by_path([
+        "bucket/2024/05/data.parquet",
+        "bucket/2024/05/index.json",
+        "bucket/2024/06/data.parquet",
+    ])
+    # Result: a "bucket" root with a "bucket/2024" child, which has
+    # "bucket/2024/05" and "bucket/2024/06" children
+    ```
+    """
+    if not isinstance(sep, str) or not sep:
+        raise ValueError("sep must be a non-empty string")
+
+    # Position of each item by path, and the columns of the items
+    positions: dict[str, int] = {}
+    ids: list[str] = []
+    item_labels: list[str] = []
+    parent_positions: list[int] = []
+    given = bytearray()
+
+    def add_path(path: str) -> int:
+        # Find the nearest existing ancestor, then add the missing items below it
+        missing = [path]
+        parent_position = -1
+        while True:
+            head, found, _ = missing[-1].rpartition(sep)
+            if not found or not head:
+                break
+            position = positions.get(head)
+            if position is not None:
+                parent_position = position
+                break
+            missing.append(head)
+
+        for item_path in reversed(missing):
+            label = item_path.rpartition(sep)[2]
+            if not label:
+                raise ValueError(f"Path '{path}' contains an empty segment")
+            positions[item_path] = len(ids)
+            ids.append(item_path)
+            item_labels.append(label)
+            parent_positions.append(parent_position)
+            given.append(0)
+            parent_position = positions[item_path]
+        return parent_position
+
+    rows = (
+        zip(paths, labels, strict=True)
+        if labels is not None
+        else ((path, None) for path in paths)
+    )
+    try:
+        for path, label in rows:
+            position = positions.get(path)
+            if position is None:
+                position = add_path(path)
+            elif given[position]:
+                raise ValueError(f"Duplicate path '{path}'")
+            given[position] = 1
+            if label is not None:
+                item_labels[position] = label
+    except ValueError as e:
+        if str(e).startswith("zip()"):
+            raise ValueError("paths and labels must have the same length") from None
+        raise
+
+    n = len(ids)
+    if table:
+        return TreeTable._from_parent_positions(
+            ids, item_labels, [""] * n, [False] * n, parent_positions
+        )
+
+    return _link_items(ids, item_labels, parent_positions)
+
+
+def stratify_from_rows(
+    rows: Iterable[tuple[Any, Optional[str]]], *, copy: bool = True
+) -> list[TreeItem]:
+    """
+    Convert a stream of rows to hierarchical tree data via parent-child relationships.
+
+    Like `stratify_by_parent()`, but consumes the rows one at a time, such as from a
+    database cursor or a CSV reader, so the input is never held in memory. Children
+    may arrive before their parents: they are kept aside until their parent arrives.
+
+    Parameters
+    ----------
+    rows : Iterable[tuple[Any, Optional[str]]]
+        Pairs of an item and the ID of its parent, or None for a root item. The item
+        can be a TreeItem, a dictionary of `TreeItem` keyword arguments, or an
+        `(id, label)` sequence.
+    copy : bool, default=True
+        Whether to link copies of TreeItem objects, leaving the given items
+        unchanged. If False, the children of the given items are replaced.
+
+    Returns
+    -------
+    list[TreeItem]
+        List of root TreeItem objects with populated children attributes, in the
+        order the rows arrived. Children are also in the order their rows arrived.
+
+    Raises
+    ------
+    ValueError
+        If an item ID is repeated.
+        If a parent ID references an item that never arrives.
+        If circular references are detected. The message lists the IDs in the cycle.
+
+    Notes
+    -----
+    Items created from dictionaries and tuples skip validation. Their IDs and
+    labels are validated by `input_treeview()`, or explicitly with
+    `validate_tree()`.
+
+    Examples
+    --------
+    ```python
+    import csv
+    from shiny_treeview import input_treeview, stratify_from_rows
+
+    with open("org_chart.csv", newline="") as f:
+        rows = (
+            ((row["id"], row["name"]), row["manager_id"] or None)
+            for row in csv.DictReader(f)
+        )
+        tree = stratify_from_rows(rows)
+
+    input_treeview("org_chart", tree)
+    ```
+    """
+    nodes: dict[str, TreeItem] = {}
+    root_items: list[TreeItem] = []
+
+    # Items whose parent has not arrived yet, and the first row that referred to
+    # each missing parent, by parent ID
+    pending: dict[str, list[TreeItem]] = {}
+    first_rows: dict[str, int] = {}
+    adopted = False
+
+    for i, (fields, parent_id) in enumerate(rows):
+        node = _item_from_row(fields, copy)
+        if node.id in nodes:
+            raise ValueError(
+                f"All TreeItem IDs must be unique, but '{node.id}' at index {i} "
+                "is repeated"
+            )
+        nodes[node.id] = node
+
+        orphans = pending.pop(node.id, None)
+        if orphans is not None:
+            del first_rows[node.id]
+            node._children = orphans
+            adopted = True
+
+        if parent_id is None:
+            root_items.append(node)
+            continue
+        if parent_id == node.id:
+            _raise_cycle([node.id], 1)
+        parent = nodes.get(parent_id)
+        if parent is None:
+            orphans = pending.get(parent_id)
+            if orphans is None:
+                pending[parent_id] = [node]
+                first_rows[parent_id] = i
+            else:
+                orphans.append(node)
+        elif parent._children is _NO_CHILDREN:
+            parent._children = [node]
+        else:
+            parent._children.append(node)
+
+    if pending:
+        parent_id = min(first_rows, key=first_rows.__getitem__)
+        raise ValueError(
+            f"Parent ID '{parent_id}' at index {first_rows[parent_id]} does not "
+            "reference an existing item"
+        )
+
+    # A cycle needs an item that arrived before its parent, and is detached from
+    # the roots
+    if adopted and _count_items(root_items) != len(nodes):
+        _raise_detached_cycle(root_items, nodes)
+
+    return root_items
+
+
+class TreeBuilder:
+    """
+    Tree data that is kept up to date as rows are added and removed.
+
+    Like `stratify_from_rows()`, but the lookup of items by ID and the children of
+    each item are kept between calls. Adding or removing rows takes time
+    proportional to the change rather than to the whole tree, so a table that
+    mostly grows does not have to be stratified again on every refresh.
+
+    Parameters
+    ----------
+    rows : Iterable[tuple[Any, Optional[str]]], optional
+        Initial rows, as accepted by `add()`.
+
+    Notes
+    -----
+    `items` are the root items of the tree, which are changed in place by later
+    calls to `add()` and `remove()`. Removals from lists of children take effect
+    when `items` is next read. Pass them to `update_treeview()` after each change:
+    only the items that changed since the last update are sent to the browser.
+
+    Examples
+    --------
+    ```python
+    from shiny import reactive
+    from shiny_treeview import TreeBuilder, update_treeview
+
+    builder = TreeBuilder(fetch_rows(since=None))
+
+    @reactive.effect
+    @reactive.event(input.refresh)
+    def _():
+        builder.add(fetch_rows(since=last_refresh()))
+        builder.remove(fetch_deleted_ids(since=last_refresh()))
+        update_treeview("tree", items=builder.items)
+    ```
+    """
+
+    def __init__(self, rows: Optional[Iterable[tuple[Any, Optional[str]]]] = None):
+        self._items: list[TreeItem] = []
+        self._nodes: dict[str, TreeItem] = {}
+        self._parents: dict[str, Optional[str]] = {}
+        # The children of each item (None for roots) in dicts, which keep their
+        # order and remove items in constant time. The lists of children changed
+        # by removals are only updated from them when the items are read.
+        self._children: dict[Optional[str], dict[str, TreeItem]] = {}
+        self._changed: set[Optional[str]] = set()
+        if rows is not None:
+            self.add(rows)
+
+    @property
+    def items(self) -> list[TreeItem]:
+        """The root items of the tree."""
+        for parent_id in self._changed:
+            children = list(self._children.get(parent_id, {}).values())
+            if parent_id is None:
+                self._items[:] = children
+            elif parent_id in self._nodes:
+                self._nodes[parent_id]._children = children or _NO_CHILDREN
+        self._changed.clear()
+        return self._items
+
+    def __len__(self) -> int:
+        return len(self._nodes)
+
+    def __contains__(self, id: object) -> bool:
+        return id in self._nodes
+
+    def add(self, rows: Iterable[tuple[Any, Optional[str]]], *, copy: bool = True):
+        """
+        Add new items to the tree.
+
+        Each item is appended to the children of its parent, which can be an item
+        already in the tree or another of the new items, in any order.
+
+        Parameters
+        ----------
+        rows : Iterable[tuple[Any, Optional[str]]]
+            Pairs of an item and the ID of its parent, or None for a root item. The
+            item can be a TreeItem, a dictionary of `TreeItem` keyword arguments,
+            or an `(id, label)` sequence.
+        copy : bool, default=True
+            Whether to add copies of TreeItem objects, leaving the given items
+            unchanged. If False, the children of the given items are replaced.
+
+        Raises
+        ------
+        ValueError
+            If an item ID is repeated or already in the tree.
+            If a parent ID references a non-existent item.
+            If circular references are detected. The tree is unchanged if an error
+            is raised.
+        """
+        new_nodes: list[TreeItem] = []
+        parent_ids: list[Optional[str]] = []
+        for fields, parent_id in rows:
+            new_nodes.append(_item_from_row(fields, copy))
+            parent_ids.append(parent_id)
+
+        # Validate the new rows before changing the tree. Items already in the tree
+        # lead to a root, so a cycle can only be formed by new items.
+        nodes = self._nodes
+        positions: dict[str, int] = {}
+        for i, node in enumerate(new_nodes):
+            if node.id in nodes or node.id in positions:
+                raise ValueError(
+                    f"All TreeItem IDs must be unique, but '{node.id}' at index {i} "
+                    "is repeated"
+                )
+            positions[node.id] = i
+
+        parent_positions = []
+        for i, parent_id in enumerate(parent_ids):
+            if parent_id is None or parent_id in nodes:
+                parent_positions.append(-1)
+            elif parent_id in positions:
+                parent_positions.append(positions[parent_id])
+            else:
+                raise ValueError(
+                    f"Parent ID '{parent_id}' at index {i} does not reference an "
+                    "existing item"
+                )
+
+        cycle = _find_cycle(parent_positions)
+        if cycle is not None:
+            _raise_cycle([new_nodes[i].id for i in cycle[:_MAX_CYCLE_IDS]], len(cycle))
+
+        for node, parent_id in zip(new_nodes, parent_ids):
+            nodes[node.id] = node
+            self._parents[node.id] = parent_id
+
+        for node, parent_id in zip(new_nodes, parent_ids):
+            self._children.setdefault(parent_id, {})[node.id] = node
+            if parent_id in self._changed:
+                continue  # the list is rebuilt when the items are read
+            if parent_id is None:
+                self._items.append(node)
+                continue
+            parent = nodes[parent_id]
+            if parent._children is _NO_CHILDREN:
+                parent._children = [node]
+            else:
+                parent._children.append(node)
+
+    def remove(self, ids: Iterable[str]):
+        """
+        Remove items and their descendants from the tree.
+
+        This takes time proportional to the number of items removed, however many
+        siblings they have.
+
+        Parameters
+        ----------
+        ids : Iterable[str]
+            IDs of the items to remove.
+
+        Raises
+        ------
+        ValueError
+            If an ID is not in the tree. The tree is unchanged if an error is
+            raised.
+        """
+        nodes, parents, children = self._nodes, self._parents, self._children
+        ids = list(ids)
+        for id in ids:
+            if id not in nodes:
+                raise ValueError(f"TreeItem '{id}' not found")
+
+        for id in ids:
+            if id not in nodes:
+                continue  # removed with an ancestor
+            parent_id = parents[id]
+            siblings = children[parent_id]
+            del siblings[id]
+            if not siblings:
+                del children[parent_id]
+            self._changed.add(parent_id)
+
+            stack = [id]
+            while stack:
+                node_id = stack.pop()
+                del nodes[node_id]
+                del parents[node_id]
+                stack.extend(children.pop(node_id, ()))
+
+
+def stratify_from_columns(
+    ids: Any,
+    labels: Any,
+    parent_ids: Any,
+    *,
+    captions: Any = None,
+    disabled: Any = None,
+    lazy: Any = None,
+) -> TreeTable:
+    """
+    Convert columns of flat data to hierarchical tree data.
+
+    Like `stratify_by_parent()`, but takes the fields of the items as columns,
+    such as the columns of a pandas or Polars data frame, so no `TreeItem` is
+    created per row. The result is a compact `TreeTable` that can be passed
+    directly to `input_treeview()`.
+
+    Parameters
+    ----------
+    ids : array-like
+        Unique identifier of each item.
+    labels : array-like
+        Display text of each item.
+    parent_ids : array-like
+        ID of the parent of each item. Missing values (None, NaN or null) indicate
+        root items.
+    captions : array-like, optional
+        Secondary text of each item. Missing values indicate no caption.
+    disabled : array-like, optional
+        Whether each item is disabled. Missing values indicate False.
+    lazy : array-like, optional
+        Whether the children of each item are loaded on demand. Missing values
+        indicate False.
+
+    Returns
+    -------
+    TreeTable
+        The tree data, with the children of each item in their input order. Use
+        `TreeTable.to_items()` to convert it to TreeItem objects.
+
+    Raises
+    ------
+    ValueError
+        If the columns have different lengths.
+        If the IDs are not unique.
+        If a parent ID references a non-existent item.
+        If circular references are detected.
+
+    Notes
+    -----
+    Columns can be lists, NumPy arrays, pandas Series, Polars Series, or PyArrow
+    arrays. When NumPy is installed, children are grouped with vectorized
+    operations. Parent IDs are resolved with a vectorized hash lookup for PyArrow
+    and Polars columns (when PyArrow is installed) and for pandas columns.
+
+    The IDs and labels are validated by `input_treeview()`, or explicitly with
+    `validate_tree()`.
+
+    Examples
+    --------
+    ```python
+    import pandas as pd
+    from shiny_treeview import input_treeview, stratify_from_columns
+
+    df = pd.DataFrame({
+        "id": ["root", "child1", "child2", "grandchild"],
+        "label": ["Root", "Child 1", "Child 2", "Grandchild"],
+        "parent": [None, "root", "root", "child1"],
+    })
+    tree = stratify_from_columns(df["id"], df["label"], df["parent"])
+    input_treeview("tree", tree)
+    ```
+    """
+    ids, labels, parent_ids = map(_as_column, (ids, labels, parent_ids))
+    captions, disabled, lazy = map(_as_column, (captions, disabled, lazy))
+
+    n = len(ids)
+    for name, column in [
+        ("labels", labels),
+        ("parent_ids", parent_ids),
+        ("captions", captions),
+        ("disabled", disabled),
+        ("lazy", lazy),
+    ]:
+        if column is not None and len(column) != n:
+            raise ValueError(f"ids and {name} must have the same length")
+
+    parent_positions = _resolve_parents(ids, parent_ids)
+
+    try:
+        import numpy as np
+    except ImportError:
+        cycle = _find_cycle(parent_positions)
+        if cycle is not None:
+            _raise_cycle(_take(ids, cycle[:_MAX_CYCLE_IDS]), len(cycle))
+        return TreeTable._from_parent_positions(
+            _take(ids),
+            _take(labels),
+            _take_text(captions, None, n),
+            _take_flags(disabled, None, n),
+            parent_positions,
+            _take_flags(lazy, None, n),
+        )
+
+    return _table_from_parent_positions(
+        np,
+        np.asarray(parent_positions, dtype=np.int64),
+        ids,
+        labels,
+        captions,
+        disabled,
+        lazy,
+    )
+
+
+def _table_from_parent_positions(
+    np,
+    parent_positions: Any,
+    ids: Any,
+    labels: Any,
+    captions: Any = None,
+    disabled: Any = None,
+    lazy: Any = None,
+) -> TreeTable:
+    """Create a TreeTable from columns in arbitrary order, using NumPy."""
+    n = len(parent_positions)
+    order, counts, n_roots = _breadth_first_order(np, parent_positions)
+    if len(order) < n:
+        # Items that cannot be reached from a root are in or below a cycle
+        cycle = _find_cycle(parent_positions.tolist())
+        _raise_cycle(_take(ids, cycle[:_MAX_CYCLE_IDS]), len(cycle))
+
+    # Positions of the parents and children in the new order
+    new_positions = np.empty(n, dtype=np.int64)
+    new_positions[order] = np.arange(n, dtype=np.int64)
+    parents = parent_positions[order]
+    parents = np.where(parents < 0, -1, new_positions[parents])
+    child_offsets = np.empty(n + 1, dtype=np.int64)
+    child_offsets[0] = n_roots
+    np.cumsum(counts[order], out=child_offsets[1:])
+    child_offsets[1:] += n_roots
+
+    return TreeTable(
+        ids=_take(ids, order),
+        labels=_take(labels, order),
+        captions=_take_text(captions, order, n),
+        disabled=_take_bits(np, disabled, order, n),
+        parents=array("q", parents.tobytes()),
+        child_offsets=array("q", child_offsets.tobytes()),
+        lazy=_take_bits(np, lazy, order, n),
+    )
+
+
+def stratify_by_levels(
+    data: Any,
+    levels: list[str],
+    label: Optional[str] = None,
+    *,
+    row_id: Optional[str] = None,
+    id_sep: str = "/",
+    table: bool = False,
+) -> Union[list[TreeItem], TreeTable]:
+    """
+    Convert rows to hierarchical tree data by grouping on columns.
+
+    Rows are grouped by the values of the first column in `levels`, then each
+    group by the values of the next column, and so on, such as region, country
+    and site. Each group becomes an item labelled with its value. If `label` is
+    given, each row also becomes an item within its innermost group.
+
+    Parameters
+    ----------
+    data : DataFrame | Mapping[str, array-like]
+        The rows, as a pandas, Polars or PyArrow table, or a dictionary of columns
+        such as lists or arrays.
+    levels : list[str]
+        The names of the columns to group by, from the outermost to the innermost
+        level.
+    label : str, optional
+        The name of the column with the label of each row. If None (default),
+        rows are not included, and the groups of the last level are the leaves.
+    row_id : str, optional
+        The name of a column that identifies each row within its group, such as a
+        primary key, used in the IDs of rows. If None (default), the position of
+        each row is used. Requires `label`.
+    id_sep : str, default="/"
+        Separator between the values of the levels in item IDs.
+    table : bool, default=False
+        Whether to return a compact TreeTable rather than TreeItem objects.
+
+    Returns
+    -------
+    list[TreeItem] | TreeTable
+        List of root TreeItem objects with populated children attributes, or a
+        TreeTable if `table` is True. Groups and rows are ordered by their first
+        appearance in the data.
+
+    Raises
+    ------
+    ValueError
+        If the columns have different lengths.
+        If `id_sep` is empty, or contains whitespace or "%".
+        If different values in a group have the same text, such as `1` and `"1"`,
+        and so would give the same item ID.
+        If `row_id` is given without `label`, or its column has missing values or
+        the same value for two rows of a group.
+
+    Notes
+    -----
+    The ID of a group joins the values of its levels with `id_sep`, such as
+    `"Europe/France/Paris"`. Whitespace, "%", "#" and the characters of `id_sep`
+    are percent-encoded in each value, so IDs are stable and values with
+    different text never collide. Values are converted to text with `str()`,
+    except that whole floats such as `2024.0` are written as integers, since
+    missing values turn integer columns into floats in pandas. The ID of a row is
+    the ID of its group followed by `#` and the encoded value of its `row_id`
+    column, such as `"Europe/France/Paris/#P17"`. Without `row_id`, the position
+    of the row is used instead, such as `"Europe/France/Paris/#42"`, so the IDs of
+    rows change when rows are added, removed or reordered, and with them the
+    selected and expanded items of a treeview updated with the new data.
+
+    A missing value (None, NaN or null) ends the path of a row, so the row is
+    placed in the group of the previous level, and later levels are ignored.
+
+    Each level is grouped at once: the values of the column are factorized, then
+    combined with the groups of the previous level. This is vectorized when NumPy
+    is installed.
+
+    Examples
+    --------
+    ```python
+    import pandas as pd
+    from shiny_treeview import input_treeview, stratify_by_levels
+
+    df = pd.DataFrame({
+        "region": ["Europe", "Europe", "Asia"],
+        "country": ["France", "Spain", "Japan"],
+        "site": ["Paris", "Madrid", "Tokyo"],
+    })
+    tree = stratify_by_levels(df, ["region", "country"], label="site")
+    input_treeview("tree", tree)
+    ```
+    """
+    if not isinstance(id_sep, str) or not id_sep:
+        raise ValueError("id_sep must be a non-empty string")
+    if "%" in id_sep or _ID_WHITESPACE.search(id_sep):
+        raise ValueError("id_sep cannot contain whitespace or '%'")
+
+    if row_id is not None and label is None:
+        raise ValueError("row_id requires label, since rows are only items with it")
+
+    columns = [_as_column(data[name]) for name in levels]
+    row_labels = _as_column(data[label]) if label is not None else None
+    row_keys = _as_column(data[row_id]) if row_id is not None else None
+    n = len(columns[0]) if columns else len(row_labels) if label is not None else 0
+    for name, column in zip(levels + [label, row_id], columns + [row_labels, row_keys]):
+        if column is not None and len(column) != n:
+            raise ValueError(f"Column '{name}' must have the same length as the others")
+
+    encode_pattern = re.compile(f"[{re.escape(string.whitespace + '%#' + id_sep)}]")
+
+    def encode(text: str) -> str:
+        return encode_pattern.sub(
+            lambda m: "".join(f"%{b:02X}" for b in m.group().encode()), text
+        )
+
+    ids: list[str] = []
+    item_labels: list[str] = []
+
+    try:
+        import numpy as np
+    except ImportError:
+        np = None
+
+    if np is None:
+        # Look up the group of each row level by level
+        parent_positions: Any = []
+        groups: dict[tuple[int, Any], int] = {}
+        row_groups = []
+        for values in zip(*map(_take, columns)) if columns else [()] * n:
+            parent = -1
+            for value in values:
+                if value is None or value != value:
+                    break
+                position = groups.get((parent, value))
+                if position is None:
+                    position = groups[parent, value] = len(ids)
+                    prefix = ids[parent] + id_sep if parent >= 0 else ""
+                    text = _level_text(value)
+                    ids.append(prefix + encode(text))
+                    item_labels.append(text)
+                    parent_positions.append(parent)
+                parent = position
+            row_groups.append(parent)
+    else:
+        parent_chunks = []
+        row_groups = np.full(n, -1, dtype=np.int64)
+        present = np.arange(n)
+        for column in columns:
+            codes, uniques = _factorize(np, column)
+            present = present[codes[present] >= 0]
+
+            # Combine the group of the previous level with the value, so that the
+            # keys of different groups never collide
+            keys = row_groups[present] * (len(uniques) + 1) + codes[present]
+            group_codes, first = _factorize_ints(np, keys)
+            first_rows = present[first]
+            parents = row_groups[first_rows]
+
+            for parent, code in zip(parents.tolist(), codes[first_rows].tolist()):
+                text = _level_text(uniques[code])
+                prefix = ids[parent] + id_sep if parent >= 0 else ""
+                ids.append(prefix + encode(text))
+                item_labels.append(text)
+            parent_chunks.append(parents)
+            row_groups[present] = len(ids) - len(first) + group_codes
+
+    # Distinct values with the same text would give siblings the same ID. The IDs
+    # of different parents differ in their prefix, and row IDs start with "#",
+    # which encoded values cannot contain.
+    duplicates = _duplicates(ids)
+    if duplicates:
+        raise ValueError(
+            f"Different values give the same item IDs: {duplicates}. "
+            "Convert the level columns to a single type, such as strings."
+        )
+
+    if label is not None:
+        # The prefix of rows outside any group is last, at position -1
+        prefixes = [id + id_sep + "#" for id in ids] + ["#"]
+        groups_list = row_groups.tolist() if np is not None else row_groups
+        if row_keys is None:
+            row_ids = [prefixes[group] + str(i) for i, group in enumerate(groups_list)]
+        else:
+            keys = _take(row_keys)
+            if any(key is None or key != key for key in keys):
+                raise ValueError(f"Column '{row_id}' cannot have missing values")
+            row_ids = [
+                prefixes[group] + encode(_level_text(key))
+                for group, key in zip(groups_list, keys)
+            ]
+            duplicates = _duplicates(row_ids)
+            if duplicates:
+                raise ValueError(
+                    f"Column '{row_id}' gives the same item IDs to rows of a group: "
+                    f"{duplicates}"
+                )
+        ids.extend(row_ids)
+        item_labels.extend(_take(row_labels))
+        if np is not None:
+            parent_chunks.append(row_groups)
+        else:
+            parent_positions.extend(row_groups)
+
+    if np is not None:
+        parent_positions = (
+            np.concatenate(parent_chunks)
+            if parent_chunks
+            else np.empty(0, dtype=np.int64)
+        )
+        if table:
+            return _table_from_parent_positions(np, parent_positions, ids, item_labels)
+        parent_positions = parent_positions.tolist()
+
+    if table:
+        n_items = len(ids)
+        return TreeTable._from_parent_positions(
+            ids, item_labels, [""] * n_items, [False] * n_items, parent_positions
+        )
+    return _link_items(ids, item_labels, parent_positions)
+
+
+def _duplicates(ids: list[str]) -> list[str]:
+    """Find the IDs that appear more than once, sorted."""
+    if len(set(ids)) == len(ids):
+        return []
+    seen: set[str] = set()
+    duplicates: set[str] = set()
+    for id in ids:
+        if id in seen:
+            duplicates.add(id)
+        else:
+            seen.add(id)
+    return sorted(duplicates)
+
+
+def _level_text(value: Any) -> str:
+    """Convert a level value to text, writing whole floats as integers."""
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value)
+
+
+def _link_items(
+    ids: list[str], labels: list[str], parent_positions: list[int]
+) -> list[TreeItem]:
+    """Create unvalidated items and link each to its parent, returning the roots."""
+    nodes = [TreeItem(id, label, validate=False) for id, label in zip(ids, labels)]
+    root_items = []
+    for node, parent_position in zip(nodes, parent_positions):
+        if parent_position < 0:
+            root_items.append(node)
+        else:
+            parent = nodes[parent_position]
+            if parent._children is _NO_CHILDREN:
+                parent._children = [node]
+            else:
+                parent._children.append(node)
+    return root_items
+
+
+def _validate_parent_ids(ids: list[str], parent_ids: list[Optional[str]]) -> list[int]:
+    """
+    Validate parent-child relationships expressed through a list of parent IDs.
+
+    Returns the position of the parent of each item in the list, or -1 for roots.
+    """
+    if len(ids) != len(parent_ids):
         raise ValueError("items and parent_ids lists must have the same length")
 
-    # Create a mapping from item ID to TreeItem for quick lookup
-    item_map = {item.id: item for item in items}
+    # Create a mapping from item ID to position for quick lookup
+    item_positions = {item_id: i for i, item_id in enumerate(ids)}
 
     # Check for duplicate IDs
-    if len(item_map) != len(items):
+    if len(item_positions) != len(ids):
         raise ValueError("All TreeItem IDs must be unique")
 
     # Validate that all parent_ids reference existing items (or are None)
+    parent_positions = []
     for i, parent_id in enumerate(parent_ids):
-        if parent_id is not None and parent_id not in item_map:
+        if parent_id is None:
+            parent_positions.append(-1)
+        elif parent_id in item_positions:
+            parent_positions.append(item_positions[parent_id])
+        else:
             raise ValueError(
                 f"Parent ID '{parent_id}' at index {i} does not reference an existing item"
             )
 
-    # Create a mapping from parent ID to list of children
-    children_map = {}
-    root_items = []
+    cycle = _find_cycle(parent_positions)
+    if cycle is not None:
+        _raise_cycle([ids[i] for i in cycle[:_MAX_CYCLE_IDS]], len(cycle))
 
-    for item, parent_id in zip(items, parent_ids):
-        # Create a new TreeItem to avoid modifying the original
-        new_item = replace(item, children=[])
+    return parent_positions
 
-        if parent_id is None:
-            # This is a root item
-            root_items.append(new_item)
+
+def _item_from_row(fields: Any, copy: bool) -> TreeItem:
+    """Create a childless item from a TreeItem, a dict of fields or (id, label)."""
+    if isinstance(fields, TreeItem):
+        if copy:
+            return fields._without_children()
+        fields._children = _NO_CHILDREN
+        return fields
+    if isinstance(fields, dict):
+        return TreeItem(**fields, validate=False)
+    id, label = fields
+    return TreeItem(id, label, validate=False)
+
+
+def _count_items(items: list[TreeItem]) -> int:
+    """Count the items of a forest."""
+    count = 0
+    stack = list(items)
+    while stack:
+        node = stack.pop()
+        count += 1
+        if node._children:
+            stack.extend(node._children)
+    return count
+
+
+def _raise_detached_cycle(
+    root_items: list[TreeItem], nodes: dict[str, TreeItem]
+) -> None:
+    """Report a cycle among the linked items that cannot be reached from a root."""
+    reachable = set()
+    stack = list(root_items)
+    while stack:
+        node = stack.pop()
+        reachable.add(node.id)
+        if node._children:
+            stack.extend(node._children)
+
+    parents = {
+        child.id: id
+        for id, node in nodes.items()
+        if id not in reachable
+        for child in node._children
+    }
+
+    # Every detached item leads up to a cycle, followed from the first to arrive
+    path: list[str] = []
+    positions: dict[str, int] = {}
+    id = next(id for id in nodes if id not in reachable)
+    while id not in positions:
+        positions[id] = len(path)
+        path.append(id)
+        id = parents[id]
+
+    cycle = path[positions[id] :]
+    _raise_cycle(cycle[:_MAX_CYCLE_IDS], len(cycle))
+
+
+def _raise_cycle(ids: list[str], length: int) -> None:
+    """Report a cycle, given the IDs of its first items and its length."""
+    # Long cycles are shortened, keeping the item that closes the cycle
+    names = ids[:_MAX_CYCLE_IDS]
+    if length > _MAX_CYCLE_IDS:
+        names.append(f"... ({length - _MAX_CYCLE_IDS} more)")
+    path = " -> ".join(names + ids[:1])
+    raise ValueError(
+        f"Circular reference detected in parent-child relationships: {path}"
+    )
+
+
+def _find_cycle(parent_positions: list[int]) -> Optional[list[int]]:
+    """
+    Find a cycle in parent-child relationships, in linear time.
+
+    Each position is followed up its ancestors until reaching a root or a position
+    already known to lead to one, so every position is visited once. Returns the
+    positions of a cycle, each followed by its parent, or None if there is none.
+    """
+    # 0 = not visited, 1 = on the current path, 2 = leads to a root
+    state = bytearray(len(parent_positions))
+    for start in range(len(parent_positions)):
+        if state[start]:
+            continue
+
+        path = []
+        position = start
+        while position >= 0 and not state[position]:
+            state[position] = 1
+            path.append(position)
+            position = parent_positions[position]
+
+        if position >= 0 and state[position] == 1:
+            return path[path.index(position) :]
+        for position in path:
+            state[position] = 2
+
+    return None
+
+
+def _as_column(values: Any) -> Any:
+    """Convert a Polars column to PyArrow, which supports vectorized lookups."""
+    if type(values).__module__.startswith("polars"):
+        try:
+            return values.to_arrow()
+        except ImportError:
+            return values.to_list()
+    return values
+
+
+def _is_arrow(values: Any) -> bool:
+    return type(values).__module__.startswith("pyarrow")
+
+
+def _is_pandas(values: Any) -> bool:
+    return type(values).__module__.startswith("pandas")
+
+
+def _resolve_parents(ids: Any, parent_ids: Any) -> Any:
+    """
+    Find the position of the parent of each item, or -1 for roots.
+
+    Returns a NumPy array for PyArrow and pandas columns, and a list otherwise.
+    """
+    if len(ids) == 0:
+        return []
+
+    if _is_arrow(ids) or _is_arrow(parent_ids):
+        import numpy as np
+        import pyarrow as pa
+
+        # Encode IDs followed by parent IDs in a single hash pass, so unique IDs
+        # get the codes 0 to n - 1, and missing parent IDs get codes from n
+        ids = pa.chunked_array([ids] if _is_arrow(ids) else [pa.array(ids)])
+        parent_ids = pa.chunked_array(
+            [parent_ids if _is_arrow(parent_ids) else pa.array(parent_ids)]
+        ).cast(ids.type)
+        encoded = pa.chunked_array(ids.chunks + parent_ids.chunks, type=ids.type)
+        codes = np.asarray(
+            encoded.combine_chunks().dictionary_encode().indices.fill_null(-1)
+        )
+    elif _is_pandas(ids) or _is_pandas(parent_ids):
+        import numpy as np
+        import pandas as pd
+
+        codes, _ = pd.factorize(
+            np.concatenate(
+                [np.asarray(ids, dtype=object), np.asarray(parent_ids, dtype=object)]
+            )
+        )
+    else:
+        # Fall back to a dictionary, treating None and NaN as missing
+        return _validate_parent_ids(
+            list(ids),
+            [
+                None if parent is None or parent != parent else parent
+                for parent in parent_ids
+            ],
+        )
+
+    n = len(ids)
+    if not np.array_equal(codes[:n], np.arange(n)):
+        raise ValueError("All TreeItem IDs must be unique")
+
+    positions = codes[n:].astype(np.int64)
+    missing = positions >= n
+    if missing.any():
+        i = int(missing.argmax())
+        raise ValueError(
+            f"Parent ID '{_take(parent_ids, [i])[0]}' at index {i} does not reference an existing item"
+        )
+    return positions
+
+
+def _breadth_first_order(np, parent_positions):
+    """
+    Order items breadth-first from the roots, with siblings in input order.
+
+    Returns the order, the number of children of each item, and the number of
+    roots. Items in or below a cycle are left out of the order.
+    """
+    n = len(parent_positions)
+
+    # Group children by parent with a stable sort (roots use slot n)
+    slots = np.where(parent_positions < 0, n, parent_positions)
+    grouped = np.argsort(slots, kind="stable")
+    counts = np.bincount(slots, minlength=n + 1)
+    starts = np.zeros(n + 2, dtype=np.int64)
+    np.cumsum(counts, out=starts[1:])
+
+    # Items are expanded in first-in first-out order. Items from head to tail
+    # are in the order but their children are not yet.
+    roots = grouped[starts[n] :]
+    order = np.empty(n, dtype=np.int64)
+    order[: len(roots)] = roots
+    head, tail = 0, len(roots)
+    grouped_list = starts_list = None
+    while head < tail:
+        if tail - head >= _MIN_VECTORIZED_ITEMS:
+            # Gather the children of all waiting items at once
+            waiting = order[head:tail]
+            first, lengths = starts[waiting], counts[waiting]
+            total = int(lengths.sum())
+            offsets = np.repeat(first - np.cumsum(lengths) + lengths, lengths)
+            order[tail : tail + total] = grouped[offsets + np.arange(total)]
+            head, tail = tail, tail + total
         else:
-            # Add to parent's children list
-            if parent_id not in children_map:
-                children_map[parent_id] = []
-            children_map[parent_id].append(new_item)
+            # Per-call overhead of NumPy dominates when few items are waiting, such
+            # as along deep chains, so expand items one at a time until enough wait
+            if grouped_list is None:
+                grouped_list, starts_list = grouped.tolist(), starts.tolist()
+            queue = order[head:tail].tolist()
+            i = 0
+            while i < len(queue) and len(queue) - i < _MIN_VECTORIZED_ITEMS:
+                item = queue[i]
+                queue.extend(grouped_list[starts_list[item] : starts_list[item + 1]])
+                i += 1
+            added = len(queue) - (tail - head)
+            order[tail : tail + added] = queue[tail - head :]
+            head, tail = head + i, tail + added
 
-        # Update the item_map for easy access to the new item
-        item_map[item.id] = new_item
+    return order[:tail], counts[:n], len(roots)
 
-    # Populate children for all items
-    for parent_id, children in children_map.items():
-        if parent_id in item_map:
-            item_map[parent_id].children = children
 
-    def _has_circular_reference() -> bool:
-        """Check if there are any circular references in the parent-child relationships."""
-        # Create a mapping from item_id to parent_id for efficient lookup
-        parent_map = {item.id: parent_id for item, parent_id in zip(items, parent_ids)}
+def _take(values: Any, positions: Any = None) -> list:
+    """Get the values of a column at the given positions, as a list."""
+    if _is_arrow(values):
+        return (values if positions is None else values.take(positions)).to_pylist()
+    if _is_pandas(values):
+        values = values.to_numpy(dtype=object)
+    if type(values).__module__ == "numpy":
+        return (values if positions is None else values[positions]).tolist()
+    if positions is None:
+        return list(values)
+    if hasattr(positions, "tolist"):
+        positions = positions.tolist()
+    if len(positions) < 2:
+        return [values[i] for i in positions]
+    return list(itemgetter(*positions)(values))
 
-        # For each item, trace its ancestry to see if we loop back
-        for item_id in parent_map:
-            visited = set()
-            current_id = parent_map.get(item_id)
 
-            # Follow the parent chain
-            while current_id is not None:
-                if current_id in visited:
-                    return True
-                visited.add(current_id)
-                current_id = parent_map.get(current_id)
+def _take_text(values: Any, positions: Any, n: int) -> list[str]:
+    """Get an optional text column, with missing values as empty strings."""
+    if values is None:
+        return [""] * n
+    return [
+        "" if value is None or value != value else value
+        for value in _take(values, positions)
+    ]
 
-        return False
 
-    if _has_circular_reference():
-        raise ValueError("Circular reference detected in parent-child relationships")
+def _take_flags(values: Any, positions: Any, n: int) -> list[bool]:
+    """Get an optional boolean column, with missing values as False."""
+    if values is None:
+        return [False] * n
+    return [
+        value is not None and value == value and bool(value)
+        for value in _take(values, positions)
+    ]
 
-    return root_items
+
+def _take_bits(np, values: Any, positions: Any, n: int) -> bytearray:
+    """Get an optional boolean column as a bitmap, like `_pack_bits()`."""
+    if values is None:
+        return bytearray((n + 7) // 8)
+    flags = np.array(_take_flags(values, positions, n), dtype=bool)
+    return bytearray(np.packbits(flags, bitorder="little").tobytes())
+
+
+def _factorize(np, values: Any) -> tuple[Any, list]:
+    """
+    Encode values as integer codes in order of first appearance.
+
+    Returns the codes, with -1 for missing values, and the unique values.
+    """
+    if _is_arrow(values):
+        import pyarrow as pa
+
+        if isinstance(values, pa.ChunkedArray):
+            values = values.combine_chunks()
+        encoded = values.dictionary_encode()
+        codes = np.asarray(encoded.indices.fill_null(-1), dtype=np.int64)
+        return codes, encoded.dictionary.to_pylist()
+
+    try:
+        import pandas as pd
+    except ImportError:
+        pass
+    else:
+        if not _is_pandas(values):
+            values = np.asarray(values, dtype=object)
+        codes, uniques = pd.factorize(values)
+        return codes.astype(np.int64), list(uniques)
+
+    positions: dict[Any, int] = {}
+    codes = []
+    for value in _take(values):
+        if value is None or value != value:
+            codes.append(-1)
+        else:
+            codes.append(positions.setdefault(value, len(positions)))
+    return np.array(codes, dtype=np.int64), list(positions)
+
+
+def _factorize_ints(np, values: Any) -> tuple[Any, Any]:
+    """
+    Encode integers as codes in order of first appearance.
+
+    Returns the codes, and the index of the first appearance of each code.
+    """
+    _, first, inverse = np.unique(values, return_index=True, return_inverse=True)
+    order = np.argsort(first, kind="stable")
+    ranks = np.empty(len(order), dtype=np.int64)
+    ranks[order] = np.arange(len(order))
+    return ranks[inverse.reshape(-1)], first[order]
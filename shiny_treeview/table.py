@@ -0,0 +1,333 @@
+"""Columnar tree data structures for shiny-treeview."""
+
+from array import array
+from itertools import chain
+from typing import Iterable, Optional, Sequence
+
+from .tree import _NO_CHILDREN, TreeItem
+
+
+class TreeTable:
+    """
+    Represents tree data as parallel columns instead of nested objects.
+
+    Each node is identified by its position in the table. Nodes are stored in
+    breadth-first order, so that root nodes come first and the children of each
+    node occupy a contiguous range of positions. Compared to nested `TreeItem`
+    objects, this avoids allocating an object and a children list per node,
+    which greatly reduces memory usage for large trees.
+
+    A `TreeTable` can be passed directly to `input_treeview()`,
+    `stratify_by_parent()` and the utility functions. Use `TreeTable.from_items()`
+    and `TreeTable.to_items()` to convert to and from `TreeItem` objects.
+
+    Attributes
+    ----------
+    ids : list[str]
+        Unique identifier of each node.
+    labels : list[str]
+        Display text of each node.
+    captions : list[str]
+        Secondary text of each node (empty string if none).
+    parents : array
+        Position of the parent of each node, or -1 for root nodes.
+    child_offsets : array
+        Offsets into the table, such that the children of node `i` are at positions
+        `child_offsets[i]` to `child_offsets[i + 1] - 1`.
+
+    Examples
+    --------
+    ```python
+    from shiny_treeview import TreeItem, TreeTable, input_treeview
+
+    table = TreeTable.from_items([
+        TreeItem("docs", "📁 Documents", children=[TreeItem("report", "📄 Report.pdf")])
+    ])
+    input_treeview("tree", table)
+    ```
+    """
+
+    def __init__(
+        self,
+        ids: list[str],
+        labels: list[str],
+        captions: list[str],
+        disabled: bytearray,
+        parents: array,
+        child_offsets: array,
+        lazy: Optional[bytearray] = None,
+    ):
+        self.ids = ids
+        self.labels = labels
+        self.captions = captions
+        self._disabled = disabled
+        self.parents = parents
+        self.child_offsets = child_offsets
+        self._lazy = lazy if lazy is not None else bytearray(len(disabled))
+        self._positions: Optional[dict[str, int]] = None
+
+    @classmethod
+    def from_items(cls, items: list[TreeItem]) -> "TreeTable":
+        """
+        Create a TreeTable from a list of TreeItem objects.
+
+        Parameters
+        ----------
+        items
+            List of root TreeItem objects.
+
+        Returns
+        -------
+        TreeTable
+            Columnar representation of the tree.
+        """
+        # Breadth-first traversal places all children of a node contiguously
+        queue = list(items)
+        parents = array("q", [-1] * len(queue))
+        child_offsets = array("q")
+
+        i = 0
+        while i < len(queue):
+            child_offsets.append(len(queue))
+            children = queue[i]._children
+            if children:
+                queue.extend(children)
+                parents.extend([i] * len(children))
+            i += 1
+        child_offsets.append(len(queue))
+
+        disabled = _pack_bits(item.disabled for item in queue)
+        lazy = _pack_bits(item.lazy for item in queue)
+        return cls(
+            ids=[item.id for item in queue],
+            labels=[item.label for item in queue],
+            captions=[item.caption for item in queue],
+            disabled=disabled,
+            parents=parents,
+            child_offsets=child_offsets,
+            lazy=lazy,
+        )
+
+    @classmethod
+    def _from_parent_positions(
+        cls,
+        ids: Sequence[str],
+        labels: Sequence[str],
+        captions: Sequence[str],
+        disabled: Sequence[bool],
+        parent_positions: Sequence[int],
+        lazy: Optional[Sequence[bool]] = None,
+    ) -> "TreeTable":
+        """
+        Create a TreeTable from columns in arbitrary order.
+
+        The parent of each node is given by its position in the input columns
+        (-1 for roots). Siblings keep their relative input order. The caller is
+        responsible for ensuring the parent relationships contain no cycles.
+        """
+        n = len(ids)
+
+        # Group children by parent with a counting sort (roots use slot n)
+        counts = [0] * (n + 1)
+        for parent in parent_positions:
+            counts[parent if parent >= 0 else n] += 1
+        starts = [0] * (n + 2)
+        for p in range(n + 1):
+            starts[p + 1] = starts[p] + counts[p]
+        grouped = [0] * n
+        fill = starts[:]
+        for i, parent in enumerate(parent_positions):
+            slot = parent if parent >= 0 else n
+            grouped[fill[slot]] = i
+            fill[slot] += 1
+
+        # Breadth-first traversal from the roots, recording the new order
+        order = grouped[starts[n] : starts[n + 1]]
+        child_offsets = array("q")
+        parents = array("q", [-1] * len(order))
+        i = 0
+        while i < len(order):
+            child_offsets.append(len(order))
+            old = order[i]
+            first, last = starts[old], starts[old + 1]
+            if first < last:
+                order.extend(grouped[first:last])
+                parents.extend([i] * (last - first))
+            i += 1
+        child_offsets.append(len(order))
+
+        return cls(
+            ids=[ids[i] for i in order],
+            labels=[labels[i] for i in order],
+            captions=[captions[i] for i in order],
+            disabled=_pack_bits(disabled[i] for i in order),
+            parents=parents,
+            child_offsets=child_offsets,
+            lazy=_pack_bits(lazy[i] for i in order) if lazy is not None else None,
+        )
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    @property
+    def roots(self) -> range:
+        """Positions of the root nodes."""
+        return range(self.child_offsets[0] if self.ids else 0)
+
+    def children(self, position: int) -> range:
+        """
+        Get the positions of the children of a node.
+
+        Parameters
+        ----------
+        position
+            Position of the node in the table.
+
+        Returns
+        -------
+        range
+            Positions of the children of the node.
+        """
+        return range(self.child_offsets[position], self.child_offsets[position + 1])
+
+    def is_disabled(self, position: int) -> bool:
+        """
+        Check whether a node is disabled.
+
+        Parameters
+        ----------
+        position
+            Position of the node in the table.
+
+        Returns
+        -------
+        bool
+            Whether the node is disabled.
+        """
+        return bool(self._disabled[position >> 3] & (1 << (position & 7)))
+
+    def is_lazy(self, position: int) -> bool:
+        """
+        Check whether a node has children that are loaded on demand.
+
+        Parameters
+        ----------
+        position
+            Position of the node in the table.
+
+        Returns
+        -------
+        bool
+            Whether the node is lazy.
+        """
+        return bool(self._lazy[position >> 3] & (1 << (position & 7)))
+
+    def position(self, id: str) -> Optional[int]:
+        """
+        Get the position of a node by its id.
+
+        Parameters
+        ----------
+        id
+            The id of the target node.
+
+        Returns
+        -------
+        Optional[int]
+            Position of the first node with a matching id, or None if not found.
+        """
+        if self._positions is None:
+            positions: dict[str, int] = {}
+            for i, node_id in enumerate(self.ids):
+                positions.setdefault(node_id, i)
+            self._positions = positions
+        return self._positions.get(id)
+
+    def path(self, id: str) -> Optional[tuple[str, ...]]:
+        """
+        Get the path to a node by following parent links.
+
+        Parameters
+        ----------
+        id
+            The id of the target node.
+
+        Returns
+        -------
+        Optional[tuple[str, ...]]
+            Tuple of ancestor ids ending with the target id, or None if not found.
+        """
+        position = self.position(id)
+        if position is None:
+            return None
+
+        path = []
+        while position >= 0:
+            path.append(self.ids[position])
+            position = self.parents[position]
+
+        return tuple(reversed(path))
+
+    @property
+    def duplicates(self) -> list[str]:
+        """Sorted list of IDs that appear more than once in the table."""
+        seen: set[str] = set()
+        duplicates: set[str] = set()
+        for node_id in self.ids:
+            if node_id in seen:
+                duplicates.add(node_id)
+            else:
+                seen.add(node_id)
+        return sorted(duplicates)
+
+    def to_items(self) -> list[TreeItem]:
+        """
+        Convert the TreeTable to a list of TreeItem objects.
+
+        Returns
+        -------
+        list[TreeItem]
+            List of root TreeItem objects with populated children attributes.
+        """
+        nodes: list[Optional[TreeItem]] = [None] * len(self.ids)
+
+        # Build children before their parents by visiting in reverse order
+        for i in reversed(range(len(self.ids))):
+            first, last = self.child_offsets[i], self.child_offsets[i + 1]
+            nodes[i] = TreeItem(
+                self.ids[i],
+                self.labels[i],
+                children=nodes[first:last] if first < last else _NO_CHILDREN,
+                caption=self.captions[i],
+                disabled=self.is_disabled(i),
+                lazy=self.is_lazy(i),
+            )
+
+        return nodes[: len(self.roots)]
+
+
+def _pack_bits(values: Iterable[bool]) -> bytearray:
+    """Pack booleans into a bitmap, least significant bit first."""
+    bits = bytearray()
+    byte = shift = 0
+    for value in values:
+        if value:
+            byte |= 1 << shift
+        shift += 1
+        if shift == 8:
+            bits.append(byte)
+            byte = shift = 0
+    if shift:
+        bits.append(byte)
+    return bits
+
+
+# Booleans of the bits of each byte value, least significant bit first
+_BYTE_BITS = [
+    tuple(bool(byte >> shift & 1) for shift in range(8)) for byte in range(256)
+]
+
+
+def _unpack_bits(bits: bytearray, n: int) -> list[bool]:
+    """Unpack the first n booleans of a bitmap created by `_pack_bits()`."""
+    return list(chain.from_iterable(map(_BYTE_BITS.__getitem__, bits)))[:n]
@@ -0,0 +1,150 @@
+"""Iterative traversal of tree data structures."""
+
+from collections import deque
+from typing import Iterator, Optional
+
+from .tree import TreeItem
+
+# Supported orders of walk() and walk_with_parents()
+_ORDERS = ("pre", "post", "bfs")
+
+
+def walk(items: list[TreeItem], order: str = "pre") -> Iterator[TreeItem]:
+    """
+    Iterate over every item of a tree structure.
+
+    Items are visited with explicit stacks rather than recursion, so trees of
+    any depth can be walked. Nothing is allocated per visited item, only one
+    iterator per item with children.
+
+    Parameters
+    ----------
+    items
+        List of root TreeItem objects.
+    order
+        Order of the items: "pre" for depth-first order with each item before its
+        children (the order in which items are shown when the whole tree is
+        expanded), "post" for depth-first order with each item after its
+        children, or "bfs" for breadth-first order, level by level.
+
+    Returns
+    -------
+    Iterator[TreeItem]
+        The items of the tree.
+
+    Raises
+    ------
+    ValueError
+        If `order` is not one of the supported orders.
+
+    Examples
+    --------
+    ```python
+    from shiny_treeview import TreeItem
+    from shiny_treeview.traversal import walk
+
+    tree = [TreeItem("docs", "📁 Documents", children=[TreeItem("report", "📄 Report")])]
+    [item.id for item in walk(tree, order="post")]  # ["report", "docs"]
+    ```
+    """
+    _check_order(order)
+    if order == "pre":
+        return _preorder(items, False)
+    if order == "post":
+        return _postorder(items, False)
+    return _breadth_first(items, False)
+
+
+def walk_with_parents(
+    items: list[TreeItem], order: str = "pre"
+) -> Iterator[tuple[TreeItem, int, Optional[TreeItem]]]:
+    """
+    Iterate over every item of a tree structure, with its depth and parent.
+
+    Like `walk()`, but each item is given with its depth (0 for root items) and its
+    parent item (None for root items).
+
+    Parameters
+    ----------
+    items
+        List of root TreeItem objects.
+    order
+        Order of the items: "pre", "post" or "bfs", as for `walk()`.
+
+    Returns
+    -------
+    Iterator[tuple[TreeItem, int, Optional[TreeItem]]]
+        Tuples of an item, its depth and its parent.
+
+    Raises
+    ------
+    ValueError
+        If `order` is not one of the supported orders.
+
+    Examples
+    --------
+    ```python
+    from shiny_treeview.traversal import walk_with_parents
+
+    for item, depth, parent in walk_with_parents(tree):
+        print("  " * depth + item.label)
+    ```
+    """
+    _check_order(order)
+    if order == "pre":
+        return _preorder(items, True)
+    if order == "post":
+        return _postorder(items, True)
+    return _breadth_first(items, True)
+
+
+def _check_order(order: str) -> None:
+    if order not in _ORDERS:
+        raise ValueError(f"order must be one of {', '.join(map(repr, _ORDERS))}")
+
+
+def _preorder(items: list[TreeItem], context: bool) -> Iterator:
+    # One iterator per level of the current path, and the item of each level
+    stack = [iter(items)]
+    path: list[Optional[TreeItem]] = [None]
+    while stack:
+        depth, parent = len(stack) - 1, path[-1]
+        for item in stack[-1]:
+            yield (item, depth, parent) if context else item
+            if item._children:
+                stack.append(iter(item._children))
+                path.append(item)
+                break
+        else:
+            stack.pop()
+            path.pop()
+
+
+def _postorder(items: list[TreeItem], context: bool) -> Iterator:
+    # Like _preorder, but each item with children is given when its iterator ends
+    stack = [iter(items)]
+    path: list[Optional[TreeItem]] = [None]
+    while stack:
+        depth, parent = len(stack) - 1, path[-1]
+        for item in stack[-1]:
+            if item._children:
+                stack.append(iter(item._children))
+                path.append(item)
+                break
+            yield (item, depth, parent) if context else item
+        else:
+            stack.pop()
+            item = path.pop()
+            if stack:
+                yield (item, depth - 1, path[-1]) if context else item
+
+
+def _breadth_first(items: list[TreeItem], context: bool) -> Iterator:
+    # Lists of siblings waiting to be visited, with their depth and parent
+    queue: deque = deque([(items, 0, None)])
+    while queue:
+        siblings, depth, parent = queue.popleft()
+        for item in siblings:
+            yield (item, depth, parent) if context else item
+            if item._children:
+                queue.append((item._children, depth + 1, item))
@@ -1,10 +1,18 @@
 """Tree data structures for shiny-treeview."""
 
+import re
 import string
 from dataclasses import KW_ONLY, dataclass, field
+from typing import Optional
 
+# Matches the characters that are not allowed in item IDs
+_ID_WHITESPACE = re.compile(f"[{re.escape(string.whitespace)}]")
 
-@dataclass
+# Shared immutable children of leaf items, replaced by a list when first accessed
+_NO_CHILDREN: tuple = ()
+
+
+@dataclass(init=False)
 class TreeItem:
     """
     Represents a single item in a tree data structure.
@@ -21,6 +29,15 @@ class TreeItem:
         List of child nodes.
     disabled : bool, default=False
         Whether the item is disabled (non-selectable).
+    lazy : bool, default=False
+        Whether the item has children that are not loaded yet. A lazy item without
+        children is shown as expandable, and its children are requested from the
+        server the first time it is expanded. See `treeview_loader()`.
+    validate : bool, default=True
+        Whether to validate the fields of the item. Only skip validation for
+        trusted data, such as large trees loaded from a database. The whole tree
+        is still validated once by `input_treeview()`, or explicitly with
+        `validate_tree()`.
 
     Examples
     --------
@@ -43,21 +60,57 @@ class TreeItem:
         ]
     )
     ```
+
+    Trusted data without per-item validation:
+
+    ```python
+    from shiny_treeview.utils import validate_tree
+
+    rows = [("doc1", "📄 Report.pdf"), ("doc2", "📄 Presentation.pptx")]
+    items = [TreeItem(id, label, validate=False) for id, label in rows]
+    validate_tree(items)
+    ```
     """
 
+    # Slots keep items compact: leaves share an empty children sentinel, and the
+    # rarely used caption, disabled and lazy fields are stored together only when
+    # set.
+    __slots__ = ("id", "label", "_children", "_extras")
+
+    # Fields are declared with their defaults for dataclasses.fields(), and are
+    # replaced by properties over the slots once the class is created
     id: str
     label: str
     children: list["TreeItem"] = field(default_factory=list)
     _: KW_ONLY
     caption: str = ""
     disabled: bool = False
-
-    def __post_init__(self):
+    lazy: bool = False
+
+    def __init__(
+        self,
+        id: str,
+        label: str,
+        children: list["TreeItem"] = _NO_CHILDREN,
+        *,
+        caption: str = "",
+        disabled: bool = False,
+        lazy: bool = False,
+        validate: bool = True,
+    ):
+        self.id = id
+        self.label = label
+        self._children = children
+        self._set_extras(caption, disabled, lazy)
+        if validate:
+            self._validate()
+
+    def _validate(self):
         # Validate id
         if not isinstance(self.id, str):
             raise ValueError("TreeItem id must be a string")
 
-        if self.id == "" or any(char in string.whitespace for char in self.id):
+        if self.id == "" or _ID_WHITESPACE.search(self.id):
             raise ValueError("TreeItem id cannot be empty or contain whitespace")
 
         # Validate label
@@ -75,14 +128,66 @@ class TreeItem:
         if not isinstance(self.disabled, bool):
             raise ValueError("TreeItem disabled must be a boolean")
 
+        # Validate lazy
+        if not isinstance(self.lazy, bool):
+            raise ValueError("TreeItem lazy must be a boolean")
+
         # Validate children
-        if not isinstance(self.children, list):
+        if self._children is _NO_CHILDREN:
+            return
+
+        if not isinstance(self._children, list):
             raise ValueError("TreeItem children must be a list")
 
-        for i, child in enumerate(self.children):
+        for i, child in enumerate(self._children):
             if not isinstance(child, TreeItem):
                 raise ValueError(f"TreeItem children[{i}] must be a TreeItem instance")
 
+    def _get_children(self) -> list["TreeItem"]:
+        if self._children is _NO_CHILDREN:
+            self._children = []
+        return self._children
+
+    def _set_children(self, value: list["TreeItem"]):
+        self._children = value
+
+    def _set_extras(self, caption: str, disabled: bool, lazy: bool):
+        self._extras: Optional[tuple[str, bool, bool]] = (
+            (caption, disabled, lazy)
+            if caption != "" or disabled is not False or lazy is not False
+            else None
+        )
+
+    def _without_children(self) -> "TreeItem":
+        """Copy the item without its children, skipping validation."""
+        item = self.__class__.__new__(self.__class__)
+        item.id = self.id
+        item.label = self.label
+        item._children = _NO_CHILDREN
+        item._extras = self._extras
+        return item
+
+    def __repr__(self):
+        # Read the slot, so that leaves keep sharing the empty children sentinel
+        children = self._children if self._children is not _NO_CHILDREN else []
+        return (
+            f"{self.__class__.__qualname__}(id={self.id!r}, label={self.label!r}, "
+            f"children={children!r}, caption={self.caption!r}, "
+            f"disabled={self.disabled!r}, lazy={self.lazy!r})"
+        )
+
+    def __eq__(self, other):
+        if other.__class__ is not self.__class__:
+            return NotImplemented
+        return (
+            self.id == other.id
+            and self.label == other.label
+            and self.caption == other.caption
+            and self.disabled == other.disabled
+            and self.lazy == other.lazy
+            and (self._children or _NO_CHILDREN) == (other._children or _NO_CHILDREN)
+        )
+
     def _to_dict(self) -> dict:
         """
         Serialize TreeItem for sending to server.
@@ -94,15 +199,49 @@ class TreeItem:
         dict
             Dictionary representation of the tree item.
         """
-        result = {"id": self.id, "label": self.label}
+        from .traversal import walk_with_parents
+
+        # The children list of the most recent item at each depth, so each item is
+        # appended to the list of its parent
+        outputs: list[list[dict]] = [[]]
+        for item, depth, _ in walk_with_parents([self]):
+            node = {"id": item.id, "label": item.label}
+
+            if item.caption:
+                node["caption"] = item.caption
+
+            if item.disabled:
+                node["disabled"] = True
+
+            if item.lazy:
+                node["lazy"] = True
+
+            outputs[depth].append(node)
+            if item._children:
+                node["children"] = children = []
+                if depth + 1 < len(outputs):
+                    outputs[depth + 1] = children
+                else:
+                    outputs.append(children)
+
+        return outputs[0][0]
+
+
+def _extras_property(index: int, default) -> property:
+    """Create a property for one of the optional fields stored in `_extras`."""
+
+    def fget(self):
+        return self._extras[index] if self._extras is not None else default
 
-        if self.caption:
-            result["caption"] = self.caption
+    def fset(self, value):
+        extras = list(self._extras or ("", False, False))
+        extras[index] = value
+        self._set_extras(*extras)
 
-        if self.disabled:
-            result["disabled"] = True
+    return property(fget, fset)
 
-        if self.children:
-            result["children"] = [child._to_dict() for child in self.children]
 
-        return result
+TreeItem.children = property(TreeItem._get_children, TreeItem._set_children)
+TreeItem.caption = _extras_property(0, "")
+TreeItem.disabled = _extras_property(1, False)
+TreeItem.lazy = _extras_property(2, False)
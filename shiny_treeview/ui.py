@@ -1,15 +1,19 @@
 """UI components for shiny-treeview."""
 
-import json
 from pathlib import PurePath
-from typing import Optional
+from typing import Optional, Union
 
 from htmltools import HTMLDependency, Tag, TagList, css, tags
 from shiny.module import resolve_id
+from shiny.session import get_current_session
 
 from .__version__ import __version__
+from .cache import _cache_key, _payload_cache
+from .patch import _session_states
+from .serialize import _items_field, _splice_payload
+from .table import TreeTable
 from .tree import TreeItem
-from .utils import duplicate_ids, get_tree_path
+from .utils import TreeIndex, get_tree_paths, validate_tree
 
 treeview_deps = HTMLDependency(
     "shiny_treeview",
@@ -24,13 +28,16 @@ treeview_deps = HTMLDependency(
 
 def input_treeview(
     id: str,
-    items: list[TreeItem],
+    items: Union[list[TreeItem], TreeIndex, TreeTable],
     *,
     selected: Optional[str | list[str]] = None,
     expanded: Optional[str | list[str]] = None,
     multiple: bool = False,
     checkbox: bool = False,
     width: Optional[str] = None,
+    columnar: bool = False,
+    cache: Union[bool, str] = False,
+    track: bool = False,
 ) -> Tag:
     """
     Create a treeview component to navigate and select items from a hierarchical data structure.
@@ -41,8 +48,10 @@ def input_treeview(
     ----------
     id : str
         The input id.
-    items : list[TreeItem]
-        A list of TreeItem objects representing the tree data.
+    items : list[TreeItem] | TreeIndex | TreeTable
+        A list of TreeItem objects representing the tree data. When the same tree
+        is rendered many times, pass a prebuilt `TreeIndex` to reuse its lookups.
+        For very large trees, pass a `TreeTable` to reduce memory usage.
     selected : str | list[str], optional
         Initially selected item ID(s). If None (default), no items are selected.
     expanded : str | list[str], optional
@@ -54,6 +63,25 @@ def input_treeview(
         Whether to show checkboxes for selection.
     width : str, optional
         The CSS width of the input component (e.g., "400px", "100%").
+    columnar : bool, default=False
+        Whether to send the tree data to the browser in a compact columnar format.
+        This reduces the page size and parsing time for large trees.
+    cache : bool | str, default=False
+        Whether to share the serialized tree data between calls that render the
+        same tree, such as the UI of many sessions. Only the selected and expanded
+        items are then added for each call. If True, the tree is identified by a
+        fingerprint of its content, which is computed once for a `TreeIndex` or
+        `TreeTable`. For a list of items, the fingerprint requires serializing the
+        tree on every call, so the cache only saves validating it. If a string, it
+        is used as the key of the tree instead, and the tree must not change while
+        the key is in use. See `shiny_treeview.cache` for the cache statistics and
+        memory limit.
+    track : bool, default=False
+        Whether to remember the tree data sent to the browser when the treeview is
+        rendered inside a session (e.g., with `@render.ui`), so that the first
+        `update_treeview(items=...)` only sends the differences. The serialized
+        tree is then kept until the session ends, unless it is shared through
+        `cache`.
 
     Returns
     -------
@@ -66,12 +94,6 @@ def input_treeview(
     If `multiple=True`, the server value is a tuple of the selected item IDs.
     When nothing is selected, the server value is `None` in both cases.
     """
-    duplicates = duplicate_ids(items)
-    if duplicates:
-        raise ValueError(
-            f"Duplicate TreeItem IDs found: {duplicates}. All TreeItem IDs must be unique across the entire tree."
-        )
-
     # Normalize selected items to always be a list
     if selected is None:
         selected_items = []
@@ -80,12 +102,32 @@ def input_treeview(
     else:
         selected_items = selected
 
+    # Look up and validate through a prebuilt index, to avoid another walk
+    lookup = items
+    if isinstance(items, TreeIndex):
+        items = items.items
+
+    # Reuse the serialized tree data of an earlier call, validated at the time
+    key = items_json = None
+    if cache:
+        try:
+            key, items_json = _cache_key(lookup, cache, columnar)
+        except (TypeError, AttributeError):
+            # Report invalid tree data the same way as without a cache
+            validate_tree(lookup)
+            raise
+    items_field = _payload_cache.get(key) if key is not None else None
+    if items_field is None:
+        validate_tree(lookup)
+        items_field = _items_field(items, columnar, items_json)
+        if key is not None:
+            _payload_cache.put(key, items_field)
+
     # Normalize expanded items to always be a list
     if expanded is None:
         # Auto-expand: find all ancestors of selected items to make them visible
         expanded_items = []
-        for selected_id in selected_items:
-            tree_path = get_tree_path(items, selected_id)
+        for tree_path in get_tree_paths(lookup, selected_items).values():
             if tree_path is not None:
                 expanded_items.extend(tree_path[:-1])
 
@@ -95,18 +137,25 @@ def input_treeview(
     else:
         expanded_items = expanded
 
-    payload = {
-        "items": [x._to_dict() for x in items],
-        "selected": selected_items,
-        "expanded": expanded_items,
-        "multiple": multiple,
-        "checkbox": checkbox,
-    }
+    payload = _splice_payload(
+        items_field,
+        selected=selected_items,
+        expanded=expanded_items,
+        multiple=multiple,
+        checkbox=checkbox,
+    )
+
+    # Remember the tree data sent to this session, so that updates can be diffed.
+    # Only the serialized items are kept, which a cache hit shares between
+    # sessions, and the snapshot is built from them when it is first needed.
+    session = get_current_session() if track else None
+    if session is not None and not session.is_stub_session():
+        _session_states(session)[resolve_id(id)] = items_field
 
     return tags.div(
         TagList(
             tags.script(
-                json.dumps(payload),
+                payload,
                 type="application/json",
                 data_for=resolve_id(id),
             ),
@@ -1,11 +1,264 @@
 """Utility functions for working with tree data structures."""
 
-from typing import Optional
+from array import array
+from operator import attrgetter
+from typing import Any, Iterable, Optional, Union
 
-from .tree import TreeItem
+from .table import TreeTable, _unpack_bits
+from .traversal import walk, walk_with_parents
+from .tree import _ID_WHITESPACE, TreeItem
 
+# Get the ID of an item, without a Python function call per item
+_get_id = attrgetter("id")
 
-def get_tree_path(items: list[TreeItem], id: str) -> Optional[tuple[str, ...]]:
+# Supported types of the result of flatten_tree()
+_FLAT_OUTPUTS = ("dict", "pandas", "polars", "arrow")
+
+
+class TreeIndex:
+    """
+    Index of a tree structure for fast lookups by item ID.
+
+    The index is built in a single pass over the tree. Afterwards, looking up an
+    item, its parent, its depth or its path takes constant time (or time
+    proportional to the depth, for paths). Build the index once and reuse it
+    whenever the same tree is queried or rendered many times.
+
+    Subtree queries number the items in depth-first order, so that the
+    descendants of every item occupy a contiguous range. This numbering is built
+    in another pass the first time it is needed, after which checking whether an
+    item is an ancestor of another takes constant time.
+
+    Parameters
+    ----------
+    items
+        List of TreeItem objects to index.
+
+    Notes
+    -----
+    The index is a snapshot of the tree when it was built. If the tree is later
+    modified, a new index must be built.
+
+    When IDs are duplicated, lookups resolve to the first matching item in
+    depth-first order (the same item found by `get_tree_path`).
+
+    Examples
+    --------
+    ```python
+    from shiny_treeview import TreeIndex, TreeItem
+
+    index = TreeIndex([
+        TreeItem("folder", "📁 Folder", children=[TreeItem("file", "📄 File")])
+    ])
+    index.path("file")  # ("folder", "file")
+    index.parent("file")  # "folder"
+    index.depth("file")  # 1
+    index.is_ancestor("folder", "file")  # True
+    index.descendants("folder")  # ["file"]
+    ```
+    """
+
+    def __init__(self, items: list[TreeItem]):
+        self.items = items
+        self._nodes: dict[str, TreeItem] = {}
+        self._parents: dict[str, Optional[str]] = {}
+        self._depths: dict[str, int] = {}
+        self._duplicates: set[str] = set()
+
+        # Depth-first numbering for subtree queries, built on first use
+        self._preorder: list[str] = []
+        self._entries: Optional[dict[str, int]] = None
+        self._exits = array("q")
+
+        for item, depth, parent in walk_with_parents(items):
+            if item.id in self._nodes:
+                self._duplicates.add(item.id)
+            else:
+                self._nodes[item.id] = item
+                self._parents[item.id] = parent.id if parent is not None else None
+                self._depths[item.id] = depth
+
+    def __len__(self) -> int:
+        return len(self._nodes)
+
+    def __contains__(self, id: object) -> bool:
+        return id in self._nodes
+
+    @property
+    def duplicates(self) -> list[str]:
+        """Sorted list of IDs that appear more than once in the tree."""
+        return sorted(self._duplicates)
+
+    def get(self, id: str) -> Optional[TreeItem]:
+        """
+        Get the tree item with the given id.
+
+        Parameters
+        ----------
+        id
+            The id of the target TreeItem.
+
+        Returns
+        -------
+        Optional[TreeItem]
+            The matching TreeItem, or None if not found.
+        """
+        return self._nodes.get(id)
+
+    def parent(self, id: str) -> Optional[str]:
+        """
+        Get the id of the parent of a tree item.
+
+        Parameters
+        ----------
+        id
+            The id of the target TreeItem.
+
+        Returns
+        -------
+        Optional[str]
+            The id of the parent item, or None for root items.
+
+        Raises
+        ------
+        KeyError
+            If the id is not found in the tree.
+        """
+        return self._parents[id]
+
+    def depth(self, id: str) -> int:
+        """
+        Get the depth of a tree item, where root items have depth 0.
+
+        Parameters
+        ----------
+        id
+            The id of the target TreeItem.
+
+        Returns
+        -------
+        int
+            Number of ancestors of the item.
+
+        Raises
+        ------
+        KeyError
+            If the id is not found in the tree.
+        """
+        return self._depths[id]
+
+    def path(self, id: str) -> Optional[tuple[str, ...]]:
+        """
+        Get the path to a tree item by following parent links.
+
+        Parameters
+        ----------
+        id
+            The id of the target TreeItem.
+
+        Returns
+        -------
+        Optional[tuple[str, ...]]
+            Tuple of ancestor ids ending with the target id, or None if not found.
+        """
+        if id not in self._parents:
+            return None
+
+        path = [id]
+        parent_id = self._parents[id]
+        while parent_id is not None:
+            path.append(parent_id)
+            parent_id = self._parents[parent_id]
+
+        return tuple(reversed(path))
+
+    def is_ancestor(self, ancestor_id: str, id: str) -> bool:
+        """
+        Check whether a tree item is an ancestor of another, in constant time.
+
+        Parameters
+        ----------
+        ancestor_id
+            The id of the possible ancestor.
+        id
+            The id of the target TreeItem.
+
+        Returns
+        -------
+        bool
+            Whether the target item is in the subtree of the possible ancestor,
+            excluding the ancestor itself.
+
+        Raises
+        ------
+        KeyError
+            If either id is not found in the tree.
+        """
+        entries, exits = self._euler_tour()
+        entry = entries[ancestor_id]
+        return entry < entries[id] < exits[entry]
+
+    def descendants(self, id: str) -> list[str]:
+        """
+        Get the ids of all descendants of a tree item.
+
+        Parameters
+        ----------
+        id
+            The id of the target TreeItem.
+
+        Returns
+        -------
+        list[str]
+            Ids of the items in the subtree of the target item, excluding the item
+            itself, in depth-first order.
+
+        Raises
+        ------
+        KeyError
+            If the id is not found in the tree.
+        """
+        entries, exits = self._euler_tour()
+        entry = entries[id]
+        return self._preorder[entry + 1 : exits[entry]]
+
+    def _euler_tour(self) -> tuple[dict[str, int], array]:
+        """
+        Number the items in depth-first order, the first time it is needed.
+
+        Each item gets its position in depth-first order, and the position just
+        after its last descendant. The subtree of an item is then the contiguous
+        range of positions between the two, so ancestor tests are two comparisons
+        and descendants are a slice.
+        """
+        if self._entries is None:
+            preorder: list[str] = []
+            entries: dict[str, int] = {}
+            exits = array("q")
+
+            # Positions of the ancestors of the current item, by depth
+            open_positions: list[int] = []
+            for item, depth, _ in walk_with_parents(self.items):
+                position = len(preorder)
+                while len(open_positions) > depth:
+                    exits[open_positions.pop()] = position
+                open_positions.append(position)
+
+                preorder.append(item.id)
+                exits.append(0)
+                entries.setdefault(item.id, position)
+
+            for position in open_positions:
+                exits[position] = len(preorder)
+
+            self._preorder, self._entries, self._exits = preorder, entries, exits
+
+        return self._entries, self._exits
+
+
+def get_tree_path(
+    items: Union[list[TreeItem], TreeIndex, TreeTable], id: str
+) -> Optional[tuple[str, ...]]:
     """
     Get the path to a tree item by traversing ancestors.
 
@@ -16,7 +269,8 @@ def get_tree_path(items: list[TreeItem], id: str) -> Optional[tuple[str, ...]]:
     Parameters
     ----------
     items
-        List of TreeItem objects to search through
+        List of TreeItem objects to search through, a prebuilt TreeIndex or a
+        TreeTable
     id
         The id of the target TreeItem to find
 
@@ -29,61 +283,332 @@ def get_tree_path(items: list[TreeItem], id: str) -> Optional[tuple[str, ...]]:
         folder1 -> subfolder1 -> file1.
         Returns: ("folder1", "subfolder1", "file1")
     """
+    return get_tree_paths(items, [id])[id]
 
-    def _search_recursive(
-        items: list[TreeItem], target_id: str, path: list[str]
-    ) -> Optional[tuple[str, ...]]:
-        """Recursively search for the target item and build path."""
-        for item in items:
-            current_path = path + [item.id]
 
-            # Found the target item
-            if item.id == target_id:
-                return tuple(current_path)
+def get_tree_paths(
+    items: Union[list[TreeItem], TreeIndex, TreeTable], ids: Iterable[str]
+) -> dict[str, Optional[tuple[str, ...]]]:
+    """
+    Get the paths to many tree items in a single traversal.
 
-            # Search in children if they exist
-            if item.children:
-                result = _search_recursive(item.children, target_id, current_path)
-                if result is not None:
-                    return result
+    Like calling `get_tree_path()` for each id, but the tree is walked once with a
+    shared stack of ancestor ids, stopping as soon as every target is found.
 
-        return None
+    Parameters
+    ----------
+    items
+        List of TreeItem objects to search through, a prebuilt TreeIndex or a
+        TreeTable
+    ids
+        The ids of the target TreeItems to find
 
-    return _search_recursive(items, id, [])
+    Returns
+    -------
+    dict[str, Optional[tuple[str, ...]]]
+        Tuple of ancestor ids ending with the target id for each target id, or
+        None for ids that are not found.
+    """
+    paths: dict[str, Optional[tuple[str, ...]]] = dict.fromkeys(ids)
+    if isinstance(items, (TreeIndex, TreeTable)):
+        for id in paths:
+            paths[id] = items.path(id)
+        return paths
+
+    remaining = len(paths)
+    if not remaining:
+        return paths
+
+    # IDs of the ancestors of the current item, indexed by depth
+    path: list[str] = []
+    for item, depth, _ in walk_with_parents(items):
+        del path[depth:]
+        path.append(item.id)
+        if item.id in paths and paths[item.id] is None:
+            paths[item.id] = tuple(path)
+            remaining -= 1
+            if not remaining:
+                break
 
+    return paths
 
-def duplicate_ids(items: list[TreeItem]) -> list[str]:
+
+def duplicate_ids(
+    items: Union[list[TreeItem], TreeIndex, TreeTable], *, fail_fast: bool = False
+) -> list[str]:
     """
     Find duplicate TreeItem IDs in a tree structure.
 
+    The tree is walked once, remembering the IDs seen so far in a single set.
+
     Parameters
     ----------
     items
-        List of TreeItem objects to check for duplicate IDs.
+        List of TreeItem objects to check for duplicate IDs, a prebuilt TreeIndex or
+        a TreeTable.
+    fail_fast
+        Whether to stop at the first duplicate ID found, which is all that is needed
+        to know that a tree is invalid.
 
     Returns
     -------
     list[str]
-        List of duplicate IDs found in the tree. If no duplicates, returns an empty list.
+        Sorted list of duplicate IDs found in the tree, or only the first one found
+        if `fail_fast` is True. If no duplicates, returns an empty list.
     """
+    if isinstance(items, TreeIndex):
+        return items.duplicates[:1] if fail_fast else items.duplicates
 
-    def _collect_all_ids(items: list[TreeItem]) -> list[str]:
-        """Recursively collect all IDs from a tree structure."""
-        all_ids = []
-        for item in items:
-            all_ids.append(item.id)
-            if item.children:
-                all_ids.extend(_collect_all_ids(item.children))
-        return all_ids
-
-    all_ids = _collect_all_ids(items)
-    seen_ids = set()
-    duplicate_ids = set()
-
-    for item_id in all_ids:
+    ids = items.ids if isinstance(items, TreeTable) else map(_get_id, walk(items))
+    seen_ids: set[str] = set()
+    duplicate_ids: list[str] = []
+    for item_id in ids:
         if item_id in seen_ids:
-            duplicate_ids.add(item_id)
+            duplicate_ids.append(item_id)
+            if fail_fast:
+                break
         else:
             seen_ids.add(item_id)
 
-    return sorted(duplicate_ids)
+    return sorted(set(duplicate_ids))
+
+
+def validate_tree(items: Union[list[TreeItem], TreeIndex, TreeTable]) -> None:
+    """
+    Validate the fields of a whole tree structure at once.
+
+    This is much faster than validating each TreeItem individually, so it pairs
+    with creating trusted TreeItem objects using `validate=False`.
+
+    Parameters
+    ----------
+    items
+        List of TreeItem objects to validate, a prebuilt TreeIndex or a TreeTable.
+
+    Raises
+    ------
+    ValueError
+        If any ID is not a string, is empty or contains whitespace.
+        If any label is not a string, or is empty or whitespace only.
+        If any caption is not a string, or any disabled or lazy flag is not a
+        boolean.
+        If any children are not a list of TreeItem objects.
+        If any ID appears more than once in the tree.
+    """
+    if isinstance(items, TreeTable):
+        ids, labels = items.ids, items.labels
+        # Flags are stored as bits, so only captions can have the wrong type
+        extras = [(caption, False, False) for caption in items.captions if caption]
+    elif isinstance(items, TreeIndex):
+        # The index already holds the first item with each ID, and the duplicates
+        ids = items._nodes
+        labels = [item.label for item in items._nodes.values()]
+        extras = [x._extras for x in items._nodes.values() if x._extras is not None]
+    else:
+        # Collect fields level by level, since order does not matter here. Children
+        # are checked before they are visited.
+        ids, labels, extras = [], [], []
+        stack = [items]
+        while stack:
+            for item in stack.pop():
+                ids.append(item.id)
+                labels.append(item.label)
+                if item._extras is not None:
+                    extras.append(item._extras)
+                if item._children:
+                    _check_children(item._children)
+                    stack.append(item._children)
+
+    try:
+        joined_ids = "".join(ids)
+    except TypeError:
+        raise ValueError("TreeItem id must be a string") from None
+
+    if _ID_WHITESPACE.search(joined_ids) or "" in ids:
+        raise ValueError("TreeItem id cannot be empty or contain whitespace")
+
+    try:
+        if not all(map(str.strip, labels)):
+            raise ValueError("TreeItem label cannot be empty or whitespace only")
+    except TypeError:
+        raise ValueError("TreeItem label must be a string") from None
+
+    # Only items with a caption or a flag set store these fields
+    for caption, disabled, lazy in extras:
+        if not isinstance(caption, str):
+            raise ValueError("TreeItem caption must be a string")
+        if not isinstance(disabled, bool):
+            raise ValueError("TreeItem disabled must be a boolean")
+        if not isinstance(lazy, bool):
+            raise ValueError("TreeItem lazy must be a boolean")
+
+    if isinstance(items, TreeIndex):
+        has_duplicates = bool(items._duplicates)
+    else:
+        has_duplicates = len(set(ids)) != len(ids)
+    if has_duplicates:
+        duplicates = duplicate_ids(items)
+        raise ValueError(
+            f"Duplicate TreeItem IDs found: {duplicates}. All TreeItem IDs must be unique across the entire tree."
+        )
+
+
+def _check_children(children: list[TreeItem]) -> None:
+    """Check that children are a list of TreeItem objects, as TreeItem does."""
+    if not isinstance(children, list):
+        raise ValueError("TreeItem children must be a list")
+
+    # Compare the types of all children at once, and only search for the position
+    # of an invalid child when there is one
+    for cls in set(map(type, children)):
+        if not issubclass(cls, TreeItem):
+            i = next(i for i, x in enumerate(children) if not isinstance(x, TreeItem))
+            raise ValueError(f"TreeItem children[{i}] must be a TreeItem instance")
+
+
+def flatten_tree(
+    items: Union[list[TreeItem], TreeIndex, TreeTable], output: str = "dict"
+) -> Any:
+    """
+    Convert a tree structure to flat columns, one row per item.
+
+    This is the inverse of `stratify_by_parent()`: each row holds the ID of the
+    parent of the item instead of its children. Rows are in depth-first order,
+    the order in which items are shown when the whole tree is expanded.
+
+    Parameters
+    ----------
+    items
+        List of TreeItem objects to flatten, a prebuilt TreeIndex or a TreeTable.
+    output
+        Type of the result: "dict" for a dictionary of lists, "pandas" for a
+        pandas DataFrame, "polars" for a Polars DataFrame, or "arrow" for a
+        PyArrow Table.
+
+    Returns
+    -------
+    dict[str, list] | pandas.DataFrame | polars.DataFrame | pyarrow.Table
+        Columns `id`, `parent_id` (None for root items), `depth` (0 for root
+        items), `label`, `caption`, `disabled`, `lazy` and `preorder` (the
+        position of the row in depth-first order, which is kept by joins and
+        filters).
+
+    Raises
+    ------
+    ValueError
+        If `output` is not one of the supported types.
+
+    Examples
+    --------
+    ```python
+    from shiny_treeview import TreeItem
+    from shiny_treeview.utils import flatten_tree
+
+    df = flatten_tree(
+        [TreeItem("docs", "📁 Documents", children=[TreeItem("report", "📄 Report")])],
+        output="pandas",
+    )
+    # df["parent_id"] is [None, "docs"] and df["depth"] is [0, 1]
+    ```
+    """
+    if output not in _FLAT_OUTPUTS:
+        raise ValueError(f"output must be one of {', '.join(map(repr, _FLAT_OUTPUTS))}")
+
+    if isinstance(items, TreeTable):
+        columns = _flatten_table(items)
+    else:
+        if isinstance(items, TreeIndex):
+            items = items.items
+        columns = _flatten_items(items)
+
+    if output == "polars":
+        import polars as pl
+
+        return pl.DataFrame(columns)
+    if output == "arrow":
+        import pyarrow as pa
+
+        return pa.table(columns)
+    if output == "pandas":
+        import pandas as pd
+
+        # Converting through Arrow is about twice as fast for string columns
+        try:
+            import pyarrow as pa
+        except ImportError:
+            return pd.DataFrame(columns)
+        return pa.table(columns).to_pandas()
+    return columns
+
+
+def _flatten_items(items: list[TreeItem]) -> dict[str, list]:
+    """Collect the columns of a forest of TreeItem objects in depth-first order."""
+    ids: list[str] = []
+    parent_ids: list[Optional[str]] = []
+    depths: list[int] = []
+    labels: list[str] = []
+    captions: list[str] = []
+    disabled: list[bool] = []
+    lazy: list[bool] = []
+
+    for item, depth, parent in walk_with_parents(items):
+        ids.append(item.id)
+        parent_ids.append(parent.id if parent is not None else None)
+        depths.append(depth)
+        labels.append(item.label)
+        extras = item._extras
+        if extras is None:
+            captions.append("")
+            disabled.append(False)
+            lazy.append(False)
+        else:
+            captions.append(extras[0])
+            disabled.append(extras[1])
+            lazy.append(extras[2])
+
+    return _flat_columns(ids, parent_ids, depths, labels, captions, disabled, lazy)
+
+
+def _flatten_table(table: TreeTable) -> dict[str, list]:
+    """Collect the columns of a TreeTable in depth-first order."""
+    order: list[int] = []
+    depths: list[int] = []
+    offsets = table.child_offsets
+    stack = [iter(table.roots)]
+    while stack:
+        depth = len(stack) - 1
+        for position in stack[-1]:
+            order.append(position)
+            depths.append(depth)
+            first, last = offsets[position], offsets[position + 1]
+            if first < last:
+                stack.append(iter(range(first, last)))
+                break
+        else:
+            stack.pop()
+
+    ids, parents, n = table.ids, table.parents, len(table)
+    disabled = _unpack_bits(table._disabled, n)
+    lazy = _unpack_bits(table._lazy, n)
+    return _flat_columns(
+        [ids[i] for i in order],
+        [ids[parents[i]] if parents[i] >= 0 else None for i in order],
+        depths,
+        [table.labels[i] for i in order],
+        [table.captions[i] for i in order],
+        [disabled[i] for i in order],
+        [lazy[i] for i in order],
+    )
+
+
+def _flat_columns(ids, parent_ids, depths, labels, captions, disabled, lazy) -> dict:
+    return {
+        "id": ids,
+        "parent_id": parent_ids,
+        "depth": depths,
+        "label": labels,
+        "caption": captions,
+        "disabled": disabled,
+        "lazy": lazy,
+        "preorder": list(range(len(ids))),
+    }
@@ -1,11 +1,112 @@
 import React from "react";
 import { createRoot, Root } from "react-dom/client";
-import { ShinyTreeView, ShinyTreeItem } from "./treeview";
+import { ShinyTreeView, ShinyTreeItem, ShinyTreeViewHandle } from "./treeview";
+import { TreeOp, loadingPlaceholder } from "./items";
+
+// Helper function to safely parse and validate arrays of strings
+const parseStringArray = (value: unknown, fallback: string[] = []): string[] => {
+  if (Array.isArray(value)) {
+    return value.filter(item => typeof item === 'string');
+  }
+  return fallback;
+};
+
+// Helper function to validate ShinyTreeItem structure
+const validateTreeItems = (items: unknown): ShinyTreeItem[] => {
+  if (!Array.isArray(items)) {
+    return [];
+  }
+
+  const validateItem = (item: any): ShinyTreeItem | null => {
+    if (!item || typeof item !== 'object') return null;
+    if (typeof item.id !== 'string' || typeof item.label !== 'string') return null;
+
+    const validatedItem: ShinyTreeItem = {
+      id: item.id,
+      label: item.label,
+    };
+
+    if (typeof item.disabled === 'boolean') {
+      validatedItem.disabled = item.disabled;
+    }
+
+    if (typeof item.caption === 'string') {
+      validatedItem.caption = item.caption;
+    }
+
+    if (Array.isArray(item.children)) {
+      const validChildren = item.children
+        .map(validateItem)
+        .filter((child: ShinyTreeItem | null): child is ShinyTreeItem => child !== null);
+      if (validChildren.length > 0) {
+        validatedItem.children = validChildren;
+      }
+    }
+
+    // Lazy items without children get a placeholder, so they can be expanded
+    if (item.lazy === true) {
+      validatedItem.lazy = true;
+      if (!validatedItem.children) {
+        validatedItem.children = [loadingPlaceholder(validatedItem.id)];
+      }
+    }
+
+    return validatedItem;
+  };
+
+  return items
+    .map(validateItem)
+    .filter((item: ShinyTreeItem | null): item is ShinyTreeItem => item !== null);
+};
+
+// Helper function to validate the changes sent by update_treeview()
+const validatePatch = (ops: unknown): TreeOp[] => {
+  if (!Array.isArray(ops)) {
+    return [];
+  }
+
+  const isParent = (value: unknown): value is string | null =>
+    value === null || typeof value === 'string';
+  const index = (value: unknown): number | undefined =>
+    typeof value === 'number' ? value : undefined;
+
+  const validOps: TreeOp[] = [];
+  for (const op of ops) {
+    if (op?.op === 'insert' && isParent(op.parent)) {
+      validOps.push({
+        op: 'insert',
+        parent: op.parent,
+        index: index(op.index),
+        items: validateTreeItems(op.items),
+      });
+    } else if (op?.op === 'remove') {
+      validOps.push({ op: 'remove', ids: parseStringArray(op.ids) });
+    } else if (op?.op === 'move' && typeof op.id === 'string' && isParent(op.parent)) {
+      validOps.push({ op: 'move', id: op.id, parent: op.parent, index: index(op.index) });
+    } else if (op?.op === 'children' && isParent(op.parent)) {
+      validOps.push({
+        op: 'children',
+        parent: op.parent,
+        ids: parseStringArray(op.ids),
+        items: validateTreeItems(op.items),
+      });
+    } else if (op?.op === 'set' && typeof op.id === 'string') {
+      const validOp: Extract<TreeOp, { op: 'set' }> = { op: 'set', id: op.id };
+      if (typeof op.label === 'string') validOp.label = op.label;
+      if (typeof op.caption === 'string') validOp.caption = op.caption;
+      if (typeof op.disabled === 'boolean') validOp.disabled = op.disabled;
+      if (typeof op.lazy === 'boolean') validOp.lazy = op.lazy;
+      validOps.push(validOp);
+    }
+  }
+  return validOps;
+};
 
 if (window.Shiny) {
   class ShinyTreeViewBinding extends window.Shiny.InputBinding {
     private boundElementValues = new WeakMap<HTMLElement, any>();
     private boundElementRoots = new WeakMap<HTMLElement, Root>();
+    private boundElementHandles = new WeakMap<HTMLElement, React.RefObject<ShinyTreeViewHandle>>();
 
     override find(scope: HTMLElement) {
       return $(scope).find('.shiny-treeview');
@@ -31,52 +132,87 @@ if (window.Shiny) {
         return;
       }
 
-      // Helper function to safely parse and validate arrays of strings
-      const parseStringArray = (value: unknown, fallback: string[] = []): string[] => {
-        if (Array.isArray(value)) {
-          return value.filter(item => typeof item === 'string');
-        }
-        return fallback;
-      };
+      // Helper function to rebuild ShinyTreeItem hierarchy from the columnar format.
+      // Parents always precede their children, so one linear pass is enough.
+      const decodeColumns = (columns: any): ShinyTreeItem[] => {
+        const ids: unknown = columns?.ids;
+        const labels: unknown = columns?.labels;
+        const labelTable: unknown = columns?.label_table;
+        const parents: unknown = columns?.parents;
 
-      // Helper function to validate ShinyTreeItem structure
-      const validateTreeItems = (items: unknown): ShinyTreeItem[] => {
-        if (!Array.isArray(items)) {
+        if (
+          !Array.isArray(ids) || !Array.isArray(labels) ||
+          !Array.isArray(labelTable) || !Array.isArray(parents) ||
+          labels.length !== ids.length || parents.length !== ids.length
+        ) {
           return [];
         }
 
-        const validateItem = (item: any): ShinyTreeItem | null => {
-          if (!item || typeof item !== 'object') return null;
-          if (typeof item.id !== 'string' || typeof item.label !== 'string') return null;
+        const nodes: (ShinyTreeItem | null)[] = new Array(ids.length);
+        const roots: ShinyTreeItem[] = [];
 
-          const validatedItem: ShinyTreeItem = {
-            id: item.id,
-            label: item.label,
-          };
+        for (let i = 0; i < ids.length; i++) {
+          const id = ids[i];
+          const label = labelTable[labels[i]];
+          const parent = parents[i];
+          if (typeof id !== 'string' || typeof label !== 'string') {
+            nodes[i] = null;
+            continue;
+          }
 
-          if (typeof item.disabled === 'boolean') {
-            validatedItem.disabled = item.disabled;
+          const node: ShinyTreeItem = { id, label };
+          nodes[i] = node;
+
+          if (typeof parent === 'number' && parent >= 0 && parent < i) {
+            // Drop nodes whose parent failed validation
+            const parentNode = nodes[parent];
+            if (parentNode) {
+              if (!parentNode.children) {
+                parentNode.children = [];
+              }
+              parentNode.children.push(node);
+            } else {
+              nodes[i] = null;
+            }
+          } else {
+            roots.push(node);
           }
+        }
 
-          if (typeof item.caption === 'string') {
-            validatedItem.caption = item.caption;
+        const captions: unknown = columns?.captions;
+        if (captions && typeof captions === 'object') {
+          for (const [key, caption] of Object.entries(captions)) {
+            const node = nodes[Number(key)];
+            if (node && typeof caption === 'string') {
+              node.caption = caption;
+            }
           }
+        }
 
-          if (Array.isArray(item.children)) {
-            const validChildren = item.children
-              .map(validateItem)
-              .filter((child: ShinyTreeItem | null): child is ShinyTreeItem => child !== null);
-            if (validChildren.length > 0) {
-              validatedItem.children = validChildren;
+        const disabled: unknown = columns?.disabled;
+        if (Array.isArray(disabled)) {
+          for (const position of disabled) {
+            const node = nodes[position];
+            if (node) {
+              node.disabled = true;
             }
           }
+        }
 
-          return validatedItem;
-        };
+        const lazy: unknown = columns?.lazy;
+        if (Array.isArray(lazy)) {
+          for (const position of lazy) {
+            const node = nodes[position];
+            if (node) {
+              node.lazy = true;
+              if (!node.children) {
+                node.children = [loadingPlaceholder(node.id)];
+              }
+            }
+          }
+        }
 
-        return items
-          .map(validateItem)
-          .filter((item: ShinyTreeItem | null): item is ShinyTreeItem => item !== null);
+        return roots;
       };
 
       let config: {
@@ -92,7 +228,9 @@ if (window.Shiny) {
 
         // Safely extract and validate each property
         config = {
-          items: validateTreeItems(rawConfig?.items ?? []),
+          items: rawConfig?.columns
+            ? decodeColumns(rawConfig.columns)
+            : validateTreeItems(rawConfig?.items ?? []),
           selected: parseStringArray(rawConfig?.selected ?? []),
           expanded: parseStringArray(rawConfig?.expanded ?? []),
           multiple: Boolean(rawConfig?.multiple),
@@ -100,7 +238,8 @@ if (window.Shiny) {
         };
 
         // Log warning if items array is empty after validation
-        if (Array.isArray(rawConfig?.items) && rawConfig.items.length > 0 && config.items.length === 0) {
+        const rawItems = rawConfig?.columns ? rawConfig.columns.ids : rawConfig?.items;
+        if (Array.isArray(rawItems) && rawItems.length > 0 && config.items.length === 0) {
           console.warn('All tree items failed validation - check item structure (id and label are required)');
         }
       } catch (e) {
@@ -123,20 +262,62 @@ if (window.Shiny) {
         callback(allowDeferred || false);
       };
 
+      // Ask the server to load the children of a lazy item
+      const requestChildren = (itemId: string) => {
+        window.Shiny.setInputValue!(`${el.id}_load`, itemId, { priority: 'event' });
+      };
+
       // Create React root and render component
       const root = createRoot(el);
       this.boundElementRoots.set(el, root);
 
+      const handle = React.createRef<ShinyTreeViewHandle>();
+      this.boundElementHandles.set(el, handle);
+
       root.render(React.createElement(ShinyTreeView, {
+        ref: handle,
         items,
         selected,
         expanded,
         multiple,
         checkbox,
-        updateShinyValue: updateValue
+        updateShinyValue: updateValue,
+        requestChildren
       }));
     }
 
+    override receiveMessage(el: HTMLElement, data: any): void {
+      const handle = this.boundElementHandles.get(el)?.current;
+      if (!handle) {
+        return;
+      }
+
+      // Tree data changes from update_treeview(), either complete or as a patch
+      if (Array.isArray(data?.items)) {
+        handle.setItems(validateTreeItems(data.items));
+      }
+      if (Array.isArray(data?.patch)) {
+        handle.applyPatch(validatePatch(data.patch));
+      }
+
+      // Children of a lazy item, returned by the server loader
+      if (data?.load && typeof data.load.id === 'string') {
+        if (data.load.error === true) {
+          handle.loadFailed(data.load.id);
+        } else {
+          handle.loadChildren(data.load.id, validateTreeItems(data.load.items));
+        }
+      }
+
+      // Selection and expansion changes from update_treeview()
+      if (Array.isArray(data?.selected)) {
+        handle.setSelected(parseStringArray(data.selected));
+      }
+      if (Array.isArray(data?.expanded)) {
+        handle.setExpanded(parseStringArray(data.expanded));
+      }
+    }
+
     override unsubscribe(el: HTMLElement): void {
       // Clean up React root to prevent memory leaks
       const root = this.boundElementRoots.get(el);
@@ -147,6 +328,7 @@ if (window.Shiny) {
 
       // Clean up value storage
       this.boundElementValues.delete(el);
+      this.boundElementHandles.delete(el);
     }
   }
 
@@ -0,0 +1,274 @@
+import type { ShinyTreeItem } from "./treeview";
+
+// Lazy items show a single disabled placeholder child until their children load
+const LOADING_PREFIX = "__shiny_treeview_loading__";
+
+export function loadingPlaceholder(parentId: string): ShinyTreeItem {
+  return { id: LOADING_PREFIX + parentId, label: "Loading…", disabled: true };
+}
+
+export function isUnloaded(item: ShinyTreeItem | undefined): boolean {
+  return (
+    item?.lazy === true &&
+    item.children?.length === 1 &&
+    item.children[0].id === LOADING_PREFIX + item.id
+  );
+}
+
+// Changes to the tree data sent by the server, applied in order
+export type TreeOp =
+  | { op: "insert"; parent: string | null; index?: number; items: ShinyTreeItem[] }
+  | { op: "remove"; ids: string[] }
+  | { op: "move"; id: string; parent: string | null; index?: number }
+  | { op: "children"; parent: string | null; ids: string[]; items: ShinyTreeItem[] }
+  | {
+      op: "set";
+      id: string;
+      label?: string;
+      caption?: string;
+      disabled?: boolean;
+      lazy?: boolean;
+    };
+
+// Every item by id, with the id of its parent (null for roots)
+export interface TreeLookup {
+  items: Map<string, ShinyTreeItem>;
+  parents: Map<string, string | null>;
+}
+
+export function buildLookup(roots: ShinyTreeItem[]): TreeLookup {
+  const lookup: TreeLookup = { items: new Map(), parents: new Map() };
+  addToLookup(lookup, roots, null);
+  return lookup;
+}
+
+function addToLookup(
+  lookup: TreeLookup,
+  items: ShinyTreeItem[],
+  parentId: string | null,
+): void {
+  const stack: [ShinyTreeItem[], string | null][] = [[items, parentId]];
+  while (stack.length > 0) {
+    const [list, parent] = stack.pop()!;
+    for (const item of list) {
+      lookup.items.set(item.id, item);
+      lookup.parents.set(item.id, parent);
+      if (item.children && !isUnloaded(item)) {
+        stack.push([item.children, item.id]);
+      }
+    }
+  }
+}
+
+// Insert items into a list at an index, appending if the index is missing
+function insertAt<T>(list: T[], index: number | undefined, items: T[]): void {
+  const at = typeof index === "number" ? Math.max(0, Math.min(index, list.length)) : list.length;
+  // Spread arguments are limited in number, so only small lists are spliced in
+  if (items.length <= 1000) {
+    list.splice(at, 0, ...items);
+    return;
+  }
+  const tail = list.splice(at);
+  for (const item of items) list.push(item);
+  for (const item of tail) list.push(item);
+}
+
+// Apply changes to the tree data, returning the new roots. Items are treated as
+// immutable. The changes are first made to lists of child ids, copied once per
+// patch for each parent whose children change. Then the changed items and their
+// ancestors are copied once, children first. The lookup is updated to match the
+// new roots.
+export function applyPatch(
+  roots: ShinyTreeItem[],
+  lookup: TreeLookup,
+  ops: TreeOp[],
+): ShinyTreeItem[] {
+  const childIds = new Map<string | null, string[]>();
+  const changed = new Set<string>();
+  // Items given children by the patch, which show their placeholder again if they
+  // are lazy and lose them all
+  const loaded = new Set<string | null>();
+
+  const childrenOf = (parentId: string | null): ShinyTreeItem[] => {
+    if (parentId === null) return roots;
+    const parent = lookup.items.get(parentId)!;
+    return isUnloaded(parent) ? [] : parent.children ?? [];
+  };
+
+  const currentIds = (parentId: string | null): string[] =>
+    childIds.get(parentId) ?? childrenOf(parentId).map((item) => item.id);
+
+  // Get the list of child ids of an item to change
+  const idsOf = (parentId: string | null): string[] => {
+    let ids = childIds.get(parentId);
+    if (!ids) {
+      ids = currentIds(parentId);
+      childIds.set(parentId, ids);
+    }
+    return ids;
+  };
+
+  const removeSubtree = (id: string) => {
+    const stack = [id];
+    while (stack.length > 0) {
+      const node = stack.pop()!;
+      for (const childId of currentIds(node)) stack.push(childId);
+      lookup.items.delete(node);
+      lookup.parents.delete(node);
+      childIds.delete(node);
+    }
+  };
+
+  // Whether a node or one of its ancestors is among the given ids
+  const isInsideAny = (parentId: string | null, ids: Set<string>): boolean => {
+    for (let node = parentId; node !== null; node = lookup.parents.get(node) ?? null) {
+      if (ids.has(node)) return true;
+    }
+    return false;
+  };
+
+  // A node and its ancestors, which an item is never moved into
+  const ancestors = (parentId: string | null): Set<string> => {
+    const result = new Set<string>();
+    for (let node = parentId; node !== null; node = lookup.parents.get(node) ?? null) {
+      result.add(node);
+    }
+    return result;
+  };
+
+  for (const op of ops) {
+    if (op.op === "insert") {
+      if (op.parent !== null && !lookup.items.has(op.parent)) continue;
+      const items = op.items.filter((item) => !lookup.items.has(item.id));
+      insertAt(idsOf(op.parent), op.index, items.map((item) => item.id));
+      if (items.length > 0) loaded.add(op.parent);
+      addToLookup(lookup, items, op.parent);
+    } else if (op.op === "remove") {
+      const ids = new Set(op.ids.filter((id) => lookup.items.has(id)));
+      // Group by parent, so removing many siblings filters their list once.
+      // Items inside another removed item are removed with it.
+      const removed = new Map<string | null, string[]>();
+      for (const id of ids) {
+        const parentId = lookup.parents.get(id) ?? null;
+        if (isInsideAny(parentId, ids)) continue;
+        if (!removed.has(parentId)) removed.set(parentId, []);
+        removed.get(parentId)!.push(id);
+      }
+      for (const [parentId, group] of removed) {
+        childIds.set(parentId, idsOf(parentId).filter((id) => !ids.has(id)));
+        group.forEach(removeSubtree);
+      }
+    } else if (op.op === "move") {
+      if (!lookup.items.has(op.id) || (op.parent !== null && !lookup.items.has(op.parent))) {
+        continue;
+      }
+      if (ancestors(op.parent).has(op.id)) continue;
+      const siblings = idsOf(lookup.parents.get(op.id) ?? null);
+      siblings.splice(siblings.indexOf(op.id), 1);
+      lookup.parents.set(op.id, op.parent);
+      insertAt(idsOf(op.parent), op.index, [op.id]);
+      loaded.add(op.parent);
+    } else if (op.op === "children") {
+      if (op.parent !== null && !lookup.items.has(op.parent)) continue;
+      const items = new Map(
+        op.items.filter((item) => !lookup.items.has(item.id)).map((item) => [item.id, item]),
+      );
+      const excluded = ancestors(op.parent);
+      const order: string[] = [];
+      const listed = new Set<string>();
+      // Items moved here, grouped by their old parent to filter its list once
+      const moved = new Map<string | null, Set<string>>();
+      for (const id of op.ids) {
+        if (listed.has(id) || excluded.has(id)) continue;
+        if (!items.has(id)) {
+          if (!lookup.items.has(id)) continue;
+          const parentId = lookup.parents.get(id) ?? null;
+          if (parentId !== op.parent) {
+            if (!moved.has(parentId)) moved.set(parentId, new Set());
+            moved.get(parentId)!.add(id);
+          }
+        }
+        order.push(id);
+        listed.add(id);
+      }
+      for (const [parentId, group] of moved) {
+        childIds.set(parentId, idsOf(parentId).filter((id) => !group.has(id)));
+        group.forEach((id) => lookup.parents.set(id, op.parent));
+      }
+      // Children that are not listed stay after the listed ones
+      for (const id of idsOf(op.parent)) {
+        if (!listed.has(id)) order.push(id);
+      }
+      childIds.set(op.parent, order);
+      if (order.length > 0) loaded.add(op.parent);
+      addToLookup(lookup, [...items.values()], op.parent);
+    } else if (op.op === "set") {
+      const item = lookup.items.get(op.id);
+      if (!item) continue;
+      const updated: ShinyTreeItem = { ...item };
+      if (op.label !== undefined) updated.label = op.label;
+      if (op.caption !== undefined) updated.caption = op.caption;
+      if (op.disabled !== undefined) updated.disabled = op.disabled;
+      if (op.lazy !== undefined) {
+        updated.lazy = op.lazy;
+        if (op.lazy && !updated.children) {
+          updated.children = [loadingPlaceholder(op.id)];
+        } else if (!op.lazy && isUnloaded(item)) {
+          delete updated.children;
+        }
+      }
+      lookup.items.set(op.id, updated);
+      changed.add(op.id);
+    }
+  }
+
+  // Mark the changed items and their ancestors, which are copied to refer to them
+  const copied = new Set<string | null>();
+  for (const id of [...changed, ...childIds.keys()]) {
+    if (id !== null && !lookup.items.has(id)) continue;
+    for (let node = id; !copied.has(node); node = lookup.parents.get(node!) ?? null) {
+      copied.add(node);
+      if (node === null) break;
+    }
+  }
+  if (!copied.has(null)) return roots;
+
+  // Visit them from the roots, then copy them in reverse so children come first
+  const order: (string | null)[] = [];
+  const stack: (string | null)[] = [null];
+  while (stack.length > 0) {
+    const id = stack.pop()!;
+    order.push(id);
+    for (const childId of currentIds(id)) {
+      if (copied.has(childId)) stack.push(childId);
+    }
+  }
+
+  let result = roots;
+  for (let i = order.length - 1; i >= 0; i--) {
+    const id = order[i];
+    const children = currentIds(id).map((childId) => lookup.items.get(childId)!);
+    if (id === null) {
+      result = children;
+      continue;
+    }
+    const previous = lookup.items.get(id)!;
+    if (isUnloaded(previous) && !childIds.has(id)) continue;
+    const { children: previousChildren, ...item } = previous;
+    if (children.length > 0) {
+      lookup.items.set(id, { ...item, children });
+    } else if (
+      item.lazy &&
+      childIds.has(id) &&
+      (loaded.has(id) || (previousChildren?.length && !isUnloaded(previous)))
+    ) {
+      // A lazy item that loses all its loaded children shows its placeholder
+      // again, so that they can be loaded again
+      lookup.items.set(id, { ...item, children: [loadingPlaceholder(id)] });
+    } else {
+      lookup.items.set(id, item);
+    }
+  }
+
+  return result;
+}
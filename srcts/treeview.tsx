@@ -2,8 +2,9 @@ import React from "react";
 import { RichTreeView } from "@mui/x-tree-view/RichTreeView";
 import { TreeItem, TreeItemProps } from "@mui/x-tree-view/TreeItem";
 import { TreeViewBaseItem } from "@mui/x-tree-view/models";
-import { useTreeItemModel } from "@mui/x-tree-view/hooks";
+import { useTreeItemModel, useTreeViewApiRef } from "@mui/x-tree-view/hooks";
 import { Typography } from "@mui/material";
+import { TreeLookup, TreeOp, applyPatch, buildLookup, isUnloaded } from "./items";
 
 // Define the tree item type that extends MUI's base type
 export interface ShinyTreeItem extends TreeViewBaseItem {
@@ -12,6 +13,17 @@ export interface ShinyTreeItem extends TreeViewBaseItem {
   caption?: string;
   children?: ShinyTreeItem[];
   disabled?: boolean;
+  lazy?: boolean;
+}
+
+// Methods used by the input binding to update the tree from the server
+export interface ShinyTreeViewHandle {
+  loadChildren: (itemId: string, children: ShinyTreeItem[]) => void;
+  loadFailed: (itemId: string) => void;
+  setItems: (items: ShinyTreeItem[]) => void;
+  applyPatch: (ops: TreeOp[]) => void;
+  setSelected: (itemIds: string[]) => void;
+  setExpanded: (itemIds: string[]) => void;
 }
 
 // Custom label component for items with captions
@@ -56,13 +68,14 @@ const CustomTreeItem = React.forwardRef(function CustomTreeItem(
 });
 
 // React component for MUI RichTreeView
-export function ShinyTreeView({
+export const ShinyTreeView = React.forwardRef(function ShinyTreeView({
   items,
   selected,
   expanded,
   multiple,
   checkbox,
-  updateShinyValue
+  updateShinyValue,
+  requestChildren
 }: {
   items: ShinyTreeItem[];
   selected: string[];
@@ -70,26 +83,113 @@ export function ShinyTreeView({
   multiple: boolean;
   checkbox: boolean;
   updateShinyValue: (value: string[] | string | null) => void;
-}) {
+  requestChildren?: (itemId: string) => void;
+}, ref: React.Ref<ShinyTreeViewHandle>) {
+  const [treeItems, setTreeItems] = React.useState<ShinyTreeItem[]>(items);
   const [selectedItems, setSelectedItems] = React.useState<string[]>(selected);
   const [currentExpandedItems, setCurrentExpandedItems] = React.useState<string[]>(expanded);
+  // Filled in by the tree view, like the ref made by useTreeViewApiRef()
+  const apiRef: ReturnType<typeof useTreeViewApiRef> = React.useRef(undefined);
+  // Lazy items whose children have been requested but not received yet
+  const requestedItems = React.useRef(new Set<string>());
 
-  // Notify Shiny of the initial value on mount
-  React.useEffect(() => {
+  // Latest items, selection and expansion, for updates from the server. The
+  // lookup of items by id is built when the first patch arrives, then kept in sync.
+  const treeItemsRef = React.useRef(items);
+  const selectedRef = React.useRef(selected);
+  const expandedRef = React.useRef(expanded);
+  const lookupRef = React.useRef<TreeLookup | null>(null);
+
+  // Ask the server for the children of a lazy item, unless they are on their way
+  const loadIfNeeded = (itemId: string, item?: ShinyTreeItem) => {
+    if (!requestChildren || requestedItems.current.has(itemId)) return;
+    if (isUnloaded(item ?? apiRef.current?.getItem(itemId))) {
+      requestedItems.current.add(itemId);
+      requestChildren(itemId);
+    }
+  };
+
+  // Return appropriate type based on multiple setting
+  const sendValue = (itemIds: string[]) => {
     if (multiple) {
-      // Multiple selection: return array or null if empty
-      const multiValue = selected.length > 0 ? selected : null;
+      // Multiple selection: return array (becomes tuple in Python) or null if empty
+      const multiValue = itemIds.length > 0 ? itemIds : null;
       updateShinyValue(multiValue);
     } else {
       // Single selection: return single string or null
-      const singleValue = selected.length > 0 ? selected[0] : null;
+      const singleValue = itemIds.length > 0 ? itemIds[0] : null;
       updateShinyValue(singleValue);
     }
+  };
+
+  const selectItems = (itemIds: string[]) => {
+    selectedRef.current = itemIds;
+    setSelectedItems(itemIds);
+    sendValue(itemIds);
+  };
+
+  const expandItems = (itemIds: string[]) => {
+    expandedRef.current = itemIds;
+    setCurrentExpandedItems(itemIds);
+  };
+
+  // Show new items, keeping the selected and expanded items that still exist.
+  // Expanded lazy items that lost their children are loaded again.
+  const updateItems = (newItems: ShinyTreeItem[], lookup: TreeLookup) => {
+    treeItemsRef.current = newItems;
+    lookupRef.current = lookup;
+    setTreeItems(newItems);
+
+    const keptIds = selectedRef.current.filter((itemId) => lookup.items.has(itemId));
+    if (keptIds.length !== selectedRef.current.length) {
+      selectItems(keptIds);
+    }
+    expandItems(expandedRef.current.filter((itemId) => lookup.items.has(itemId)));
+    expandedRef.current.forEach((itemId) => loadIfNeeded(itemId, lookup.items.get(itemId)));
+  };
+
+  const patchItems = (ops: TreeOp[]) => {
+    const lookup = lookupRef.current ?? buildLookup(treeItemsRef.current);
+    updateItems(applyPatch(treeItemsRef.current, lookup, ops), lookup);
+  };
+
+  React.useImperativeHandle(ref, () => ({
+    loadChildren: (itemId: string, children: ShinyTreeItem[]) => {
+      requestedItems.current.delete(itemId);
+      patchItems([{ op: "insert", parent: itemId, items: children }]);
+    },
+    loadFailed: (itemId: string) => {
+      // Collapse the item, so that expanding it again asks for its children again
+      requestedItems.current.delete(itemId);
+      expandItems(expandedRef.current.filter((id) => id !== itemId));
+    },
+    setItems: (newItems: ShinyTreeItem[]) => {
+      updateItems(newItems, buildLookup(newItems));
+    },
+    applyPatch: patchItems,
+    setSelected: (itemIds: string[]) => {
+      selectItems(multiple ? [...itemIds].sort() : itemIds.slice(0, 1));
+    },
+    setExpanded: (itemIds: string[]) => {
+      expandItems(itemIds);
+      itemIds.forEach((itemId) => loadIfNeeded(itemId));
+    },
+  }), []);
+
+  // Notify Shiny of the initial value on mount
+  React.useEffect(() => {
+    sendValue(selected);
   }, []); // Empty dependency array means this runs once on mount
 
+  // Load lazy items that are initially expanded
+  React.useEffect(() => {
+    expanded.forEach((itemId) => loadIfNeeded(itemId));
+  }, []);
+
   return (
     <RichTreeView
-      items={items}
+      apiRef={apiRef}
+      items={treeItems}
       selectedItems={selectedItems}
       expandedItems={currentExpandedItems}
       multiSelect={multiple}
@@ -98,23 +198,17 @@ export function ShinyTreeView({
         item: CustomTreeItem,
       }}
       onExpandedItemsChange={(_event: any, itemIds: string[]) => {
-        setCurrentExpandedItems(itemIds);
+        expandItems(itemIds);
+      }}
+      onItemExpansionToggle={(_event: any, itemId: string, isExpanded: boolean) => {
+        if (isExpanded) {
+          loadIfNeeded(itemId);
+        }
       }}
       onSelectedItemsChange={(_event: any, itemIds: string | string[] | null) => {
         const normalizedIds = Array.isArray(itemIds) ? itemIds : itemIds ? [itemIds] : [];
         normalizedIds.sort();
-        setSelectedItems(normalizedIds);
-
-        // Return appropriate type based on multiple setting
-        if (multiple) {
-          // Multiple selection: return array (becomes tuple in Python) or null if empty
-          const multiValue = normalizedIds.length > 0 ? normalizedIds : null;
-          updateShinyValue(multiValue);
-        } else {
-          // Single selection: return single string or null
-          const singleValue = normalizedIds.length > 0 ? normalizedIds[0] : null;
-          updateShinyValue(singleValue);
-        }
+        selectItems(normalizedIds);
       }}
       isItemDisabled={(item: any) => {
         return item.disabled === true;
@@ -130,4 +224,4 @@ export function ShinyTreeView({
       }}
     />
   );
-}
+});
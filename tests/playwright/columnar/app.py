@@ -0,0 +1,42 @@
+from shiny import App, render, ui
+
+from shiny_treeview import TreeItem, input_treeview
+
+tree_data = [
+    TreeItem(
+        id="folder1",
+        label="📁 Folder",
+        children=[
+            TreeItem(id="file1", label="📄 File", caption="First file"),
+            TreeItem(id="file2", label="📄 File", disabled=True),
+            TreeItem(
+                id="subfolder1",
+                label="📁 Folder",
+                children=[TreeItem(id="subfile1", label="📄 File")],
+            ),
+        ],
+    ),
+    TreeItem(id="standalone", label="Standalone File"),
+]
+
+
+app_ui = ui.page_fluid(
+    ui.h1("Treeview Test App"),
+    input_treeview(
+        id="my_treeview",
+        items=tree_data,
+        selected="subfile1",
+        multiple=True,
+        columnar=True,
+    ),
+    ui.output_code("my_treeview_txt"),
+)
+
+
+def server(input, output, session):
+    @render.code
+    def my_treeview_txt():
+        return str(input.my_treeview())
+
+
+app = App(app_ui, server)
@@ -0,0 +1,35 @@
+"""Tests for the columnar wire format of tree data."""
+
+from playwright.sync_api import Page
+from shiny.playwright.controller import OutputCode
+from shiny.run import ShinyAppProc
+
+from shiny_treeview.playwright import InputTreeView
+
+
+class TestShinyIntegration:
+    """Integration tests with Shiny app."""
+
+    def test_initial_state(self, page: Page, local_app: ShinyAppProc):
+        """Test that the tree is rebuilt from the columnar format."""
+        page.goto(local_app.url)
+
+        treeview = InputTreeView(page, "my_treeview")
+        treeview.expect_selected("subfile1")
+        treeview.expect_expanded(["folder1", "subfolder1"])
+        treeview.expect_disabled("file2")
+        OutputCode(page, "my_treeview_txt").expect_value("('subfile1',)")
+
+        file1 = treeview.item_locator("file1")
+        file1.get_by_text("First file").wait_for()
+
+    def test_interact(self, page: Page, local_app: ShinyAppProc):
+        """Test interactions with a tree sent in the columnar format."""
+        page.goto(local_app.url)
+
+        treeview = InputTreeView(page, "my_treeview")
+        treeview_txt = OutputCode(page, "my_treeview_txt")
+
+        treeview.select(["file1", "standalone"])
+        treeview.expect_selected(["file1", "standalone"])
+        treeview_txt.expect_value("('file1', 'standalone')")
@@ -0,0 +1,46 @@
+from shiny import App, reactive, render, ui
+
+from shiny_treeview import TreeItem, input_treeview, update_treeview
+
+
+def make_tree(version: int) -> list[TreeItem]:
+    files = [TreeItem(id=f"file{i}", label=f"📄 File {i}") for i in range(1, 4)]
+    if version % 2:
+        # Rename the folder, remove a file and move another to the root
+        return [
+            TreeItem(id="folder1", label=f"📁 Folder v{version}", children=files[:1]),
+            files[2],
+        ]
+    return [TreeItem(id="folder1", label="📁 Folder", children=files)]
+
+
+app_ui = ui.page_fluid(
+    ui.h1("Treeview Test App"),
+    ui.output_ui("treeview_ui"),
+    ui.output_code("my_treeview_txt"),
+    ui.input_action_button("update", "Update"),
+)
+
+
+def server(input, output, session):
+    @render.ui
+    def treeview_ui():
+        return input_treeview(
+            id="my_treeview",
+            items=make_tree(0),
+            selected="file1",
+            expanded="folder1",
+            track=True,
+        )
+
+    @render.code
+    def my_treeview_txt():
+        return str(input.my_treeview())
+
+    @reactive.effect
+    @reactive.event(input.update)
+    def _():
+        update_treeview("my_treeview", items=make_tree(input.update()))
+
+
+app = App(app_ui, server)
@@ -0,0 +1,33 @@
+"""Tests for replacing the items of a treeview from the server."""
+
+from playwright.sync_api import Page, expect
+from shiny.playwright.controller import InputActionButton, OutputCode
+from shiny.run import ShinyAppProc
+
+from shiny_treeview.playwright import InputTreeView
+
+
+class TestShinyIntegration:
+    """Integration tests with Shiny app."""
+
+    def test_diff(self, page: Page, local_app: ShinyAppProc):
+        """Test that new items are applied in place, keeping the client state."""
+        page.goto(local_app.url)
+
+        treeview = InputTreeView(page, "my_treeview")
+        treeview_txt = OutputCode(page, "my_treeview_txt")
+        treeview_txt.expect_value("file1")
+
+        InputActionButton(page, "update").click()
+        expect(treeview.item_locator("folder1")).to_contain_text("Folder v1")
+        expect(treeview.item_locator("file2")).to_have_count(0)
+        expect(treeview.item_locator("file3")).to_be_visible()
+        treeview.expect_expanded("folder1")
+        treeview.expect_selected("file1")
+
+        # Moved items stay selected
+        treeview.select("file3")
+        InputActionButton(page, "update").click()
+        expect(treeview.item_locator("file2")).to_be_visible()
+        treeview.expect_selected("file3")
+        treeview_txt.expect_value("file3")
@@ -0,0 +1,46 @@
+from shiny import App, render, ui
+
+from shiny_treeview import TreeItem, input_treeview, treeview_loader
+
+tree_data = [
+    TreeItem(id="folder1", label="📁 Folder 1", lazy=True),
+    TreeItem(id="folder2", label="📁 Folder 2", lazy=True),
+    TreeItem(id="flaky", label="📁 Flaky Folder", lazy=True),
+    TreeItem(id="standalone", label="Standalone File"),
+]
+
+
+app_ui = ui.page_fluid(
+    ui.h1("Treeview Test App"),
+    input_treeview(id="my_treeview", items=tree_data, expanded="folder2"),
+    ui.output_code("my_treeview_txt"),
+    ui.output_code("load_txt"),
+)
+
+
+def server(input, output, session):
+    failed = set()
+
+    @treeview_loader("my_treeview")
+    def load_children(item_id: str) -> list[TreeItem]:
+        if item_id == "folder2":
+            return []
+        # The first load fails, so that it has to be retried
+        if item_id == "flaky" and item_id not in failed:
+            failed.add(item_id)
+            raise RuntimeError("Temporary failure")
+        return [
+            TreeItem(id=f"{item_id}-subfolder", label="📁 Subfolder", lazy=True),
+            TreeItem(id=f"{item_id}-file", label="📄 File"),
+        ]
+
+    @render.code
+    def my_treeview_txt():
+        return str(input.my_treeview())
+
+    @render.code
+    def load_txt():
+        return str(input.my_treeview_load())
+
+
+app = App(app_ui, server)
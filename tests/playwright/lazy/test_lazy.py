@@ -0,0 +1,56 @@
+"""Tests for lazy loading of tree items."""
+
+from playwright.sync_api import Page
+from shiny.playwright.controller import OutputCode
+from shiny.run import ShinyAppProc
+
+from shiny_treeview.playwright import InputTreeView
+
+
+class TestShinyIntegration:
+    """Integration tests with Shiny app."""
+
+    def test_initial_state(self, page: Page, local_app: ShinyAppProc):
+        """Test that initially expanded lazy items are loaded."""
+        page.goto(local_app.url)
+
+        treeview = InputTreeView(page, "my_treeview")
+        OutputCode(page, "load_txt").expect_value("folder2")
+        treeview.expect_selected(None)
+
+    def test_load_on_expand(self, page: Page, local_app: ShinyAppProc):
+        """Test that children are loaded from the server when expanded."""
+        page.goto(local_app.url)
+
+        treeview = InputTreeView(page, "my_treeview")
+        treeview_txt = OutputCode(page, "my_treeview_txt")
+        load_txt = OutputCode(page, "load_txt")
+
+        treeview.expand("folder1")
+        load_txt.expect_value("folder1")
+        treeview.item_locator("folder1-file").wait_for()
+
+        treeview.select("folder1-file")
+        treeview.expect_selected("folder1-file")
+        treeview_txt.expect_value("folder1-file")
+
+        # Loaded children can themselves be lazy
+        treeview.expand("folder1-subfolder")
+        load_txt.expect_value("folder1-subfolder")
+
+    def test_load_error(self, page: Page, local_app: ShinyAppProc):
+        """Test that items whose children fail to load can be expanded again."""
+        page.goto(local_app.url)
+
+        treeview = InputTreeView(page, "my_treeview")
+        load_txt = OutputCode(page, "load_txt")
+        load_txt.expect_value("folder2")
+
+        # The failed load collapses the item again
+        treeview.expand("flaky")
+        load_txt.expect_value("flaky")
+        treeview.expect_expanded(None)
+
+        treeview.expand("flaky")
+        treeview.item_locator("flaky-file").wait_for()
+        treeview.expect_expanded("flaky")
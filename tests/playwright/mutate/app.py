@@ -0,0 +1,49 @@
+from shiny import App, reactive, render, ui
+
+from shiny_treeview import (
+    TreeItem,
+    input_treeview,
+    insert_tree_items,
+    move_tree_item,
+    remove_tree_items,
+    set_tree_item,
+)
+
+tree_data = [
+    TreeItem(
+        id="folder1",
+        label="📁 Folder",
+        children=[
+            TreeItem(id="file1", label="📄 File 1"),
+            TreeItem(id="file2", label="📄 File 2"),
+        ],
+    ),
+    TreeItem(id="standalone", label="Standalone File"),
+]
+
+
+app_ui = ui.page_fluid(
+    ui.h1("Treeview Test App"),
+    input_treeview(id="my_treeview", items=tree_data, expanded="folder1"),
+    ui.output_code("my_treeview_txt"),
+    ui.input_action_button("change", "Change"),
+)
+
+
+def server(input, output, session):
+    @render.code
+    def my_treeview_txt():
+        return str(input.my_treeview())
+
+    @reactive.effect
+    @reactive.event(input.change)
+    def _():
+        insert_tree_items(
+            "my_treeview", "folder1", [TreeItem("file3", "📄 File 3")], index=0
+        )
+        move_tree_item("my_treeview", "standalone", "folder1")
+        set_tree_item("my_treeview", "file1", label="📄 Renamed", disabled=True)
+        remove_tree_items("my_treeview", "file2")
+
+
+app = App(app_ui, server)
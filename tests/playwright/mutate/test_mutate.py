@@ -0,0 +1,33 @@
+"""Tests for changing individual items of a treeview from the server."""
+
+from playwright.sync_api import Page, expect
+from shiny.playwright.controller import InputActionButton, OutputCode
+from shiny.run import ShinyAppProc
+
+from shiny_treeview.playwright import InputTreeView
+
+
+class TestShinyIntegration:
+    """Integration tests with Shiny app."""
+
+    def test_mutate(self, page: Page, local_app: ShinyAppProc):
+        """Test that inserted, moved, changed and removed items are shown."""
+        page.goto(local_app.url)
+
+        treeview = InputTreeView(page, "my_treeview")
+        treeview_txt = OutputCode(page, "my_treeview_txt")
+        treeview.select("file2")
+        treeview_txt.expect_value("file2")
+
+        InputActionButton(page, "change").click()
+        folder = treeview.item_locator("folder1")
+        expect(folder.locator('[role="treeitem"]')).to_have_count(3)
+        expect(folder.locator('[role="treeitem"]').first).to_contain_text("File 3")
+        expect(folder.locator('[role="treeitem"]').last).to_contain_text("Standalone")
+        expect(treeview.item_locator("file1")).to_contain_text("Renamed")
+        treeview.expect_disabled("file1")
+
+        # Removing the selected item clears the selection
+        expect(treeview.item_locator("file2")).to_have_count(0)
+        treeview.expect_selected(None)
+        treeview_txt.expect_value("None")
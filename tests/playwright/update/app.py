@@ -0,0 +1,45 @@
+from shiny import App, reactive, render, ui
+
+from shiny_treeview import TreeItem, input_treeview, update_treeview
+
+tree_data = [
+    TreeItem(
+        id="folder1",
+        label="📁 Folder",
+        children=[
+            TreeItem(id="file1", label="📄 File 1"),
+            TreeItem(id="file2", label="📄 File 2"),
+        ],
+    ),
+    TreeItem(id="standalone", label="Standalone File"),
+]
+
+
+app_ui = ui.page_fluid(
+    ui.h1("Treeview Test App"),
+    input_treeview(id="my_treeview", items=tree_data, multiple=True),
+    ui.output_code("my_treeview_txt"),
+    ui.input_action_button("select", "Select"),
+    ui.input_action_button("clear", "Clear"),
+)
+
+
+def server(input, output, session):
+    @render.code
+    def my_treeview_txt():
+        return str(input.my_treeview())
+
+    @reactive.effect
+    @reactive.event(input.select)
+    def _():
+        update_treeview(
+            "my_treeview", selected=["standalone", "file2"], expanded="folder1"
+        )
+
+    @reactive.effect
+    @reactive.event(input.clear)
+    def _():
+        update_treeview("my_treeview", selected=[], expanded=[])
+
+
+app = App(app_ui, server)
@@ -0,0 +1,34 @@
+"""Tests for updating a treeview from the server."""
+
+from playwright.sync_api import Page
+from shiny.playwright.controller import InputActionButton, OutputCode
+from shiny.run import ShinyAppProc
+
+from shiny_treeview.playwright import InputTreeView
+
+
+class TestShinyIntegration:
+    """Integration tests with Shiny app."""
+
+    def test_update(self, page: Page, local_app: ShinyAppProc):
+        """Test that selection and expansion are updated in place."""
+        page.goto(local_app.url)
+
+        treeview = InputTreeView(page, "my_treeview")
+        treeview_txt = OutputCode(page, "my_treeview_txt")
+        treeview_txt.expect_value("None")
+
+        InputActionButton(page, "select").click()
+        treeview.expect_expanded("folder1")
+        treeview.expect_selected(["file2", "standalone"])
+        treeview_txt.expect_value("('file2', 'standalone')")
+
+        # The user can keep interacting after an update
+        treeview.select("file1")
+        treeview.expect_selected("file1")
+        treeview_txt.expect_value("('file1',)")
+
+        InputActionButton(page, "clear").click()
+        treeview.expect_expanded(None)
+        treeview.expect_selected(None)
+        treeview_txt.expect_value("None")
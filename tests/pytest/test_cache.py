@@ -0,0 +1,165 @@
+"""Tests for the process-wide payload cache."""
+
+import json
+
+import pytest
+
+from shiny_treeview import TreeIndex, TreeItem, TreeTable, input_treeview
+from shiny_treeview.cache import (
+    _DEFAULT_MAX_SIZE,
+    _fingerprint,
+    _PayloadCache,
+    cache_clear,
+    cache_info,
+    set_cache_size,
+)
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    """Start each test with an empty cache of the default size."""
+    cache_clear()
+    yield
+    set_cache_size(_DEFAULT_MAX_SIZE)
+    cache_clear()
+
+
+def make_tree():
+    """Create a small tree with a nested item."""
+    return [
+        TreeItem(
+            id="folder1",
+            label="Folder 1",
+            children=[TreeItem(id="file1", label="File 1")],
+        ),
+        TreeItem(id="standalone", label="</script>"),
+    ]
+
+
+def payload(tag):
+    """Get the JSON payload of a rendered treeview."""
+    return json.loads(tag.children[0].children[0])
+
+
+def test_input_treeview_cache_hits():
+    """Test that cached payloads match uncached ones with per-call state."""
+    tree = make_tree()
+    expected = payload(input_treeview("tree", tree, selected="file1"))
+    assert cache_info().misses == 0
+
+    for _ in range(3):
+        result = input_treeview("tree", tree, selected="file1", cache=True)
+        assert payload(result) == expected
+
+    other = payload(input_treeview("tree", tree, selected="standalone", cache=True))
+    assert other["selected"] == ["standalone"]
+    assert other["expanded"] == []
+
+    info = cache_info()
+    assert (info.hits, info.misses, info.entries) == (3, 1, 1)
+    assert info.size > 0
+
+
+def test_input_treeview_cache_content():
+    """Test that fingerprints identify trees by their content."""
+
+    def fingerprint(items):
+        return _fingerprint(items)[0]
+
+    assert fingerprint(make_tree()) == fingerprint(make_tree())
+    assert fingerprint(make_tree()) == fingerprint(TreeIndex(make_tree()))
+    assert fingerprint(make_tree()) == fingerprint(TreeTable.from_items(make_tree()))
+
+    changed = make_tree()
+    changed[0].label = "Folder 2"
+    assert fingerprint(changed) != fingerprint(make_tree())
+
+    input_treeview("tree", make_tree(), cache=True)
+    input_treeview("tree", TreeIndex(make_tree()), cache=True)
+    result = payload(input_treeview("tree", changed, cache=True))
+    assert result["items"][0]["label"] == "Folder 2"
+    assert cache_info()[:3] == (1, 2, 2)
+
+    # Columnar and nested payloads are cached separately
+    columnar = payload(input_treeview("tree", make_tree(), columnar=True, cache=True))
+    assert "columns" in columnar
+    assert cache_info().entries == 3
+
+
+def test_input_treeview_cache_serializes_once(monkeypatch):
+    """Test that a cache miss reuses the tree serialized for its fingerprint."""
+    import shiny_treeview.cache
+    import shiny_treeview.serialize
+
+    calls = []
+    original = shiny_treeview.serialize._items_json
+
+    def items_json(items):
+        calls.append(items)
+        return original(items)
+
+    monkeypatch.setattr(shiny_treeview.cache, "_items_json", items_json)
+    monkeypatch.setattr(shiny_treeview.serialize, "_items_json", items_json)
+    result = payload(input_treeview("tree", make_tree(), cache=True))
+    assert len(calls) == 1
+
+    # A list of items is still serialized to find its fingerprint
+    assert payload(input_treeview("tree", make_tree(), cache=True)) == result
+    assert len(calls) == 2
+
+
+def test_input_treeview_cache_invalid():
+    """Test that invalid tree data is reported before it is fingerprinted."""
+    for items in [
+        [TreeItem(id="item", label=1, validate=False)],
+        [TreeItem(id="item", label="A", children=[1], validate=False)],
+    ]:
+        with pytest.raises(ValueError, match="must be"):
+            input_treeview("tree", items, cache=True)
+    assert cache_info().entries == 0
+
+
+def test_input_treeview_cache_key():
+    """Test that an explicit key skips fingerprinting and validation."""
+    input_treeview("tree", make_tree(), cache="reference")
+
+    # The tree is assumed unchanged while the key is in use
+    bad = [TreeItem(id="item", label="A"), TreeItem(id="item", label="B")]
+    result = payload(input_treeview("tree", bad, cache="reference"))
+    assert [item["id"] for item in result["items"]] == ["folder1", "standalone"]
+
+    with pytest.raises(ValueError, match="Duplicate TreeItem IDs found"):
+        input_treeview("tree", bad, cache="other")
+    assert cache_info()[:3] == (1, 2, 1)
+
+
+def test_payload_cache_eviction():
+    """Test that least recently used entries are evicted to fit the limit."""
+    cache = _PayloadCache(max_size=1000)
+    value = "x" * 250
+    for key in ["a", "b", "c"]:
+        cache.put((key,), value)
+    assert cache.get(("a",)) == value
+
+    cache.put(("d",), value)
+    assert cache.get(("b",)) is None
+    assert cache.get(("a",)) == value
+    assert cache.info().entries == 3
+
+    cache.put(("large",), "x" * 2000)
+    assert cache.get(("large",)) is None
+
+    cache.resize(400)
+    assert cache.info().entries == 1
+    assert cache.get(("a",)) == value
+
+
+def test_set_cache_size():
+    """Test that a limit of zero disables caching."""
+    set_cache_size(0)
+    input_treeview("tree", make_tree(), cache=True)
+    input_treeview("tree", make_tree(), cache=True)
+    assert cache_info()[:3] == (0, 2, 0)
+
+    with pytest.raises(ValueError, match="max_size must be a non-negative"):
+        set_cache_size(-1)
@@ -0,0 +1,388 @@
+"""Tests for diffing tree data sent to the browser."""
+
+import json
+import random
+import shutil
+import subprocess
+from pathlib import Path
+
+import pytest
+
+from shiny_treeview import TreeItem, TreeTable, patch
+from shiny_treeview.patch import (
+    _MAX_SIBLING_OPS,
+    _diff,
+    _keep_loaded_children,
+    _longest_increasing,
+    _TreeState,
+)
+from shiny_treeview.serialize import _items_field
+
+# Client code that applies patches, run by Node.js when it can strip TypeScript types
+ITEMS_TS = Path(__file__).parents[2] / "srcts" / "items.ts"
+
+# Apply each case's operations with the real client code. Lazy items get a loading
+# placeholder, as the input binding does, which is removed from the results along
+# with fields that are set to their default values.
+APPLY_PATCH_JS = """
+import { readFileSync } from "node:fs";
+import { applyPatch, buildLookup, isUnloaded, loadingPlaceholder } from "%s";
+
+const withPlaceholders = (items) =>
+  items.map((item) => {
+    const children = item.children && withPlaceholders(item.children);
+    if (item.lazy && !children) return { ...item, children: [loadingPlaceholder(item.id)] };
+    return children ? { ...item, children } : item;
+  });
+
+const withoutPlaceholders = (items) =>
+  items.map(({ children, ...item }) => {
+    const loaded = children && !isUnloaded({ ...item, children });
+    // Drop fields set back to their defaults, which the server leaves out
+    for (const key of ["caption", "disabled", "lazy"]) if (!item[key]) delete item[key];
+    return loaded ? { ...item, children: withoutPlaceholders(children) } : item;
+  });
+
+const results = JSON.parse(readFileSync(0, "utf8")).map(({ roots, ops }) => {
+  const initial = withPlaceholders(roots);
+  const lookup = buildLookup(initial);
+  const patch = ops.map((op) =>
+    "items" in op ? { ...op, items: withPlaceholders(op.items) } : op,
+  );
+  const result = applyPatch(initial, lookup, patch);
+  const unloaded = [...lookup.items.values()].filter(isUnloaded).map((item) => item.id);
+  return {
+    roots: withoutPlaceholders(result),
+    ids: [...lookup.items.keys()].sort(),
+    unloaded: unloaded.sort(),
+  };
+});
+process.stdout.write(JSON.stringify(results));
+"""
+
+
+def node_apply_patch(tmp_path: Path, cases: list[tuple[list, list]]) -> list[dict]:
+    """Apply operations to trees of dicts in Node.js with `applyPatch()`."""
+    node = shutil.which("node")
+    if node is None:
+        pytest.skip("Node.js is not installed")
+    check = subprocess.run(
+        [node, "--no-warnings", "-p", "process.features.typescript"],
+        capture_output=True,
+        text=True,
+    )
+    if check.returncode != 0 or check.stdout.strip() in ("", "false", "undefined"):
+        pytest.skip("Node.js cannot strip TypeScript types")
+
+    script = tmp_path / "apply_patch.mjs"
+    script.write_text(APPLY_PATCH_JS % ITEMS_TS.as_uri())
+    result = subprocess.run(
+        [node, "--no-warnings", str(script)],
+        input=json.dumps([{"roots": roots, "ops": ops} for roots, ops in cases]),
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return json.loads(result.stdout)
+
+
+def from_dict(data: dict) -> TreeItem:
+    return TreeItem(
+        data["id"],
+        data["label"],
+        [from_dict(child) for child in data.get("children", [])],
+        caption=data.get("caption", ""),
+        disabled=data.get("disabled", False),
+        lazy=data.get("lazy", False),
+    )
+
+
+def apply_ops(state: _TreeState, ops: list[dict]) -> None:
+    """Apply operations the way the browser does."""
+    for op in ops:
+        if op["op"] == "remove":
+            state.remove(op["ids"])
+        elif op["op"] == "insert":
+            items = [from_dict(x) for x in op["items"]]
+            state.insert(op["parent"], items, op["index"])
+        elif op["op"] == "move":
+            # Nodes are never moved into their own subtree
+            ancestor = op["parent"]
+            while ancestor is not None:
+                assert ancestor != op["id"]
+                ancestor = state.parents[ancestor]
+            state.move(op["id"], op["parent"], op["index"])
+        elif op["op"] == "children":
+            # Place the listed nodes in order, before the other children
+            items = {x["id"]: from_dict(x) for x in op["items"]}
+            for index, id in enumerate(op["ids"]):
+                if id in items:
+                    state.insert(op["parent"], [items[id]], index)
+                else:
+                    state.move(id, op["parent"], index)
+        else:
+            fields = {k: v for k, v in op.items() if k not in ("op", "id")}
+            state.update(op["id"], **fields)
+
+
+def assert_same(a: _TreeState, b: _TreeState) -> None:
+    assert a.to_dicts(a.roots()) == b.to_dicts(b.roots())
+    assert a.parents == b.parents
+
+
+def random_tree(rng: random.Random, ids: list[str]) -> list[TreeItem]:
+    nodes = [
+        TreeItem(id, rng.choice(["A", "B"]), [], lazy=rng.random() < 0.1) for id in ids
+    ]
+    roots = []
+    for i, node in enumerate(nodes):
+        if i == 0 or rng.random() < 0.2:
+            roots.append(node)
+        else:
+            nodes[rng.randrange(i)].children.append(node)
+    return roots
+
+
+def make_tree() -> list[TreeItem]:
+    return [
+        TreeItem(
+            id="folder1",
+            label="Folder 1",
+            children=[
+                TreeItem(id="file1", label="File 1"),
+                TreeItem(id="file2", label="File 2"),
+                TreeItem(id="file3", label="File 3"),
+            ],
+        ),
+        TreeItem(id="folder2", label="Folder 2", lazy=True),
+    ]
+
+
+class TestDiff:
+    """Test the operations that turn one tree into another."""
+
+    def test_unchanged(self):
+        """Test that identical trees need no operations."""
+        old = _TreeState.from_items(make_tree())
+        assert _diff(old, _TreeState.from_items(make_tree())) == []
+
+    def test_changes(self):
+        """Test that each kind of change produces a minimal operation."""
+        items = make_tree()
+        old = _TreeState.from_items(items)
+
+        folder1, folder2 = items
+        folder1.children[0].label = "Renamed"
+        folder1.children.remove(folder1.children[1])
+        folder2.children.append(folder1.children.pop())
+        folder2.lazy = False
+        items.append(TreeItem(id="new", label="New", caption="Added"))
+        new = _TreeState.from_items(items)
+
+        assert _diff(old, new) == [
+            {"op": "remove", "ids": ["file2"]},
+            {
+                "op": "insert",
+                "parent": None,
+                "index": 2,
+                "items": [{"id": "new", "label": "New", "caption": "Added"}],
+            },
+            {"op": "move", "id": "file3", "parent": "folder2", "index": 0},
+            {"op": "set", "id": "folder2", "lazy": False},
+            {"op": "set", "id": "file1", "label": "Renamed"},
+        ]
+
+    def test_reorder(self):
+        """Test that only nodes out of order are moved."""
+        items = [TreeItem(id=f"item{i}", label="Item") for i in range(10)]
+        old = _TreeState.from_items(items)
+        items.insert(0, items.pop())
+
+        ops = _diff(old, _TreeState.from_items(items))
+        assert ops == [{"op": "move", "id": "item9", "parent": None, "index": 0}]
+
+    def test_many_changes(self):
+        """Test that many changes to one list of children are sent as its order."""
+        items = [TreeItem(id=f"item{i}", label="Item") for i in range(100)]
+        old = _TreeState.from_items(items)
+        new_items = [
+            x
+            for i, item in enumerate(items)
+            for x in (item, TreeItem(f"new{i}", "New"))
+        ]
+
+        ops = _diff(old, _TreeState.from_items(list(reversed(items))))
+        assert ops == [
+            {
+                "op": "children",
+                "parent": None,
+                "ids": [f"item{i}" for i in reversed(range(100))],
+                "items": [],
+            }
+        ]
+        ops = _diff(old, _TreeState.from_items(new_items))
+        assert [op["op"] for op in ops] == ["children"]
+        assert ops[0]["items"] == [
+            {"id": f"new{i}", "label": "New"} for i in range(100)
+        ]
+
+    def test_kept_inside_removed(self):
+        """Test that kept descendants of removed nodes are inserted again."""
+        old = _TreeState.from_items(make_tree())
+        new = _TreeState.from_items([TreeItem(id="file1", label="File 1")])
+
+        ops = _diff(old, new)
+        assert ops == [
+            {"op": "remove", "ids": ["folder1", "folder2"]},
+            {
+                "op": "insert",
+                "parent": None,
+                "index": 0,
+                "items": [{"id": "file1", "label": "File 1"}],
+            },
+        ]
+
+    @pytest.mark.parametrize("max_sibling_ops", [0, _MAX_SIBLING_OPS])
+    def test_random(self, monkeypatch, max_sibling_ops):
+        """Test that applying the operations always produces the new tree."""
+        monkeypatch.setattr(patch, "_MAX_SIBLING_OPS", max_sibling_ops)
+        rng = random.Random(1)
+        universe = [f"node{i}" for i in range(30)]
+        for _ in range(500):
+            old_items = random_tree(rng, rng.sample(universe, rng.randint(0, 20)))
+            new_items = random_tree(rng, rng.sample(universe, rng.randint(0, 20)))
+            old = _TreeState.from_items(old_items)
+            new = _TreeState.from_items(new_items)
+
+            apply_ops(old, _diff(old, new))
+            assert_same(old, new)
+
+    def test_tree_table(self):
+        """Test that a TreeTable gives the same snapshot as TreeItem objects."""
+        items = make_tree()
+        assert_same(
+            _TreeState.from_items(TreeTable.from_items(items)),
+            _TreeState.from_items(items),
+        )
+
+
+class TestKeepLoadedChildren:
+    """Test that lazy items without children keep the children loaded for them."""
+
+    def test_kept(self):
+        """Test that loaded children are kept under lazy items without children."""
+        old = _TreeState.from_items(make_tree())
+        old.insert("folder2", [TreeItem("a", "A", [TreeItem("b", "B")])])
+        new = _TreeState.from_items(make_tree())
+
+        _keep_loaded_children(old, new)
+        assert new.children["folder2"] == ["a"]
+        assert new.parents["b"] == "a"
+        assert _diff(old, new) == []
+
+    def test_not_kept(self):
+        """Test that children are replaced when given or when their IDs are taken."""
+        old = _TreeState.from_items(make_tree())
+        old.insert("folder2", [TreeItem("a", "A")])
+
+        items = make_tree()
+        items[1].children = [TreeItem("c", "C")]
+        new = _TreeState.from_items(items)
+        _keep_loaded_children(old, new)
+        assert new.children["folder2"] == ["c"]
+
+        items = make_tree()
+        items.append(TreeItem("a", "Moved"))
+        new = _TreeState.from_items(items)
+        _keep_loaded_children(old, new)
+        assert "folder2" not in new.children
+        assert new.parents["a"] is None
+
+
+class TestFromJson:
+    """Test snapshots built from the serialized items sent to the browser."""
+
+    def test_matches_items(self):
+        """Test that parsed snapshots match snapshots of the items."""
+        rng = random.Random(0)
+        trees = [
+            make_tree(),
+            random_tree(rng, [f"n{i}" for i in range(200)]),
+            [TreeItem("a", "<script>", caption="Caption", disabled=True)],
+            [],
+        ]
+        for items in trees:
+            expected = _TreeState.from_items(items)
+            for columnar in [False, True]:
+                state = _TreeState.from_json(_items_field(items, columnar))
+                assert state.fields == expected.fields
+                assert state.parents == expected.parents
+                assert state.children == expected.children
+
+
+class TestClientPatch:
+    """Test that the browser's patch code gives the same tree as the server."""
+
+    @pytest.mark.parametrize("max_sibling_ops", [0, _MAX_SIBLING_OPS])
+    def test_random_diffs(self, tmp_path, monkeypatch, max_sibling_ops):
+        """Test that diffs of random trees are applied to match the new tree."""
+        monkeypatch.setattr(patch, "_MAX_SIBLING_OPS", max_sibling_ops)
+        rng = random.Random(0)
+        cases, expected = [], []
+        for _ in range(100):
+            ids = [f"n{i}" for i in range(rng.randrange(1, 30))]
+            old = _TreeState.from_items(random_tree(rng, ids))
+            new = _TreeState.from_items(random_tree(rng, rng.sample(ids, len(ids))))
+            cases.append((old.to_dicts(old.roots()), _diff(old, new)))
+            expected.append(new)
+
+        for result, new in zip(node_apply_patch(tmp_path, cases), expected):
+            assert result["roots"] == new.to_dicts(new.roots())
+            assert result["ids"] == sorted(new.parents)
+
+    def test_lazy_placeholder(self, tmp_path):
+        """Test that lazy items that lose their loaded children can load again."""
+        roots = [
+            {"id": "lazy", "label": "Lazy", "lazy": True},
+            {"id": "empty", "label": "Empty", "lazy": True},
+        ]
+        loaded = {
+            "op": "insert",
+            "parent": "lazy",
+            "items": [{"id": "a", "label": "A"}],
+        }
+        cases = [
+            (roots, [loaded, {"op": "remove", "ids": ["a"]}]),
+            (roots, [loaded, {"op": "move", "id": "a", "parent": None}]),
+            # Loading no children leaves an item without children
+            (roots, [{"op": "insert", "parent": "empty", "items": []}]),
+        ]
+
+        results = node_apply_patch(tmp_path, cases)
+        assert [result["unloaded"] for result in results] == [
+            ["empty", "lazy"],
+            ["empty", "lazy"],
+            ["lazy"],
+        ]
+
+    def test_remove_with_ancestor(self, tmp_path):
+        """Test removing items together with one of their ancestors."""
+        cases, expected = [], []
+        for ids in [["file1", "folder1"], ["folder1", "file1"], ["file2", "folder2"]]:
+            state = _TreeState.from_items(make_tree())
+            cases.append(
+                (state.to_dicts(state.roots()), [{"op": "remove", "ids": ids}])
+            )
+            state.remove(ids)
+            expected.append(state)
+
+        for result, state in zip(node_apply_patch(tmp_path, cases), expected):
+            assert result["roots"] == state.to_dicts(state.roots())
+            assert result["ids"] == sorted(state.parents)
+
+
+def test_longest_increasing():
+    assert _longest_increasing([]) == []
+    assert _longest_increasing([3, 0, 1, 4, 2]) == [0, 1, 2]
+    assert _longest_increasing([4, 3, 2, 1]) == [1]
+    assert _longest_increasing(list(range(5))) == list(range(5))
@@ -0,0 +1,171 @@
+"""Tests for serialization of tree payloads."""
+
+import json
+
+from shiny_treeview import TreeItem, TreeTable
+from shiny_treeview.serialize import (
+    _columns_json,
+    _dumps,
+    _items_field,
+    _items_json,
+    _splice_payload,
+)
+
+
+def compact_json(obj) -> str:
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":"))
+
+
+def make_tree() -> list[TreeItem]:
+    return [
+        TreeItem(
+            id="folder1",
+            label="📁 Folder 1",
+            children=[
+                TreeItem(id="file1", label="📄 File 1", caption="First file"),
+                TreeItem(
+                    id="subfolder1",
+                    label='Subfolder "quoted"',
+                    children=[
+                        TreeItem(id="subfile1", label="Subfile 1", disabled=True),
+                        TreeItem(id="subfile2", label="Back\\slash\n"),
+                    ],
+                    caption="",
+                ),
+            ],
+        ),
+        TreeItem(id="standalone", label="Standalone", caption="é", disabled=True),
+        TreeItem(id="archive", label="Archive", lazy=True),
+    ]
+
+
+class TestItemsJson:
+    """Test the streaming serializer for tree items."""
+
+    def test_matches_json_dumps(self):
+        """Test that the output is identical to serializing dictionaries."""
+        items = make_tree()
+        expected = compact_json([x._to_dict() for x in items])
+
+        assert _items_json(items) == expected
+        assert _items_json(TreeTable.from_items(items)) == expected
+
+    def test_empty(self):
+        """Test serializing an empty tree."""
+        assert _items_json([]) == "[]"
+        assert _items_json(TreeTable.from_items([])) == "[]"
+
+    def test_single_leaf(self):
+        """Test serializing a single leaf item."""
+        assert _items_json([TreeItem(id="a", label="A")]) == '[{"id":"a","label":"A"}]'
+
+    def test_deep_tree(self):
+        """Test that deep trees do not hit the recursion limit."""
+        depth = 20_000
+        item = TreeItem(id=f"node{depth}", label="Leaf")
+        for i in reversed(range(depth)):
+            item = TreeItem(id=f"node{i}", label="Node", children=[item])
+
+        result = _items_json([item])
+        assert result.startswith('[{"id":"node0","label":"Node","children":[')
+        assert result.endswith('{"id":"node20000","label":"Leaf"}' + "]}" * depth + "]")
+
+
+def test_dumps():
+    """Test that the JSON backend produces compact UTF-8 output."""
+    assert _dumps(["a", "é", "📁"]) == '["a","é","📁"]'
+    assert _dumps([]) == "[]"
+    assert _dumps(True) == "true"
+
+
+def test_splice_payload():
+    """Test that the payload is equivalent to serializing a dictionary."""
+    items = make_tree()
+    payload = {
+        "items": [x._to_dict() for x in items],
+        "selected": ["file1", "subfile2"],
+        "expanded": ["folder1"],
+        "multiple": True,
+        "checkbox": False,
+    }
+
+    result = _splice_payload(
+        _items_field(items, columnar=False),
+        selected=["file1", "subfile2"],
+        expanded=["folder1"],
+        multiple=True,
+        checkbox=False,
+    )
+    assert result == compact_json(payload)
+    assert json.loads(result) == payload
+
+
+def test_splice_payload_script_safe():
+    """Test that labels cannot close or alter the enclosing script element."""
+    items = [TreeItem(id="a", label="</script><script>alert(1)</script><!--")]
+
+    result = _splice_payload(
+        _items_field(items, columnar=False),
+        selected=["<b>"],
+        expanded=[],
+        multiple=False,
+        checkbox=False,
+    )
+    assert "<" not in result
+    assert json.loads(result)["items"][0]["label"] == items[0].label
+    assert json.loads(result)["selected"] == ["<b>"]
+
+
+def test_columns_json():
+    """Test the compact columnar format of tree data."""
+    items = make_tree()
+    items[1].children.append(TreeItem(id="copy", label="📁 Folder 1"))
+
+    result = json.loads(_columns_json(items))
+    assert result == json.loads(_columns_json(TreeTable.from_items(items)))
+
+    table = TreeTable.from_items(items)
+    assert result["ids"] == table.ids
+    assert [result["label_table"][i] for i in result["labels"]] == table.labels
+    assert result["parents"] == list(table.parents)
+
+    # Repeated labels are only sent once
+    assert len(result["label_table"]) == len(table) - 1
+    assert result["label_table"].count("📁 Folder 1") == 1
+
+    # Sparse captions and disabled flags
+    assert result["captions"] == {str(i): x for i, x in enumerate(table.captions) if x}
+    assert [table.ids[i] for i in result["disabled"]] == ["standalone", "subfile1"]
+    assert [table.ids[i] for i in result["lazy"]] == ["archive"]
+
+
+def test_columns_json_empty():
+    """Test the columnar format of an empty tree."""
+    assert json.loads(_columns_json([])) == {
+        "ids": [],
+        "labels": [],
+        "label_table": [],
+        "parents": [],
+        "captions": {},
+        "disabled": [],
+        "lazy": [],
+    }
+
+
+def test_splice_payload_columnar():
+    """Test that the columnar payload replaces the nested items."""
+    items = make_tree()
+    result = json.loads(
+        _splice_payload(
+            _items_field(items, columnar=True),
+            selected=["file1"],
+            expanded=[],
+            multiple=False,
+            checkbox=True,
+        )
+    )
+
+    assert "items" not in result
+    assert result["columns"] == json.loads(_columns_json(items))
+    assert result["selected"] == ["file1"]
+    assert result["checkbox"] is True
@@ -0,0 +1,410 @@
+"""Tests for server functions."""
+
+import asyncio
+import contextvars
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from shiny import reactive, req
+from shiny.express._stub_session import ExpressStubSession
+from shiny.session import session_context
+
+from shiny_treeview import (
+    TreeItem,
+    input_treeview,
+    insert_tree_items,
+    move_tree_item,
+    remove_tree_items,
+    set_tree_item,
+    treeview_loader,
+    update_treeview,
+)
+from shiny_treeview.patch import _session_states
+
+
+class RecordingSession(ExpressStubSession):
+    """A session that runs effects and records input messages."""
+
+    def __init__(self):
+        super().__init__()
+        self.messages = []
+        self.flush_callbacks = []
+
+    def is_stub_session(self):
+        return False
+
+    def send_input_message(self, id, message):
+        self.messages.append((id, message))
+
+    def on_flush(self, fn, once=True):
+        self.flush_callbacks.append(fn)
+        return lambda: None
+
+    def flush(self):
+        callbacks, self.flush_callbacks = self.flush_callbacks, []
+        for fn in callbacks:
+            fn()
+
+
+def request_children(session: RecordingSession, item_id: str):
+    async def run():
+        await reactive.flush()
+        session.input["tree_load"]._set(item_id)
+        await reactive.flush()
+
+    # Run in another thread, since Playwright's sync API may already be running an
+    # event loop in this one when the whole suite runs together
+    context = contextvars.copy_context()
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        executor.submit(context.run, asyncio.run, run()).result()
+
+
+@pytest.mark.parametrize("is_async", [False, True])
+def test_treeview_loader(is_async):
+    """Test that loaded children are sent to the treeview."""
+    session = RecordingSession()
+
+    def children(item_id):
+        return [
+            TreeItem(id=f"{item_id}-folder", label="Folder", lazy=True),
+            TreeItem(id=f"{item_id}-file", label="File"),
+        ]
+
+    async def children_async(item_id):
+        return children(item_id)
+
+    with session_context(session):
+        treeview_loader("tree")(children_async if is_async else children)
+
+    request_children(session, "root")
+
+    assert session.messages == [
+        (
+            "tree",
+            {
+                "load": {
+                    "id": "root",
+                    "items": [
+                        {"id": "root-folder", "label": "Folder", "lazy": True},
+                        {"id": "root-file", "label": "File"},
+                    ],
+                }
+            },
+        )
+    ]
+
+
+def test_update_treeview():
+    """Test that only the given settings are sent to the treeview."""
+    session = RecordingSession()
+
+    with session_context(session):
+        update_treeview("tree", selected="file1")
+        update_treeview("tree", selected=[], expanded=["folder1", "folder2"])
+        update_treeview("tree", expanded="")
+        update_treeview("tree")
+
+    assert session.messages == [
+        ("tree", {"selected": ["file1"]}),
+        ("tree", {"selected": [], "expanded": ["folder1", "folder2"]}),
+        ("tree", {"expanded": []}),
+    ]
+
+
+def test_update_treeview_items():
+    """Test that only the differences from the last tree data are sent."""
+    session = RecordingSession()
+    items = [TreeItem(id="folder", label="Folder", children=[TreeItem("a", "A")])]
+
+    with session_context(session):
+        update_treeview("tree", items=items)
+        update_treeview("tree", items=items)
+        items[0].children.append(TreeItem("b", "B"))
+        update_treeview("tree", items=items)
+
+    assert session.messages == [
+        (
+            "tree",
+            {
+                "items": [
+                    {
+                        "id": "folder",
+                        "label": "Folder",
+                        "children": [{"id": "a", "label": "A"}],
+                    }
+                ]
+            },
+        ),
+        (
+            "tree",
+            {
+                "patch": [
+                    {
+                        "op": "insert",
+                        "parent": "folder",
+                        "index": 1,
+                        "items": [{"id": "b", "label": "B"}],
+                    }
+                ]
+            },
+        ),
+    ]
+
+
+def test_update_treeview_rendered_items():
+    """Test that updates are diffed against the tree data rendered in the UI."""
+    session = RecordingSession()
+    items = [TreeItem(id="folder", label="Folder", children=[TreeItem("a", "A")])]
+
+    with session_context(session):
+        # Tree data is only kept when tracking is requested
+        input_treeview("untracked", items)
+        assert "untracked" not in _session_states(session)
+
+        input_treeview("tree", items, track=True)
+        # Nothing but the serialized items is kept until the tree is updated
+        assert isinstance(_session_states(session)["tree"], str)
+
+        items[0].children.append(TreeItem("b", "B"))
+        update_treeview("tree", items=items)
+
+    assert session.messages == [
+        (
+            "tree",
+            {
+                "patch": [
+                    {
+                        "op": "insert",
+                        "parent": "folder",
+                        "index": 1,
+                        "items": [{"id": "b", "label": "B"}],
+                    }
+                ]
+            },
+        )
+    ]
+
+
+def test_treeview_loader_updates_items():
+    """Test that loaded children are part of the tree data used for diffing."""
+    session = RecordingSession()
+
+    with session_context(session):
+        update_treeview("tree", items=[TreeItem("root", "Root", lazy=True)])
+        treeview_loader("tree")(lambda item_id: [TreeItem("child", "Child")])
+
+    request_children(session, "root")
+    session.messages.clear()
+
+    # The same lazy item without children keeps the children loaded for it
+    with session_context(session):
+        update_treeview("tree", items=[TreeItem("root", "Root", lazy=True)])
+    assert session.messages == []
+
+    with session_context(session):
+        update_treeview("tree", items=[TreeItem("root", "Root")])
+    assert session.messages == [
+        (
+            "tree",
+            {
+                "patch": [
+                    {"op": "remove", "ids": ["child"]},
+                    {"op": "set", "id": "root", "lazy": False},
+                ]
+            },
+        )
+    ]
+
+
+def test_treeview_loader_errors(caplog):
+    """Test that failed loads are logged and reported to the treeview."""
+    session = RecordingSession()
+
+    def children(item_id):
+        if item_id == "silent":
+            req(False)
+        if item_id == "invalid":
+            return ["not an item"]
+        raise RuntimeError("Cannot list children")
+
+    with session_context(session):
+        treeview_loader("tree")(children)
+
+    with caplog.at_level(logging.ERROR, logger="shiny_treeview"):
+        for item_id in ["root", "invalid", "silent"]:
+            request_children(session, item_id)
+
+    assert session.messages == [
+        ("tree", {"load": {"id": item_id, "error": True}})
+        for item_id in ["root", "invalid", "silent"]
+    ]
+    assert [record.getMessage() for record in caplog.records] == [
+        "Failed to load the children of TreeItem 'root' in treeview 'tree'",
+        "Failed to load the children of TreeItem 'invalid' in treeview 'tree'",
+    ]
+    assert "Cannot list children" in caplog.text
+
+
+def test_treeview_loader_tracked_items():
+    """Test that only lazy items of a tracked tree are passed to the loader."""
+    session = RecordingSession()
+    requested = []
+
+    def children(item_id):
+        requested.append(item_id)
+        return []
+
+    with session_context(session):
+        update_treeview(
+            "tree",
+            items=[TreeItem("lazy", "Lazy", lazy=True), TreeItem("leaf", "Leaf")],
+        )
+        treeview_loader("tree")(children)
+    session.messages.clear()
+
+    for item_id in ["leaf", "unknown", "lazy"]:
+        request_children(session, item_id)
+
+    assert requested == ["lazy"]
+    assert session.messages == [
+        ("tree", {"load": {"id": "leaf", "error": True}}),
+        ("tree", {"load": {"id": "unknown", "error": True}}),
+        ("tree", {"load": {"id": "lazy", "items": []}}),
+    ]
+
+
+def test_treeview_loader_rejects_existing_ids(caplog):
+    """Test that loaded children cannot reuse IDs from the rest of the tree."""
+    session = RecordingSession()
+    items = [
+        TreeItem("root", "Root", lazy=True),
+        TreeItem("other", "Other", [TreeItem("taken", "Taken")], lazy=True),
+    ]
+    children = {
+        "root": [TreeItem("taken", "Duplicate")],
+        "other": [TreeItem("taken", "Reloaded")],
+    }
+
+    with session_context(session):
+        update_treeview("tree", items=items)
+        treeview_loader("tree")(lambda item_id: children[item_id])
+    session.messages.clear()
+
+    with caplog.at_level(logging.ERROR, logger="shiny_treeview"):
+        request_children(session, "root")
+    assert "Duplicate TreeItem IDs found: ['taken']" in caplog.text
+    assert session.messages == [("tree", {"load": {"id": "root", "error": True}})]
+    session.messages.clear()
+
+    # Children being replaced can be loaded again with the same IDs
+    request_children(session, "other")
+    assert [message["load"]["id"] for _, message in session.messages] == ["other"]
+    session.messages.clear()
+
+    with session_context(session):
+        update_treeview("tree", items=items)
+    assert session.messages == [
+        (
+            "tree",
+            {"patch": [{"op": "set", "id": "taken", "label": "Taken"}]},
+        )
+    ]
+
+
+def test_tree_item_changes():
+    """Test that changes made in one flush are sent in a single message."""
+    session = RecordingSession()
+
+    with session_context(session):
+        insert_tree_items("tree", None, [TreeItem("folder", "Folder")])
+        insert_tree_items("tree", "folder", [TreeItem("a", "A"), TreeItem("b", "B")])
+        move_tree_item("tree", "b", "folder", index=0)
+        set_tree_item("tree", "a", label="Renamed", caption="", disabled=True)
+        remove_tree_items("tree", "b")
+        set_tree_item("tree", "a")
+        remove_tree_items("tree", [])
+
+    assert session.messages == []
+    session.flush()
+    assert session.messages == [
+        (
+            "tree",
+            {
+                "patch": [
+                    {
+                        "op": "insert",
+                        "parent": None,
+                        "index": None,
+                        "items": [{"id": "folder", "label": "Folder"}],
+                    },
+                    {
+                        "op": "insert",
+                        "parent": "folder",
+                        "index": None,
+                        "items": [{"id": "a", "label": "A"}, {"id": "b", "label": "B"}],
+                    },
+                    {"op": "move", "id": "b", "parent": "folder", "index": 0},
+                    {
+                        "op": "set",
+                        "id": "a",
+                        "label": "Renamed",
+                        "caption": "",
+                        "disabled": True,
+                    },
+                    {"op": "remove", "ids": ["b"]},
+                ]
+            },
+        )
+    ]
+
+    # Nothing is left to send
+    session.flush()
+    assert len(session.messages) == 1
+
+
+def test_tree_item_changes_tracked():
+    """Test that changes are checked against and applied to the tree data."""
+    session = RecordingSession()
+    items = [
+        TreeItem("folder", "Folder", [TreeItem("a", "A"), TreeItem("b", "B")]),
+        TreeItem("other", "Other"),
+    ]
+
+    with session_context(session):
+        update_treeview("tree", items=items)
+
+        with pytest.raises(ValueError, match="not found"):
+            insert_tree_items("tree", "missing", [TreeItem("c", "C")])
+        with pytest.raises(ValueError, match="Duplicate"):
+            insert_tree_items("tree", None, [TreeItem("a", "A")])
+        with pytest.raises(ValueError, match="own subtree"):
+            move_tree_item("tree", "folder", "a")
+        with pytest.raises(ValueError, match="not found"):
+            set_tree_item("tree", "missing", label="Missing")
+        with pytest.raises(ValueError, match="non-negative"):
+            move_tree_item("tree", "a", None, index=-1)
+        with pytest.raises(ValueError, match="empty"):
+            set_tree_item("tree", "a", label=" ")
+
+        move_tree_item("tree", "b", "other")
+        set_tree_item("tree", "a", label="Renamed")
+
+        # Updates are sent after the queued changes, and diffed against them
+        items[0].children[0].label = "Renamed"
+        items[1].children.append(items[0].children.pop())
+        update_treeview("tree", items=items, selected="b")
+
+    session.flush()
+    assert session.messages[1:] == [
+        (
+            "tree",
+            {
+                "selected": ["b"],
+                "patch": [
+                    {"op": "move", "id": "b", "parent": "other", "index": None},
+                    {"op": "set", "id": "a", "label": "Renamed"},
+                ],
+            },
+        )
+    ]
@@ -1,7 +1,16 @@
+import sys
+
 import pytest
 
-from shiny_treeview import TreeItem
-from shiny_treeview.stratify import stratify_by_parent
+from shiny_treeview import TreeItem, TreeTable
+from shiny_treeview.stratify import (
+    TreeBuilder,
+    stratify_by_levels,
+    stratify_by_parent,
+    stratify_by_path,
+    stratify_from_columns,
+    stratify_from_rows,
+)
 
 
 class TestStratifyByParent:
@@ -140,8 +149,37 @@ class TestStratifyByParent:
         ]
         parent_ids = ["b", "c", "a"]  # a -> b -> c -> a (circular)
 
-        with pytest.raises(ValueError, match="Circular reference detected"):
+        with pytest.raises(
+            ValueError, match="Circular reference detected.*: a -> b -> c -> a$"
+        ):
+            stratify_by_parent(items, parent_ids)
+
+    def test_circular_reference_path(self):
+        """Test that only the items in the cycle are reported."""
+        items = [TreeItem(id=id, label=id.upper()) for id in "abcde"]
+        parent_ids = [None, "a", "d", "c", "c"]  # e -> c -> d -> c (circular)
+
+        with pytest.raises(ValueError, match=": c -> d -> c$"):
             stratify_by_parent(items, parent_ids)
+        with pytest.raises(ValueError, match=": a -> a$"):
+            stratify_by_parent(items[:1], ["a"])
+
+    def test_deep_chain(self):
+        """Test that long chains are checked in linear time."""
+        n = 100_000
+        ids = [f"node{i}" for i in range(n)]
+        table = TreeTable.from_items(
+            [TreeItem(id=id, label="Node", validate=False) for id in ids]
+        )
+
+        result = stratify_by_parent(table, [None] + ids[:-1])
+        assert result.parents[-1] == n - 2
+
+        with pytest.raises(
+            ValueError,
+            match=r": node0 -> node99999 -> .* -> \.\.\. \(99990 more\) -> node0$",
+        ):
+            stratify_by_parent(table, ids[-1:] + ids[:-1])
 
     def test_original_items_unchanged(self):
         """Test that original TreeItem objects are not modified."""
@@ -164,6 +202,22 @@ class TestStratifyByParent:
         # Result should have populated children
         assert len(result[0].children) == 1
 
+    def test_in_place(self):
+        """Test that items are linked in place with copy=False."""
+        items = [
+            TreeItem(id="root", label="Root"),
+            TreeItem(id="child", label="Child", caption="Caption"),
+            TreeItem(id="leaf", label="Leaf", children=[TreeItem("old", "Old")]),
+        ]
+        parent_ids = [None, "root", "child"]
+
+        result = stratify_by_parent(items, parent_ids, copy=False)
+        assert result == stratify_by_parent(items, parent_ids)
+        assert result[0] is items[0]
+        assert result[0].children[0] is items[1]
+        assert items[1].children == [items[2]]
+        assert items[2].children == []
+
     def test_complex_tree_structure(self):
         """Test a more complex tree structure similar to file system."""
         items = [
@@ -200,3 +254,557 @@ class TestStratifyByParent:
         # Find downloads folder
         downloads = next(item for item in result if item.id == "downloads")
         assert len(downloads.children) == 1  # download1
+
+
+class TestStratifyByPath:
+    """Test cases for stratify_by_path function."""
+
+    def test_paths(self):
+        """Test that intermediate items are created."""
+        result = stratify_by_path(
+            ["docs/2024/report.pdf", "docs/2024/notes.txt", "docs/2023/old.pdf"]
+        )
+
+        assert result == [
+            TreeItem(
+                "docs",
+                "docs",
+                [
+                    TreeItem(
+                        "docs/2024",
+                        "2024",
+                        [
+                            TreeItem("docs/2024/report.pdf", "report.pdf"),
+                            TreeItem("docs/2024/notes.txt", "notes.txt"),
+                        ],
+                    ),
+                    TreeItem(
+                        "docs/2023", "2023", [TreeItem("docs/2023/old.pdf", "old.pdf")]
+                    ),
+                ],
+            )
+        ]
+
+    def test_labels(self):
+        """Test that labels are used for given paths, including intermediate ones."""
+        result = stratify_by_path(
+            (path for path in ["/usr/bin", "/usr", "/etc"]),
+            labels=["📁 bin", "📁 usr", "📁 etc"],
+        )
+
+        assert [(item.id, item.label) for item in result] == [
+            ("/usr", "📁 usr"),
+            ("/etc", "📁 etc"),
+        ]
+        assert result[0].children == [TreeItem("/usr/bin", "📁 bin")]
+
+    def test_separator(self):
+        """Test a custom separator."""
+        result = stratify_by_path(["a.b.c", "a.d"], sep=".")
+        assert result[0].children[0] == TreeItem("a.b", "b", [TreeItem("a.b.c", "c")])
+
+    def test_table(self):
+        """Test that a TreeTable is returned on request."""
+        paths = ["x/y/z", "x/w", "v"]
+        result = stratify_by_path(paths, table=True)
+
+        assert isinstance(result, TreeTable)
+        assert result.to_items() == stratify_by_path(paths)
+
+    def test_errors(self):
+        """Test that invalid paths are reported."""
+        with pytest.raises(ValueError, match="Duplicate path 'a/b'"):
+            stratify_by_path(["a/b/c", "a/b", "a/b"])
+        with pytest.raises(ValueError, match="Path 'a//b' contains an empty segment"):
+            stratify_by_path(["a//b"])
+        with pytest.raises(ValueError, match="Path 'a/' contains an empty segment"):
+            stratify_by_path(["a/"])
+        with pytest.raises(ValueError, match="same length"):
+            stratify_by_path(["a", "b"], labels=["A"])
+        with pytest.raises(ValueError, match="sep must be a non-empty string"):
+            stratify_by_path(["a"], sep="")
+
+
+class TestStratifyByLevels:
+    """Test cases for stratify_by_levels function."""
+
+    data = {
+        "region": ["Europe", "Asia", "Europe", "Europe"],
+        "country": ["France", "Japan", "Spain", "France"],
+        "site": ["Paris", "Tokyo", "Madrid", "Lyon"],
+    }
+
+    def test_levels(self):
+        """Test that rows are grouped by each level in order of appearance."""
+        result = stratify_by_levels(self.data, ["region", "country"], label="site")
+
+        assert result == [
+            TreeItem(
+                "Europe",
+                "Europe",
+                [
+                    TreeItem(
+                        "Europe/France",
+                        "France",
+                        [
+                            TreeItem("Europe/France/#0", "Paris"),
+                            TreeItem("Europe/France/#3", "Lyon"),
+                        ],
+                    ),
+                    TreeItem(
+                        "Europe/Spain", "Spain", [TreeItem("Europe/Spain/#2", "Madrid")]
+                    ),
+                ],
+            ),
+            TreeItem(
+                "Asia",
+                "Asia",
+                [TreeItem("Asia/Japan", "Japan", [TreeItem("Asia/Japan/#1", "Tokyo")])],
+            ),
+        ]
+
+    def test_without_rows(self):
+        """Test that the groups of the last level are leaves without a label."""
+        result = stratify_by_levels(self.data, ["region", "country"], table=True)
+        assert result.ids == [
+            "Europe",
+            "Asia",
+            "Europe/France",
+            "Europe/Spain",
+            "Asia/Japan",
+        ]
+
+    def test_ids(self):
+        """Test that values are encoded so that IDs never collide."""
+        data = {
+            "a": ["x y", "x-y", "x", "100%", "#1", None],
+            "b": ["z", "z", "y-z", None, "2", "w"],
+            "label": ["A", "B", "C", "D", "E", "F"],
+        }
+        result = stratify_by_levels(data, ["a", "b"], "label", id_sep="-", table=True)
+
+        assert result.ids == [
+            "x%20y",
+            "x%2Dy",
+            "x",
+            "100%25",
+            "%231",
+            "#5",
+            "x%20y-z",
+            "x%2Dy-z",
+            "x-y%2Dz",
+            "100%25-#3",
+            "%231-2",
+            "x%20y-z-#0",
+            "x%2Dy-z-#1",
+            "x-y%2Dz-#2",
+            "%231-2-#4",
+        ]
+        assert result.labels[:5] == ["x y", "x-y", "x", "100%", "#1"]
+
+    @pytest.mark.parametrize("numpy", [True, False])
+    def test_id_collisions(self, monkeypatch, numpy):
+        """Test that distinct values with the same text are reported."""
+        if not numpy:
+            monkeypatch.setitem(sys.modules, "numpy", None)
+        with pytest.raises(ValueError, match=r"same item IDs: \['1'\]"):
+            stratify_by_levels({"r": [1, "1"]}, ["r"])
+        with pytest.raises(ValueError, match=r"same item IDs: \['a/2'\]"):
+            stratify_by_levels({"r": ["a", "a"], "c": [2, "2"]}, ["r", "c"])
+
+        # The same text in different groups is allowed
+        result = stratify_by_levels({"r": ["a", "b"], "c": [1, "1"]}, ["r", "c"])
+        assert [child.id for item in result for child in item.children] == [
+            "a/1",
+            "b/1",
+        ]
+
+    @pytest.mark.parametrize("numpy", [True, False])
+    def test_row_id(self, monkeypatch, numpy):
+        """Test that rows are identified by a column rather than their position."""
+        if not numpy:
+            monkeypatch.setitem(sys.modules, "numpy", None)
+        data = {**self.data, "code": ["P 1", "T1", "M1", "L1"]}
+
+        result = stratify_by_levels(data, ["region"], "site", row_id="code")
+        assert [[row.id for row in item.children] for item in result] == [
+            ["Europe/#P%201", "Europe/#M1", "Europe/#L1"],
+            ["Asia/#T1"],
+        ]
+
+        # Row IDs do not depend on the other rows
+        rest = {name: values[1:] for name, values in data.items()}
+        result = stratify_by_levels(rest, ["region"], "site", row_id="code")
+        assert [[row.id for row in item.children] for item in result] == [
+            ["Asia/#T1"],
+            ["Europe/#M1", "Europe/#L1"],
+        ]
+
+    def test_row_id_errors(self):
+        """Test that row IDs must be given for every row and unique in each group."""
+        data = {**self.data, "code": [1, 1, 2, 2]}
+        with pytest.raises(ValueError, match="requires label"):
+            stratify_by_levels(data, ["region"], row_id="code")
+        with pytest.raises(ValueError, match=r"same item IDs.*\['Europe/#2'\]"):
+            stratify_by_levels(data, ["region"], "site", row_id="code")
+        with pytest.raises(ValueError, match="cannot have missing values"):
+            stratify_by_levels(
+                {**data, "code": [1, None, 2, 3]}, ["region"], "site", row_id="code"
+            )
+
+        # The same value in different groups is allowed
+        result = stratify_by_levels(data, ["region", "country"], "site", row_id="code")
+        assert [row.id for row in result[0].children[0].children] == [
+            "Europe/France/#1",
+            "Europe/France/#2",
+        ]
+
+    def test_float_levels(self):
+        """Test that whole floats from columns with missing values read as integers."""
+        pd = pytest.importorskip("pandas")
+        data = pd.DataFrame({"year": [2024, None, 2025], "x": [0.5, 1.0, 2.0]})
+
+        result = stratify_by_levels(data, ["year", "x"], table=True)
+        assert result.ids == ["2024", "2025", "2024/0.5", "2025/2"]
+        assert result.labels == ["2024", "2025", "0.5", "2"]
+
+    @pytest.mark.parametrize("frame", ["pandas", "polars", "pyarrow"])
+    def test_frames(self, frame):
+        """Test that data frames give the same tree as dictionaries."""
+        module = pytest.importorskip(frame)
+        data = (
+            module.table(self.data)
+            if frame == "pyarrow"
+            else module.DataFrame(self.data)
+        )
+
+        result = stratify_by_levels(data, ["region", "country"], "site", table=True)
+        expected = stratify_by_levels(
+            self.data, ["region", "country"], "site", table=True
+        )
+        assert result.ids == expected.ids
+        assert result.parents == expected.parents
+
+    def test_without_numpy(self, monkeypatch):
+        """Test that rows are grouped without NumPy."""
+        expected = stratify_by_levels(self.data, ["region", "country"], "site")
+        monkeypatch.setitem(sys.modules, "numpy", None)
+        assert stratify_by_levels(self.data, ["region", "country"], "site") == expected
+
+    def test_errors(self):
+        """Test that invalid arguments are reported."""
+        with pytest.raises(ValueError, match="Column 'country' must have the same"):
+            stratify_by_levels(
+                {"region": ["a", "b"], "country": ["c"]}, ["region", "country"]
+            )
+        with pytest.raises(ValueError, match="id_sep cannot contain"):
+            stratify_by_levels(self.data, ["region"], id_sep=" ")
+        with pytest.raises(ValueError, match="id_sep must be a non-empty string"):
+            stratify_by_levels(self.data, ["region"], id_sep="")
+
+
+class TestStratifyFromRows:
+    """Test cases for stratify_from_rows function."""
+
+    rows = [
+        (("root", "Root"), None),
+        (("child1", "Child 1"), "root"),
+        (("child2", "Child 2"), "root"),
+        (("grandchild", "Grandchild"), "child1"),
+    ]
+
+    expected = [
+        TreeItem(
+            "root",
+            "Root",
+            [
+                TreeItem("child1", "Child 1", [TreeItem("grandchild", "Grandchild")]),
+                TreeItem("child2", "Child 2"),
+            ],
+        )
+    ]
+
+    def test_rows(self):
+        """Test that rows are consumed from an iterator."""
+        assert stratify_from_rows(iter(self.rows)) == self.expected
+
+    def test_children_before_parents(self):
+        """Test that children arriving before their parents are kept in order."""
+        rows = [self.rows[3], self.rows[1], self.rows[0], self.rows[2]]
+        assert stratify_from_rows(rows) == self.expected
+
+    def test_fields(self):
+        """Test that items can be given as TreeItems, dictionaries or tuples."""
+        item = TreeItem("child1", "Child 1")
+        rows = [
+            ({"id": "root", "label": "Root", "caption": "Top"}, None),
+            (item, "root"),
+            (("child2", "Child 2"), "root"),
+        ]
+
+        result = stratify_from_rows(rows)
+
+        assert result[0].caption == "Top"
+        assert result[0].children[0] == item
+        assert result[0].children[0] is not item
+        assert item.children == []
+
+    def test_copy_false(self):
+        """Test that the given items are linked in place with copy=False."""
+        root, child = TreeItem("root", "Root"), TreeItem("child", "Child")
+        result = stratify_from_rows([(child, "root"), (root, None)], copy=False)
+        assert result[0] is root
+        assert root.children == [child]
+
+    def test_duplicate_ids(self):
+        """Test that repeated IDs raise an error."""
+        with pytest.raises(ValueError, match="'root' at index 1 is repeated"):
+            stratify_from_rows([(("root", "Root"), None), (("root", "Root"), None)])
+
+    def test_missing_parent(self):
+        """Test that a parent that never arrives raises an error."""
+        rows = [(("a", "A"), "missing"), (("b", "B"), "gone"), (("c", "C"), "missing")]
+        with pytest.raises(ValueError, match="'missing' at index 0 does not reference"):
+            stratify_from_rows(rows)
+
+    @pytest.mark.parametrize(
+        "rows, path",
+        [
+            ([(("a", "A"), "a")], "a -> a"),
+            ([(("a", "A"), "b"), (("b", "B"), "a")], "a -> b -> a"),
+            (
+                [
+                    (("c", "C"), "a"),
+                    (("a", "A"), "b"),
+                    (("b", "B"), "c"),
+                    (("r", "R"), None),
+                ],
+                "c -> a -> b -> c",
+            ),
+        ],
+    )
+    def test_circular_reference(self, rows, path):
+        """Test that circular references are detected after the last row."""
+        with pytest.raises(ValueError, match=f"relationships: {path}$"):
+            stratify_from_rows(rows)
+
+    def test_deep_chain(self):
+        """Test that a long chain arriving leaf first is linked without recursion."""
+        n = 50_000
+        rows = (
+            ((f"n{i}", "Node"), f"n{i - 1}" if i else None) for i in reversed(range(n))
+        )
+        result = stratify_from_rows(rows)
+
+        depth = 0
+        node = result[0]
+        while node.children:
+            node = node.children[0]
+            depth += 1
+        assert depth == n - 1
+
+
+class TestTreeBuilder:
+    """Test cases for the TreeBuilder class."""
+
+    def test_add(self):
+        """Test that rows are appended to the existing tree."""
+        builder = TreeBuilder([(("root", "Root"), None), (("a", "A"), "root")])
+        items = builder.items
+        builder.add([(("a1", "A1"), "a"), (("b", "B"), "root"), (("c", "C"), None)])
+
+        assert builder.items is items
+        assert builder.items == [
+            TreeItem(
+                "root",
+                "Root",
+                [TreeItem("a", "A", [TreeItem("a1", "A1")]), TreeItem("b", "B")],
+            ),
+            TreeItem("c", "C"),
+        ]
+        assert len(builder) == 5
+        assert "a1" in builder
+
+    def test_add_children_before_parents(self):
+        """Test that new items can be children of later new items."""
+        builder = TreeBuilder([(("root", "Root"), None)])
+        builder.add([(("b1", "B1"), "b"), (("b", "B"), "root")])
+        assert builder.items == [
+            TreeItem("root", "Root", [TreeItem("b", "B", [TreeItem("b1", "B1")])])
+        ]
+
+    def test_copy(self):
+        """Test that TreeItem objects are copied unless copy=False."""
+        item = TreeItem("a", "A")
+        builder = TreeBuilder()
+        builder.add([(item, None)])
+        assert builder.items[0] is not item
+
+        other = TreeItem("b", "B")
+        builder.add([(other, "a")], copy=False)
+        assert builder.items[0].children[0] is other
+
+    @pytest.mark.parametrize(
+        "rows, match",
+        [
+            ([(("root", "Root"), None)], "'root' at index 0 is repeated"),
+            ([(("x", "X"), None), (("x", "X"), None)], "'x' at index 1 is repeated"),
+            ([(("x", "X"), "missing")], "'missing' at index 0 does not reference"),
+            (
+                [(("x", "X"), "y"), (("y", "Y"), "x")],
+                "relationships: x -> y -> x",
+            ),
+        ],
+    )
+    def test_add_errors(self, rows, match):
+        """Test that invalid rows raise an error and leave the tree unchanged."""
+        builder = TreeBuilder([(("root", "Root"), None)])
+        with pytest.raises(ValueError, match=match):
+            builder.add(rows)
+        assert builder.items == [TreeItem("root", "Root")]
+        assert len(builder) == 1
+
+    def test_remove(self):
+        """Test that items are removed with their descendants."""
+        builder = TreeBuilder(
+            [
+                (("root", "Root"), None),
+                (("a", "A"), "root"),
+                (("a1", "A1"), "a"),
+                (("b", "B"), "root"),
+                (("c", "C"), None),
+            ]
+        )
+        builder.remove(["a1", "a", "c"])
+
+        assert builder.items == [TreeItem("root", "Root", [TreeItem("b", "B")])]
+        assert len(builder) == 2
+        assert "a1" not in builder
+
+        # Removed IDs can be added again
+        builder.add([(("a", "A again"), "b")])
+        assert builder.items[0].children[0].children == [TreeItem("a", "A again")]
+
+    def test_remove_one_at_a_time(self):
+        """Test that siblings keep their order across removals and additions."""
+        builder = TreeBuilder((((f"n{i}", "N"), None) for i in range(5)))
+        items = builder.items
+        builder.add([(("n2a", "N"), "n2")])
+        for id in ["n1", "n3", "n2a"]:
+            builder.remove([id])
+        builder.add([(("n5", "N"), None)])
+
+        assert builder.items is items
+        assert [item.id for item in items] == ["n0", "n2", "n4", "n5"]
+        assert items[1].children == []
+
+    def test_remove_missing(self):
+        """Test that removing an unknown ID raises an error."""
+        builder = TreeBuilder([(("root", "Root"), None)])
+        with pytest.raises(ValueError, match="TreeItem 'missing' not found"):
+            builder.remove(["root", "missing"])
+        assert len(builder) == 1
+
+
+def as_list(values):
+    return list(values)
+
+
+def as_numpy(values):
+    np = pytest.importorskip("numpy")
+    return np.array(values, dtype=object)
+
+
+def as_pandas(values):
+    pd = pytest.importorskip("pandas")
+    return pd.Series(values)
+
+
+def as_polars(values):
+    pl = pytest.importorskip("polars")
+    return pl.Series(values)
+
+
+def as_arrow(values):
+    pa = pytest.importorskip("pyarrow")
+    return pa.chunked_array([values[:2], values[2:]])
+
+
+@pytest.mark.parametrize("column", [as_list, as_numpy, as_pandas, as_polars, as_arrow])
+class TestStratifyFromColumns:
+    """Test cases for stratify_from_columns function."""
+
+    def test_columns(self, column):
+        """Test that columns give the same tree as stratify_by_parent."""
+        ids = ["child2", "root", "grandchild", "child1", "root2"]
+        labels = ["Child 2", "Root", "Grandchild", "Child 1", "Root 2"]
+        parent_ids = ["root", None, "child1", "root", None]
+        captions = [None, "Caption", "", None, None]
+        disabled = [True, False, None, False, False]
+
+        result = stratify_from_columns(
+            column(ids),
+            column(labels),
+            column(parent_ids),
+            captions=column(captions),
+            disabled=column(disabled),
+        )
+
+        items = [
+            TreeItem(id, label, caption=caption or "", disabled=bool(flag))
+            for id, label, caption, flag in zip(ids, labels, captions, disabled)
+        ]
+        assert result.to_items() == stratify_by_parent(items, parent_ids)
+        assert result.ids == ["root", "root2", "child2", "child1", "grandchild"]
+
+    def test_errors(self, column):
+        """Test that invalid relationships are reported."""
+        with pytest.raises(ValueError, match="must be unique"):
+            stratify_from_columns(
+                column(["a", "b", "a"]), column(["A"] * 3), column([None] * 3)
+            )
+        with pytest.raises(ValueError, match="Parent ID 'z' at index 2 does not"):
+            stratify_from_columns(
+                column(["a", "b", "c"]), column(["A"] * 3), column([None, "a", "z"])
+            )
+        with pytest.raises(ValueError, match=": b -> c -> b$"):
+            stratify_from_columns(
+                column(["a", "b", "c"]), column(["A"] * 3), column([None, "c", "b"])
+            )
+        with pytest.raises(ValueError, match="ids and labels must have the same"):
+            stratify_from_columns(
+                column(["a", "b", "c"]), column(["A"] * 4), column([None] * 3)
+            )
+
+
+def test_stratify_from_columns_deep():
+    """Test that deep and wide levels are ordered the same way."""
+    n = 10_000
+    ids = [f"node{i}" for i in range(n)]
+    # A chain whose last item has many children, each with one child
+    parent_ids = [None] + ids[: n // 2 - 1] + [ids[n // 2 - 1]] * (n // 4)
+    parent_ids += ids[n // 2 : n // 2 + n // 4]
+
+    result = stratify_from_columns(ids, ids, parent_ids)
+    expected = stratify_by_parent(
+        TreeTable._from_parent_positions(ids, ids, [""] * n, [False] * n, [-1] * n),
+        parent_ids,
+    )
+    assert result.ids == expected.ids
+    assert result.parents == expected.parents
+    assert result.child_offsets == expected.child_offsets
+
+
+def test_stratify_from_columns_without_numpy(monkeypatch):
+    """Test that columns are stratified without NumPy."""
+    monkeypatch.setitem(sys.modules, "numpy", None)
+
+    result = stratify_from_columns(
+        ["a", "b", "c"], ["A", "B", "C"], [None, "a", float("nan")], lazy=[1, 0, 0]
+    )
+    assert result.ids == ["a", "c", "b"]
+    assert list(result.parents) == [-1, -1, 0]
+    assert result.is_lazy(0)
+
+    with pytest.raises(ValueError, match=": a -> b -> a$"):
+        stratify_from_columns(["a", "b"], ["A", "B"], ["b", "a"])
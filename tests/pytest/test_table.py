@@ -0,0 +1,111 @@
+"""Tests for the TreeTable columnar representation."""
+
+from shiny_treeview import TreeItem, TreeTable, input_treeview
+from shiny_treeview.stratify import stratify_by_parent
+from shiny_treeview.utils import duplicate_ids, get_tree_path
+
+
+def make_tree() -> list[TreeItem]:
+    return [
+        TreeItem(
+            id="folder1",
+            label="Folder 1",
+            children=[
+                TreeItem(id="file1", label="File 1", caption="First file"),
+                TreeItem(
+                    id="subfolder1",
+                    label="Subfolder 1",
+                    children=[TreeItem(id="subfile1", label="Subfile 1", lazy=True)],
+                ),
+            ],
+        ),
+        TreeItem(id="standalone", label="Standalone", disabled=True),
+    ]
+
+
+class TestTreeTable:
+    """Test conversion and lookups with TreeTable."""
+
+    def test_from_items(self):
+        """Test that nodes are stored in breadth-first order."""
+        table = TreeTable.from_items(make_tree())
+
+        assert len(table) == 5
+        assert table.ids == ["folder1", "standalone", "file1", "subfolder1", "subfile1"]
+        assert list(table.parents) == [-1, -1, 0, 0, 3]
+        assert table.roots == range(2)
+        assert table.children(0) == range(2, 4)
+        assert table.children(1) == range(4, 4)
+        assert table.children(3) == range(4, 5)
+        assert table.captions[2] == "First file"
+        assert [table.is_disabled(i) for i in range(5)] == [
+            False,
+            True,
+            False,
+            False,
+            False,
+        ]
+        assert [table.is_lazy(i) for i in range(5)] == [False] * 4 + [True]
+
+    def test_round_trip(self):
+        """Test that converting to and from TreeItem preserves the tree."""
+        items = make_tree()
+        table = TreeTable.from_items(items)
+
+        assert table.to_items() == items
+
+    def test_empty(self):
+        """Test an empty table."""
+        table = TreeTable.from_items([])
+
+        assert len(table) == 0
+        assert table.roots == range(0)
+        assert table.to_items() == []
+
+    def test_disabled_bitmap(self):
+        """Test that the disabled bitmap spans multiple bytes."""
+        items = [
+            TreeItem(id=f"item{i}", label=f"Item {i}", disabled=i % 3 == 0)
+            for i in range(20)
+        ]
+        table = TreeTable.from_items(items)
+
+        assert [table.is_disabled(i) for i in range(20)] == [
+            i % 3 == 0 for i in range(20)
+        ]
+
+    def test_utils(self):
+        """Test that utility functions accept a TreeTable."""
+        items = make_tree()
+        table = TreeTable.from_items(items)
+
+        for id in ["folder1", "file1", "subfile1", "standalone", "missing"]:
+            assert get_tree_path(table, id) == get_tree_path(items, id)
+
+        assert duplicate_ids(table) == []
+        duplicated = TreeTable.from_items(items + [TreeItem("file1", "Duplicate")])
+        assert duplicate_ids(duplicated) == ["file1"]
+
+    def test_stratify_by_parent(self):
+        """Test that stratify_by_parent returns a TreeTable for TreeTable input."""
+        flat = [
+            TreeItem(id="child", label="Child"),
+            TreeItem(id="root", label="Root", caption="Top"),
+            TreeItem(id="grandchild", label="Grandchild", disabled=True),
+            TreeItem(id="child2", label="Child 2"),
+        ]
+        parent_ids = ["root", None, "child", "root"]
+
+        result = stratify_by_parent(TreeTable.from_items(flat), parent_ids)
+
+        assert isinstance(result, TreeTable)
+        assert result.to_items() == stratify_by_parent(flat, parent_ids)
+
+    def test_input_treeview(self):
+        """Test that input_treeview renders a TreeTable like a list of TreeItem."""
+        items = make_tree()
+        table = TreeTable.from_items(items)
+
+        assert str(input_treeview("tree", table, selected="subfile1")) == str(
+            input_treeview("tree", items, selected="subfile1")
+        )
@@ -0,0 +1,127 @@
+"""Tests for iterative traversal of tree data."""
+
+import pytest
+
+from shiny_treeview import TreeIndex, TreeItem, TreeTable
+from shiny_treeview.traversal import walk, walk_with_parents
+from shiny_treeview.utils import (
+    duplicate_ids,
+    flatten_tree,
+    get_tree_path,
+    validate_tree,
+)
+
+# Depth of the trees used to check that nothing recurses
+DEEP = 50_000
+
+
+def make_tree():
+    """Create a small tree with items at several depths."""
+    return [
+        TreeItem(
+            id="folder1",
+            label="Folder 1",
+            children=[
+                TreeItem(
+                    id="subfolder1",
+                    label="Subfolder 1",
+                    children=[TreeItem(id="subfile1", label="Subfile 1")],
+                ),
+                TreeItem(id="file1", label="File 1"),
+            ],
+        ),
+        TreeItem(id="standalone", label="Standalone"),
+    ]
+
+
+def make_chain(depth):
+    """Create a tree where each item has a single child."""
+    item = TreeItem(id=f"node{depth - 1}", label="Leaf")
+    for i in reversed(range(depth - 1)):
+        item = TreeItem(id=f"node{i}", label="Node", children=[item])
+    return [item]
+
+
+@pytest.mark.parametrize(
+    "order, expected",
+    [
+        ("pre", ["folder1", "subfolder1", "subfile1", "file1", "standalone"]),
+        ("post", ["subfile1", "subfolder1", "file1", "folder1", "standalone"]),
+        ("bfs", ["folder1", "standalone", "subfolder1", "file1", "subfile1"]),
+    ],
+)
+def test_walk(order, expected):
+    """Test that items are visited in the requested order."""
+    tree = make_tree()
+    assert [item.id for item in walk(tree, order=order)] == expected
+
+    parents = {"subfolder1": "folder1", "subfile1": "subfolder1", "file1": "folder1"}
+    depths = {"folder1": 0, "subfolder1": 1, "subfile1": 2, "file1": 1}
+    visited = []
+    for item, depth, parent in walk_with_parents(tree, order=order):
+        visited.append(item.id)
+        assert depth == depths.get(item.id, 0)
+        assert (parent.id if parent is not None else None) == parents.get(item.id)
+    assert visited == expected
+
+
+def test_walk_empty():
+    """Test that walking an empty tree yields nothing."""
+    for order in ["pre", "post", "bfs"]:
+        assert list(walk([], order=order)) == []
+        assert list(walk_with_parents([], order=order)) == []
+
+
+def test_walk_invalid_order():
+    """Test that an unknown order raises an error when called."""
+    with pytest.raises(ValueError, match="order must be one of 'pre', 'post'"):
+        walk(make_tree(), order="in")
+    with pytest.raises(ValueError, match="order must be one of"):
+        walk_with_parents(make_tree(), order="dfs")
+
+
+@pytest.mark.parametrize("order", ["pre", "post", "bfs"])
+def test_walk_deep(order):
+    """Test that deep trees are walked without recursion."""
+    tree = make_chain(DEEP)
+
+    depths = [depth for _, depth, _ in walk_with_parents(tree, order=order)]
+
+    expected = list(range(DEEP))
+    assert depths == (expected[::-1] if order == "post" else expected)
+    assert sum(1 for _ in walk(tree, order=order)) == DEEP
+
+
+def test_utilities_deep():
+    """Test that the utility functions handle deep trees."""
+    tree = make_chain(DEEP)
+    leaf = f"node{DEEP - 1}"
+
+    path = get_tree_path(tree, leaf)
+    assert len(path) == DEEP
+    assert path[-2:] == (f"node{DEEP - 2}", leaf)
+    assert get_tree_path(tree, "missing") is None
+
+    assert duplicate_ids(tree) == []
+    validate_tree(tree)
+
+    index = TreeIndex(tree)
+    assert index.depth(leaf) == DEEP - 1
+    assert index.parent(leaf) == f"node{DEEP - 2}"
+    assert index.is_ancestor("node0", leaf)
+    assert len(index.descendants("node1")) == DEEP - 2
+
+    assert flatten_tree(tree)["depth"][-1] == DEEP - 1
+    assert len(TreeTable.from_items(tree)) == DEEP
+
+
+def test_to_dict_deep():
+    """Test that deep items are serialized without recursion."""
+    result = make_chain(DEEP)[0]._to_dict()
+
+    depth = 0
+    while "children" in result:
+        (result,) = result["children"]
+        depth += 1
+    assert depth == DEEP - 1
+    assert result == {"id": f"node{DEEP - 1}", "label": "Leaf"}
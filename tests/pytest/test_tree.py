@@ -1,8 +1,12 @@
 """Tests for TreeItem data class validation."""
 
+import dataclasses
+import tracemalloc
+
 import pytest
 
 from shiny_treeview import TreeItem
+from shiny_treeview.tree import _NO_CHILDREN
 
 
 class TestTreeItemValidation:
@@ -127,6 +131,16 @@ class TestTreeItemValidation:
         with pytest.raises(ValueError, match="TreeItem disabled must be a boolean"):
             TreeItem(id="id", label="Label", disabled=None)
 
+    def test_lazy_validation(self):
+        """Test TreeItem lazy validation."""
+        item = TreeItem(id="id", label="Label", lazy=True)
+        assert item.lazy is True
+        assert item.children == []
+        assert item._to_dict() == {"id": "id", "label": "Label", "lazy": True}
+
+        with pytest.raises(ValueError, match="TreeItem lazy must be a boolean"):
+            TreeItem(id="id", label="Label", lazy="true")
+
     def test_children_validation(self):
         """Test TreeItem children validation."""
         # Valid children
@@ -206,6 +220,39 @@ class TestTreeItemValidation:
             )
 
 
+class TestTreeItemSkipValidation:
+    """Test creating trusted TreeItem objects without validation."""
+
+    def test_validate_false(self):
+        """Test that validate=False skips all field checks."""
+        item = TreeItem(id="id with space", label="", validate=False)
+        assert item.id == "id with space"
+        assert item.label == ""
+
+        parent = TreeItem(id="parent", label="Parent", children=["x"], validate=False)
+        assert parent.children == ["x"]
+
+    def test_validate_false_equivalent(self):
+        """Test that trusted items equal validated items."""
+        trusted = TreeItem(
+            id="parent",
+            label="Parent",
+            children=[TreeItem(id="child", label="Child", validate=False)],
+            caption="Caption",
+            disabled=True,
+            validate=False,
+        )
+        validated = TreeItem(
+            id="parent",
+            label="Parent",
+            children=[TreeItem(id="child", label="Child")],
+            caption="Caption",
+            disabled=True,
+        )
+        assert trusted == validated
+        assert trusted._to_dict() == validated._to_dict()
+
+
 class TestTreeItemToDict:
     """Test TreeItem._to_dict() method."""
 
@@ -321,3 +368,100 @@ class TestTreeItemCaptionValidation:
 
         with pytest.raises(ValueError, match="TreeItem caption must be a string"):
             TreeItem(id="test", label="Test", caption=["not", "a", "string"])
+
+
+class TestTreeItemCompact:
+    """Test the compact slot-based storage of TreeItem."""
+
+    def test_no_instance_dict(self):
+        """Test that TreeItem instances use slots instead of a __dict__."""
+        item = TreeItem(id="test", label="Test")
+        assert not hasattr(item, "__dict__")
+
+        with pytest.raises(AttributeError):
+            item.unknown = "value"
+
+    def test_leaf_children_are_mutable(self):
+        """Test that the children of a leaf can still be modified in place."""
+        leaf = TreeItem(id="leaf", label="Leaf")
+        other = TreeItem(id="other", label="Other")
+
+        leaf.children.append(TreeItem(id="child", label="Child"))
+        assert [child.id for child in leaf.children] == ["child"]
+        assert other.children == []
+        assert leaf.children is leaf.children
+
+    def test_children_identity(self):
+        """Test that an explicit children list is stored as given."""
+        children = [TreeItem(id="child", label="Child")]
+        item = TreeItem(id="parent", label="Parent", children=children)
+        assert item.children is children
+
+    def test_sparse_fields(self):
+        """Test that caption and disabled can be set and reset."""
+        item = TreeItem(id="test", label="Test")
+        assert item.caption == ""
+        assert item.disabled is False
+
+        item.caption = "A caption"
+        item.disabled = True
+        assert item.caption == "A caption"
+        assert item.disabled is True
+
+        item.caption = ""
+        assert item.caption == ""
+        assert item.disabled is True
+
+        item.disabled = False
+        assert item == TreeItem(id="test", label="Test")
+
+    def test_dataclass_semantics(self):
+        """Test that TreeItem still behaves like a dataclass."""
+        item = TreeItem(id="test", label="Test", caption="Caption", disabled=True)
+
+        assert [f.name for f in dataclasses.fields(TreeItem)] == [
+            "id",
+            "label",
+            "children",
+            "caption",
+            "disabled",
+            "lazy",
+        ]
+        defaults = {f.name: f.default for f in dataclasses.fields(TreeItem)}
+        assert defaults["caption"] == ""
+        assert defaults["disabled"] is False
+        assert defaults["lazy"] is False
+        assert dataclasses.fields(TreeItem)[2].default_factory() == []
+
+        assert repr(item) == (
+            "TreeItem(id='test', label='Test', children=[], caption='Caption', "
+            "disabled=True, lazy=False)"
+        )
+        assert item._children is _NO_CHILDREN
+        assert dataclasses.replace(item, label="New").label == "New"
+        assert item == TreeItem(
+            id="test", label="Test", children=[], caption="Caption", disabled=True
+        )
+        assert item != TreeItem(id="test", label="Test", caption="Caption")
+        assert item != TreeItem(
+            id="test",
+            label="Test",
+            children=[TreeItem(id="child", label="Child")],
+            caption="Caption",
+            disabled=True,
+        )
+
+    def test_per_node_memory(self):
+        """Test that a leaf costs no more than a single small object."""
+        n = 10_000
+        ids = [f"item{i}" for i in range(n)]
+
+        tracemalloc.start()
+        items = [TreeItem(id, id, caption="") for id in ids]
+        current, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        # Subtract the list holding the items
+        per_node = (current - 8 * n) / n
+        assert per_node <= 72, f"TreeItem uses {per_node:.1f} bytes per leaf"
+        assert len(items) == n
@@ -1,7 +1,21 @@
 """Tests for utility functions."""
 
-from shiny_treeview import TreeItem
-from shiny_treeview.utils import duplicate_ids, get_tree_path
+import pytest
+
+from shiny_treeview import (
+    TreeIndex,
+    TreeItem,
+    TreeTable,
+    input_treeview,
+    stratify_by_parent,
+)
+from shiny_treeview.utils import (
+    duplicate_ids,
+    flatten_tree,
+    get_tree_path,
+    get_tree_paths,
+    validate_tree,
+)
 
 
 def test_get_tree_path():
@@ -58,6 +72,41 @@ def test_get_tree_path():
     assert get_tree_path([], "anything") is None
 
 
+def test_get_tree_paths():
+    """Test that many paths are found in one traversal, like get_tree_path."""
+    tree_data = [
+        TreeItem(
+            id="folder1",
+            label="Folder 1",
+            children=[
+                TreeItem(id="file1", label="File 1"),
+                TreeItem(
+                    id="subfolder1",
+                    label="Subfolder 1",
+                    children=[TreeItem(id="file1", label="Duplicate")],
+                ),
+            ],
+        ),
+        TreeItem(id="standalone", label="Standalone File"),
+    ]
+    ids = ["subfolder1", "missing", "file1", "standalone", "folder1", "file1"]
+
+    paths = get_tree_paths(tree_data, ids)
+
+    assert paths == {
+        "subfolder1": ("folder1", "subfolder1"),
+        "missing": None,
+        "file1": ("folder1", "file1"),
+        "standalone": ("standalone",),
+        "folder1": ("folder1",),
+    }
+    assert paths == {id: get_tree_path(tree_data, id) for id in ids}
+    assert get_tree_paths(TreeIndex(tree_data), ids) == paths
+    assert get_tree_paths(TreeTable.from_items(tree_data), ids) == paths
+    assert get_tree_paths(tree_data, []) == {}
+    assert get_tree_paths([], ["missing"]) == {"missing": None}
+
+
 def test_duplicate_ids():
     """Test detection of duplicate IDs in tree structures."""
     # Test valid tree with unique IDs
@@ -155,3 +204,321 @@ def test_duplicate_ids():
     single_item = [TreeItem(id="single", label="Single Item")]
     result = duplicate_ids(single_item)
     assert result == []
+
+
+def test_duplicate_ids_fail_fast():
+    """Test that fail_fast stops at the first duplicate ID."""
+    tree_data = [
+        TreeItem(id="b", label="B", children=[TreeItem(id="b", label="B")]),
+        TreeItem(id="a", label="A"),
+        TreeItem(id="a", label="A"),
+    ]
+
+    assert duplicate_ids(tree_data) == ["a", "b"]
+    assert duplicate_ids(tree_data, fail_fast=True) == ["b"]
+    assert duplicate_ids(TreeTable.from_items(tree_data), fail_fast=True) == ["a"]
+    assert duplicate_ids(TreeIndex(tree_data), fail_fast=True) == ["a"]
+    assert duplicate_ids(tree_data[1:2], fail_fast=True) == []
+
+
+def test_tree_index():
+    """Test lookups with a prebuilt TreeIndex."""
+    tree_data = [
+        TreeItem(
+            id="folder1",
+            label="Folder 1",
+            children=[
+                TreeItem(id="file1", label="File 1"),
+                TreeItem(
+                    id="subfolder1",
+                    label="Subfolder 1",
+                    children=[TreeItem(id="subfile1", label="Subfile 1")],
+                ),
+            ],
+        ),
+        TreeItem(id="standalone", label="Standalone File"),
+    ]
+    index = TreeIndex(tree_data)
+
+    assert index.items is tree_data
+    assert len(index) == 5
+    assert "subfile1" in index
+    assert "nonexistent" not in index
+
+    # Node lookup
+    assert index.get("subfolder1") is tree_data[0].children[1]
+    assert index.get("nonexistent") is None
+
+    # Parent lookup
+    assert index.parent("folder1") is None
+    assert index.parent("subfile1") == "subfolder1"
+    with pytest.raises(KeyError):
+        index.parent("nonexistent")
+
+    # Depth lookup
+    assert index.depth("standalone") == 0
+    assert index.depth("file1") == 1
+    assert index.depth("subfile1") == 2
+    with pytest.raises(KeyError):
+        index.depth("nonexistent")
+
+    # Path reconstruction matches get_tree_path
+    for id in ["folder1", "file1", "subfolder1", "subfile1", "standalone", "missing"]:
+        assert index.path(id) == get_tree_path(tree_data, id)
+        assert get_tree_path(index, id) == get_tree_path(tree_data, id)
+
+    # Empty tree
+    assert len(TreeIndex([])) == 0
+    assert TreeIndex([]).path("anything") is None
+
+
+def test_tree_index_subtrees():
+    """Test ancestor and descendant queries with a prebuilt TreeIndex."""
+    tree_data = [
+        TreeItem(
+            id="folder1",
+            label="Folder 1",
+            children=[
+                TreeItem(id="file1", label="File 1"),
+                TreeItem(
+                    id="subfolder1",
+                    label="Subfolder 1",
+                    children=[TreeItem(id="subfile1", label="Subfile 1")],
+                ),
+            ],
+        ),
+        TreeItem(id="standalone", label="Standalone File"),
+    ]
+    index = TreeIndex(tree_data)
+
+    assert index.is_ancestor("folder1", "subfile1")
+    assert index.is_ancestor("subfolder1", "subfile1")
+    assert not index.is_ancestor("subfile1", "subfolder1")
+    assert not index.is_ancestor("folder1", "folder1")
+    assert not index.is_ancestor("folder1", "standalone")
+    assert not index.is_ancestor("file1", "subfile1")
+    with pytest.raises(KeyError):
+        index.is_ancestor("folder1", "nonexistent")
+
+    assert index.descendants("folder1") == ["file1", "subfolder1", "subfile1"]
+    assert index.descendants("subfolder1") == ["subfile1"]
+    assert index.descendants("standalone") == []
+    with pytest.raises(KeyError):
+        index.descendants("nonexistent")
+
+    # Matches the ancestors found by following paths
+    ids = list(index._nodes)
+    for ancestor_id in ids:
+        for id in ids:
+            expected = ancestor_id in index.path(id)[:-1]
+            assert index.is_ancestor(ancestor_id, id) == expected
+
+
+def test_tree_index_duplicates():
+    """Test that TreeIndex reports duplicates and resolves to the first match."""
+    first = TreeItem(id="item1", label="First")
+    tree_data = [
+        TreeItem(id="folder1", label="Folder 1", children=[first]),
+        TreeItem(id="item1", label="Second"),
+        TreeItem(id="folder1", label="Duplicate Folder"),
+    ]
+    index = TreeIndex(tree_data)
+
+    assert index.duplicates == ["folder1", "item1"]
+    assert duplicate_ids(index) == duplicate_ids(tree_data)
+    assert index.get("item1") is first
+    assert index.path("item1") == get_tree_path(tree_data, "item1")
+
+
+def test_validate_tree():
+    """Test whole-tree validation of trusted TreeItem objects."""
+    # Valid trees pass silently
+    valid_tree = [
+        TreeItem(
+            id="folder1",
+            label="Folder 1",
+            children=[TreeItem(id="file1", label="File 1", validate=False)],
+            validate=False,
+        ),
+        TreeItem(id="folder2", label="Folder 2", validate=False),
+    ]
+    validate_tree(valid_tree)
+    validate_tree(TreeIndex(valid_tree))
+    validate_tree(TreeTable.from_items(valid_tree))
+    validate_tree([])
+
+    # Invalid IDs deep in the tree are detected
+    for bad_id in ["", "id with space", "tab\tid", "newline\n"]:
+        tree = [
+            TreeItem(
+                id="root",
+                label="Root",
+                children=[TreeItem(id=bad_id, label="Bad", validate=False)],
+            )
+        ]
+        with pytest.raises(
+            ValueError, match="TreeItem id cannot be empty or contain whitespace"
+        ):
+            validate_tree(tree)
+
+    with pytest.raises(ValueError, match="TreeItem id must be a string"):
+        validate_tree([TreeItem(id=123, label="Label", validate=False)])
+
+    # Invalid labels are detected
+    with pytest.raises(
+        ValueError, match="TreeItem label cannot be empty or whitespace only"
+    ):
+        validate_tree([TreeItem(id="id", label=" ", validate=False)])
+
+    with pytest.raises(ValueError, match="TreeItem label must be a string"):
+        validate_tree([TreeItem(id="id", label=None, validate=False)])
+
+    # Invalid optional fields are detected
+    for kwargs, message in [
+        ({"caption": 5}, "TreeItem caption must be a string"),
+        ({"disabled": "yes"}, "TreeItem disabled must be a boolean"),
+        ({"lazy": 1}, "TreeItem lazy must be a boolean"),
+    ]:
+        tree = [
+            TreeItem(
+                id="root",
+                label="Root",
+                children=[TreeItem(id="bad", label="Bad", validate=False, **kwargs)],
+            )
+        ]
+        with pytest.raises(ValueError, match=message):
+            validate_tree(tree)
+        with pytest.raises(ValueError, match=message):
+            validate_tree(TreeIndex(tree))
+    with pytest.raises(ValueError, match="TreeItem caption must be a string"):
+        validate_tree(
+            TreeTable.from_items(
+                [TreeItem(id="a", label="A", caption=5, validate=False)]
+            )
+        )
+
+    # Invalid children are detected before they are visited
+    with pytest.raises(ValueError, match=r"TreeItem children\[1\] must be a TreeItem"):
+        child = TreeItem(id="child", label="Child")
+        validate_tree(
+            [TreeItem(id="a", label="A", children=[child, "x"], validate=False)]
+        )
+    with pytest.raises(ValueError, match="TreeItem children must be a list"):
+        validate_tree([TreeItem(id="a", label="A", children="xyz", validate=False)])
+
+    # Duplicate IDs are detected
+    duplicated = [
+        TreeItem(id="item1", label="Item 1", validate=False),
+        TreeItem(
+            id="folder1",
+            label="Folder 1",
+            children=[TreeItem(id="item1", label="Duplicate", validate=False)],
+            validate=False,
+        ),
+    ]
+    with pytest.raises(ValueError, match=r"Duplicate TreeItem IDs found: \['item1'\]"):
+        validate_tree(duplicated)
+    with pytest.raises(ValueError, match=r"Duplicate TreeItem IDs found: \['item1'\]"):
+        validate_tree(TreeIndex(duplicated))
+    with pytest.raises(ValueError, match="TreeItem id cannot be empty"):
+        validate_tree(TreeIndex([TreeItem(id="bad id", label="Label", validate=False)]))
+
+
+def test_input_treeview_validates_tree():
+    """Test that input_treeview validates trusted trees before rendering."""
+    tree = [TreeItem(id="bad id", label="Label", validate=False)]
+    with pytest.raises(
+        ValueError, match="TreeItem id cannot be empty or contain whitespace"
+    ):
+        input_treeview("tree", tree)
+
+    duplicated = [TreeItem(id="item", label="A"), TreeItem(id="item", label="B")]
+    with pytest.raises(ValueError, match="Duplicate TreeItem IDs found"):
+        input_treeview("tree", duplicated)
+
+    with pytest.raises(ValueError, match="TreeItem caption must be a string"):
+        input_treeview("tree", [TreeItem("a", "A", caption=5, validate=False)])
+
+
+def test_flatten_tree():
+    """Test that a tree is flattened to columns in depth-first order."""
+    tree_data = [
+        TreeItem(
+            id="folder1",
+            label="Folder 1",
+            caption="2 items",
+            children=[
+                TreeItem(
+                    id="subfolder1",
+                    label="Subfolder 1",
+                    children=[TreeItem(id="subfile1", label="Subfile 1", lazy=True)],
+                ),
+                TreeItem(id="file1", label="File 1", disabled=True),
+            ],
+        ),
+        TreeItem(id="standalone", label="Standalone File"),
+    ]
+    expected = {
+        "id": ["folder1", "subfolder1", "subfile1", "file1", "standalone"],
+        "parent_id": [None, "folder1", "subfolder1", "folder1", None],
+        "depth": [0, 1, 2, 1, 0],
+        "label": ["Folder 1", "Subfolder 1", "Subfile 1", "File 1", "Standalone File"],
+        "caption": ["2 items", "", "", "", ""],
+        "disabled": [False, False, False, True, False],
+        "lazy": [False, False, True, False, False],
+        "preorder": [0, 1, 2, 3, 4],
+    }
+
+    assert flatten_tree(tree_data) == expected
+    assert flatten_tree(TreeIndex(tree_data)) == expected
+    assert flatten_tree(TreeTable.from_items(tree_data)) == expected
+    assert flatten_tree([]) == {name: [] for name in expected}
+
+    # The parent IDs reverse stratify_by_parent
+    items = [
+        TreeItem(id, label, caption=caption, disabled=disabled, lazy=lazy)
+        for id, label, caption, disabled, lazy in zip(
+            *(expected[name] for name in ["id", "label", "caption", "disabled", "lazy"])
+        )
+    ]
+    assert stratify_by_parent(items, expected["parent_id"]) == tree_data
+
+    with pytest.raises(ValueError, match="output must be one of"):
+        flatten_tree(tree_data, output="csv")
+
+
+@pytest.mark.parametrize(
+    "output, module, to_dict",
+    [
+        ("pandas", "pandas", lambda frame: frame.to_dict("list")),
+        ("polars", "polars", lambda frame: frame.to_dict(as_series=False)),
+        ("arrow", "pyarrow", lambda frame: frame.to_pydict()),
+    ],
+)
+def test_flatten_tree_frames(output, module, to_dict):
+    """Test that a tree is flattened to a data frame."""
+    pytest.importorskip(module)
+    tree_data = [TreeItem("folder", "Folder", children=[TreeItem("file", "File")])]
+
+    columns = to_dict(flatten_tree(tree_data, output=output))
+
+    assert columns["id"] == ["folder", "file"]
+    assert columns["depth"] == [0, 1]
+    # Missing parent IDs are None, or NaN in pandas
+    root_parent_id = columns["parent_id"][0]
+    assert root_parent_id is None or root_parent_id != root_parent_id
+    assert columns["parent_id"][1] == "folder"
+    assert columns["disabled"] == [False, False]
+
+
+def test_flatten_tree_deep():
+    """Test that deep trees are flattened without recursion."""
+    n = 50_000
+    root = node = TreeItem("n0", "Node")
+    for i in range(1, n):
+        node.children = [TreeItem(f"n{i}", "Node")]
+        node = node.children[0]
+
+    columns = flatten_tree([root])
+    assert columns["depth"][-1] == n - 1
+    assert columns["parent_id"][-1] == f"n{n - 2}"